@@ -0,0 +1,325 @@
+"""Per-caller endpointing delays learned from the caller's own pauses.
+
+LiveKit ends a user turn once the caller has been silent for
+``min_endpointing_delay`` (turn detector says the utterance sounds complete)
+or ``max_endpointing_delay`` (it sounds unfinished). One fixed pair does not
+suit everyone: a fast talker sits through the long delay whenever the
+detector hesitates, and a slow talker who pauses mid-sentence is cut off,
+which throws away a preemptive generation and makes them repeat themselves.
+
+``EndpointingController`` watches the pauses inside each turn (speech that
+resumes before the endpoint fires, or shortly after it fired: a false
+endpoint) and keeps two P² quantile estimates of them, so memory stays O(1)
+however long the session runs. Once it has seen ``warmup`` pauses it sets
+
+- ``min_delay`` to the ``min_quantile`` of how far pauses outlast the VAD's
+  silence window, so an utterance that merely sounds finished is not cut at
+  an ordinary hesitation. Every pause the controller sees is at least that
+  window long (shorter ones are never reported), so the raw pauses would
+  push even a fast talker's delay up towards a second; the excess stays
+  near zero for them and keeps ``min_delay`` at its floor, and
+- ``max_delay`` to the ``max_quantile`` pause plus ``margin``, so an
+  unfinished-sounding utterance waits as long as this caller really pauses
+  rather than a flat two seconds,
+
+each clamped to safe bounds, and pushes them to the session with
+``update_options`` when either moves by ``step`` or more. Decisions, pauses
+and false endpoints go to the metrics sink. Times are the epoch seconds
+LiveKit uses, and pauses are measured from when speech actually stopped,
+i.e. the VAD's end-of-speech event minus its silence window.
+
+``replay`` drives the same controller over a recorded, labelled timeline of
+speech segments with a simulated endpointer, so fixed and adaptive delays
+can be compared offline for turn latency and false-endpoint rate.
+"""
+import logging
+import math
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from .metrics import MetricsSink
+
+logger = logging.getLogger(__name__)
+
+# Never cut a turn sooner than the stock minimum or wait longer than a caller will tolerate
+MIN_DELAY_BOUNDS = (0.2, 1.2)
+MAX_DELAY_BOUNDS = (0.8, 3.0)
+
+# Silero's default min_silence_duration: how long the VAD waits before it reports end of speech
+VAD_SILENCE = 0.55
+
+
+class P2Quantile:
+    """Streaming estimate of the ``q`` quantile in O(1) memory.
+
+    The P² algorithm (Jain & Chlamtac, 1985): five markers track the
+    minimum, q/2, q, (1+q)/2 quantiles and the maximum, and their heights
+    are nudged along a piecewise-parabolic fit as observations arrive.
+    Exact until five observations have been seen.
+    """
+
+    def __init__(self, q: float):
+        if not 0 < q < 1:
+            raise ValueError(f"Quantile must be in (0, 1), got {q}")
+        self.q = q
+        self.count = 0
+        self._heights: list[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self._increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        h = self._heights
+        if self.count <= 5:
+            h.append(x)
+            h.sort()
+            return
+
+        n = self._positions
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if h[i] <= x < h[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not h[i - 1] < height < h[i + 1]:
+                    height = h[i] + d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+                h[i] = height
+                n[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        """Current estimate (NaN before the first observation)."""
+        if not self._heights:
+            return math.nan
+        if self.count <= 5:
+            return self._heights[max(0, math.ceil(self.q * self.count) - 1)]
+        return self._heights[2]
+
+
+def _clamp(value: float, bounds: tuple[float, float]) -> float:
+    return min(max(value, bounds[0]), bounds[1])
+
+
+class EndpointingController:
+    """Tune one caller's endpointing delays from the pauses they make.
+
+    Feed it ``speech_started``/``speech_ended``/``turn_ended`` (see
+    ``attach_endpointing`` for the AgentSession wiring); it calls
+    ``apply(min_delay, max_delay)`` whenever it changes the delays.
+
+    Args:
+        min_delay, max_delay: Starting delays, as passed to AgentSession
+        apply: Called with the new (min_delay, max_delay)
+        sink: Optional MetricsSink for decisions, pauses and false endpoints
+        min_bounds, max_bounds: (lowest, highest) each delay may be set to
+        min_quantile, max_quantile: Pause quantiles the delays follow
+        margin: Added to the ``max_quantile`` pause
+        warmup: Pauses to observe before the first change
+        step: Smallest change worth pushing to the session, in seconds
+        resume_window: Speech resuming this soon after an endpoint fired
+            continues the same utterance (a false endpoint)
+        vad_silence: The VAD's min_silence_duration; ``min_delay`` follows
+            pauses minus this much
+    """
+
+    def __init__(
+        self,
+        min_delay: float = 0.2,
+        max_delay: float = 2.0,
+        *,
+        apply: Optional[Callable[[float, float], None]] = None,
+        sink: Optional[MetricsSink] = None,
+        min_bounds: tuple[float, float] = MIN_DELAY_BOUNDS,
+        max_bounds: tuple[float, float] = MAX_DELAY_BOUNDS,
+        min_quantile: float = 0.75,
+        max_quantile: float = 0.99,
+        margin: float = 0.25,
+        warmup: int = 5,
+        step: float = 0.05,
+        resume_window: float = 1.0,
+        vad_silence: float = VAD_SILENCE,
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.apply = apply
+        self.sink = sink
+        self.min_bounds = min_bounds
+        self.max_bounds = max_bounds
+        self.margin = margin
+        self.warmup = warmup
+        self.step = step
+        self.resume_window = resume_window
+        self.vad_silence = vad_silence
+        self._min_pause = P2Quantile(min_quantile)
+        self._max_pause = P2Quantile(max_quantile)
+        self.false_endpoints = 0
+        self.updates = 0
+        self._speech_end: Optional[float] = None
+        self._endpoint: Optional[float] = None
+
+    @property
+    def pauses(self) -> int:
+        return self._min_pause.count
+
+    def speech_started(self, at: float) -> None:
+        end, endpoint = self._speech_end, self._endpoint
+        self._speech_end = self._endpoint = None
+        if end is None:
+            return
+        pause = at - end
+        if endpoint is None:
+            self._observe(pause)
+        elif at - endpoint <= self.resume_window:
+            self.false_endpoints += 1
+            if self.sink is not None:
+                self.sink.record("endpointing_false_endpoint_seconds", pause)
+            self._observe(pause)
+        # otherwise the caller is starting a new turn
+
+    def speech_ended(self, at: float) -> None:
+        self._speech_end = at
+        self._endpoint = None
+
+    def turn_ended(self, at: float) -> None:
+        """The endpointer committed the caller's turn at ``at``."""
+        if self._speech_end is not None:
+            self._endpoint = at
+
+    def _observe(self, pause: float) -> None:
+        self._min_pause.add(pause - self.vad_silence)
+        self._max_pause.add(pause)
+        if self.sink is not None:
+            self.sink.record("endpointing_pause_seconds", pause)
+        if self.pauses >= self.warmup:
+            self._decide()
+
+    def _decide(self) -> None:
+        min_delay = _clamp(self._min_pause.value(), self.min_bounds)
+        max_delay = max(_clamp(self._max_pause.value() + self.margin, self.max_bounds), min_delay)
+        if abs(min_delay - self.min_delay) < self.step and abs(max_delay - self.max_delay) < self.step:
+            return
+        self.min_delay, self.max_delay = min_delay, max_delay
+        self.updates += 1
+        logger.info(f"⏱️ Endpointing delays now {min_delay:.2f}s / {max_delay:.2f}s after {self.pauses} pauses")
+        if self.sink is not None:
+            self.sink.record("endpointing_delay_seconds", min_delay, {"bound": "min"})
+            self.sink.record("endpointing_delay_seconds", max_delay, {"bound": "max"})
+        if self.apply is not None:
+            self.apply(min_delay, max_delay)
+
+
+def attach_endpointing(session: Any, controller: EndpointingController) -> None:
+    """Drive ``controller`` from AgentSession events and let it retune ``session``.
+
+    The user state turns to listening the controller's ``vad_silence`` after
+    speech actually stopped.
+    """
+    from livekit.agents import metrics
+
+    def apply(min_delay: float, max_delay: float) -> None:
+        session.update_options(min_endpointing_delay=min_delay, max_endpointing_delay=max_delay)
+
+    def on_user_state(event: Any) -> None:
+        if event.new_state == "speaking":
+            controller.speech_started(event.created_at)
+        elif event.old_state == "speaking":
+            controller.speech_ended(event.created_at - controller.vad_silence)
+
+    def on_metrics(event: Any) -> None:
+        m = event.metrics
+        if isinstance(m, metrics.EOUMetrics) and m.last_speaking_time:
+            controller.turn_ended(m.last_speaking_time + m.end_of_utterance_delay)
+
+    controller.apply = apply
+    session.on("user_state_changed", on_user_state)
+    session.on("metrics_collected", on_metrics)
+
+
+class Segment(NamedTuple):
+    """One stretch of caller speech in a recorded timeline."""
+
+    start: float
+    end: float  # when speech actually stopped
+    likely_done: bool  # the turn detector's verdict when it stopped
+    turn_end: bool  # ground truth: the caller had finished their turn
+
+
+class ReplayStats(NamedTuple):
+    turns: int
+    false_endpoints: int
+    latencies: list[float]  # silence waited at each real turn end
+
+    @property
+    def false_endpoint_rate(self) -> float:
+        return self.false_endpoints / max(self.turns, 1)
+
+    @property
+    def mean_latency(self) -> float:
+        return sum(self.latencies) / max(len(self.latencies), 1)
+
+
+def replay(
+    segments: Iterable[Segment],
+    controller: Optional[EndpointingController] = None,
+    *,
+    min_delay: float = 0.2,
+    max_delay: float = 2.0,
+    vad_silence: float = VAD_SILENCE,
+) -> ReplayStats:
+    """Endpoint a recorded timeline the way AudioRecognition would.
+
+    Pauses shorter than ``vad_silence`` never reach the endpointer; after
+    that, the turn ends ``min_delay`` or ``max_delay`` (by the segment's
+    turn-detector verdict) after speech stopped, but never before the VAD
+    has reported the silence. With a ``controller`` the delays start from
+    its own and follow its decisions as the timeline plays.
+    """
+    delays = [min_delay, max_delay]
+    if controller is not None:
+        delays = [controller.min_delay, controller.max_delay]
+        controller.apply = lambda lo, hi: delays.__setitem__(slice(None), (lo, hi))
+
+    turns = false_endpoints = 0
+    latencies: list[float] = []
+    segments = list(segments)
+    speaking = False
+    for i, segment in enumerate(segments):
+        if not speaking and controller is not None:
+            controller.speech_started(segment.start)
+        speaking = True
+        gap = segments[i + 1].start - segment.end if i + 1 < len(segments) else math.inf
+        if gap < vad_silence:
+            continue  # the VAD never reported this pause
+        speaking = False
+        if controller is not None:
+            controller.speech_ended(segment.end)
+        wait = max(delays[0] if segment.likely_done else delays[1], vad_silence)
+        if gap <= wait:
+            continue  # speech resumed before the endpoint fired
+        if controller is not None:
+            controller.turn_ended(segment.end + wait)
+        if segment.turn_end:
+            turns += 1
+            latencies.append(wait)
+        else:
+            false_endpoints += 1
+    return ReplayStats(turns, false_endpoints, latencies)
@@ -1,18 +1,311 @@
 """
 FINAL WORKING VERSION: Properly captures LangGraph tool responses
 """
-from typing import Any, Optional
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 from livekit.agents import llm
 from livekit.agents.types import APIConnectOptions, DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, NotGivenOr
 from livekit.agents.utils import shortuuid
 from livekit.agents.llm.tool_context import FunctionTool, RawFunctionTool, ToolChoice
-from langgraph.pregel import Pregel
-from langchain_core.messages import BaseMessageChunk, AIMessage, HumanMessage, SystemMessage
-from langgraph.errors import GraphInterrupt
+from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage, ToolMessage
+from .metrics import MetricsSink, TurnTimer
+from .speculative import TurnAbandoned, TurnGate
 import logging
 
+if TYPE_CHECKING:
+    # Only for annotations: the adapter drives any compiled graph duck-typed.
+    from langgraph.pregel import Pregel
+
 logger = logging.getLogger(__name__)
 
+def _item_to_message(item: Any) -> AIMessage | HumanMessage | SystemMessage | None:
+    """Convert a single LiveKit chat item to a LangChain message."""
+    if getattr(item, "type", None) != "message":
+        return None
+        
+    role = getattr(item, "role", None)
+    item_id = getattr(item, "id", None)
+    text_content = getattr(item, "text_content", None)
+
+    if not text_content:
+        return None
+        
+    # Create appropriate message type
+    if role == "assistant":
+        return AIMessage(content=text_content, id=item_id)
+    elif role == "user":
+        return HumanMessage(content=text_content, id=item_id)
+    elif role in ["system", "developer"]:
+        return SystemMessage(content=text_content, id=item_id)
+    return None
+
+
+class MessageCache:
+    """Per-session cache of converted LangChain messages keyed by LiveKit item id.
+
+    Only items that are new or whose role/text changed since the previous turn
+    are converted; everything else reuses the existing message object.
+    """
+    
+    def __init__(self):
+        self._entries: dict[str, tuple[str | None, str, BaseMessage]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def convert(self, items: list[Any]) -> list[BaseMessage]:
+        """Convert chat items to LangChain messages, reusing cached ones."""
+        messages: list[BaseMessage] = []
+        entries = self._entries
+        
+        for item in items:
+            if getattr(item, "type", None) != "message":
+                continue
+            
+            item_id = getattr(item, "id", None)
+            role = getattr(item, "role", None)
+            text_content = getattr(item, "text_content", None)
+            if not text_content:
+                continue
+            
+            cached = entries.get(item_id) if item_id else None
+            if cached is not None and cached[0] == role and cached[1] == text_content:
+                self.hits += 1
+                messages.append(cached[2])
+                continue
+            
+            message = _item_to_message(item)
+            if message is None:
+                continue
+            self.misses += 1
+            if item_id:
+                entries[item_id] = (role, text_content, message)
+            messages.append(message)
+        
+        # Drop entries for items that were removed from the context (e.g. truncation)
+        if len(entries) > 2 * len(messages) + 16:
+            live_ids = {message.id for message in messages}
+            self._entries = {k: v for k, v in entries.items() if k in live_ids}
+        
+        return messages
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ThreadTurn:
+    """One turn's footprint on a checkpointed thread, until it is known to stand.
+
+    ``checkpoint`` is the thread config of the checkpoint taken before the
+    turn (None for a new thread), so a turn that was cancelled part-way, or
+    a speculative one LiveKit never committed, can be rolled back to it.
+    """
+
+    def __init__(self, gate: TurnGate | None):
+        self.gate = gate
+        self.messages: list[BaseMessage] = []
+        self.checkpoint: dict[str, Any] | None = None
+        self.reply_pending = False
+        self.ran = False  # the graph was started on the thread
+        self.completed = False  # ...and ran to the end
+        self.rolled_back = False
+        self.done = asyncio.Event()
+
+    @property
+    def stands(self) -> bool:
+        """Keep the turn: it never touched the thread, or finished and was committed."""
+        if not self.ran:
+            return True
+        return self.completed and (self.gate is None or self.gate.confirmed)
+
+
+class ThreadDelta:
+    """Tracks which messages a checkpointed LangGraph thread already holds.
+
+    With a checkpointer the graph keeps the conversation itself, so each turn
+    only needs the messages LiveKit added since the previous turn.
+    """
+    
+    def __init__(self):
+        self._sent_ids: set[str] = set()
+        self._reply_pending = False
+        self.turn: ThreadTurn | None = None  # the latest turn started on the thread
+
+    def new_messages(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Return messages not yet sent to the thread and mark them as sent."""
+        delta: list[BaseMessage] = []
+        for message in messages:
+            if message.id in self._sent_ids:
+                continue
+            self._sent_ids.add(message.id)
+            
+            if message.type == "ai" and self._reply_pending:
+                # LiveKit's transcript of the reply the graph produced last turn;
+                # the checkpoint already holds the graph's own AI message.
+                self._reply_pending = False
+                continue
+            delta.append(message)
+        return delta
+
+    def mark_replied(self) -> None:
+        """Record that the graph produced (and checkpointed) this turn's reply."""
+        self._reply_pending = True
+
+    def unsend(self, messages: list[BaseMessage]) -> None:
+        """Forget that ``messages`` were sent (the turn never reached the graph)."""
+        for message in messages:
+            self._sent_ids.discard(message.id)
+
+    def begin_turn(self, gate: TurnGate | None) -> ThreadTurn:
+        self.turn = ThreadTurn(gate)
+        return self.turn
+
+    def sent(self, turn: ThreadTurn, messages: list[BaseMessage]) -> None:
+        """Record the delta ``turn`` sends, before it reaches the graph."""
+        turn.messages = messages
+        turn.reply_pending = self._reply_pending
+
+    def rolled_back(self, turn: ThreadTurn) -> None:
+        """The thread was restored to before ``turn``: its messages must be sent again."""
+        turn.rolled_back = True
+        self.unsend(turn.messages)
+        self._reply_pending = turn.reply_pending
+
+
+_FILLER = re.compile(r"^(?:(?:please|okay|ok|hey|so|um|uh)\s+)+")
+_PUNCTUATION = re.compile(r"[^\w\s#]")
+
+READ_ONLY_TOOLS = frozenset({"list_todos", "list_tasks", "get_task_summary"})
+
+# Canned replies for when the graph produced no text; fixed, so worth pre-synthesizing.
+ERROR_REPLY = "I'm ready to help! Try 'add task' or 'list tasks'."
+ADDED_REPLY = "Great! I added 'buy groceries' to your task list."
+LISTED_REPLY = "Here are your current tasks."
+DONE_REPLY = "Done! What else can I help you with?"
+TIMEOUT_REPLY = "Sorry, that is taking too long. Please try again."
+FALLBACK_REPLIES = (ERROR_REPLY, ADDED_REPLY, LISTED_REPLY, DONE_REPLY, TIMEOUT_REPLY)
+
+
+def normalize_utterance(text: str) -> str:
+    """Cache key form of an utterance: lowercase, no punctuation or leading filler."""
+    text = " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+    return _FILLER.sub("", text)
+
+
+class ResponseCache:
+    """LRU + TTL cache of spoken replies to read-only turns.
+
+    Entries are keyed by the normalized user utterance and the task-store
+    version, so any mutation makes earlier answers unreachable. Only turns
+    whose tool calls were all in ``read_only_tools`` (and that called at least
+    one) are stored; greetings and follow-ups depend on the conversation.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl: float = 30.0,
+        *,
+        read_only_tools: Iterable[str] = READ_ONLY_TOOLS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.read_only_tools = frozenset(read_only_tools)
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, int], tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, utterance: str, version: int) -> str | None:
+        key = (normalize_utterance(utterance), version)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self._clock():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def cacheable(self, tools_used: Iterable[str]) -> bool:
+        tools_used = set(tools_used)
+        return bool(tools_used) and tools_used <= self.read_only_tools
+
+    def put(self, utterance: str, version: int, reply: str) -> None:
+        key = (normalize_utterance(utterance), version)
+        self._entries[key] = (self._clock() + self.ttl, reply)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+def _tools_used(message: BaseMessage) -> list[str]:
+    """Tool names a graph message shows were run (fast-path replies name theirs)."""
+    if isinstance(message, ToolMessage):
+        return [message.name] if message.name else []
+    tool = message.response_metadata.get("tool") if message.type == "ai" else None
+    return [tool] if tool else []
+
+
+def session_thread_id(room_name: str, participant_identity: str | None = None) -> str:
+    """Derive a stable LangGraph thread_id from the LiveKit room and participant."""
+    if participant_identity:
+        return f"{room_name}:{participant_identity}"
+    return room_name
+
+
+class _Deadline:
+    """Cancel the enclosing block after ``delay`` seconds unless lifted first.
+
+    Works like ``asyncio.timeout`` (3.11+), which Python 3.10 lacks: on expiry
+    the task is cancelled and the block raises ``asyncio.TimeoutError``.
+    ``delay=None`` never expires.
+    """
+
+    def __init__(self, delay: float | None):
+        self._delay = delay
+        self._handle: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self.expired = False
+
+    async def __aenter__(self) -> "_Deadline":
+        self._task = asyncio.current_task()
+        if self._delay is not None:
+            self._handle = asyncio.get_running_loop().call_later(self._delay, self._expire)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.lift()
+        if self.expired and exc_type is asyncio.CancelledError:
+            if hasattr(self._task, "uncancel"):
+                self._task.uncancel()  # 3.11+: this cancellation was ours, not the caller's
+            raise asyncio.TimeoutError from exc
+
+    def _expire(self) -> None:
+        self._handle = None
+        self.expired = True
+        self._task.cancel()
+
+    def lift(self) -> None:
+        """Let the block run to completion."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+
 class LangGraphStream(llm.LLMStream):
     """FINAL FIX: Captures LangGraph responses including tool results."""
     
@@ -23,24 +316,92 @@ class LangGraphStream(llm.LLMStream):
         chat_ctx: llm.ChatContext,
         tools: list[FunctionTool | RawFunctionTool],
         conn_options: APIConnectOptions,
-        graph: Pregel,
+        graph: "Pregel",
+        config: dict[str, Any] | None = None,
+        streaming: bool = False,
+        message_cache: MessageCache | None = None,
+        thread_delta: ThreadDelta | None = None,
+        response_cache: ResponseCache | None = None,
+        store_version: Callable[[], int] | None = None,
+        metrics: MetricsSink | None = None,
+        turn_gate: TurnGate | None = None,
+        turn_deadline: float | None = None,
     ):
         super().__init__(llm, chat_ctx=chat_ctx, tools=tools, conn_options=conn_options)
         self._graph = graph
+        self._config = config or {}
+        self._streaming = streaming
+        self._message_cache = message_cache
+        self._thread_delta = thread_delta
+        self._response_cache = response_cache if store_version is not None else None
+        self._store_version = store_version
+        self._metrics = metrics
+        self._turn_gate = turn_gate
+        self._turn_deadline = turn_deadline
+        self._deadline: _Deadline | None = None
 
     async def _run(self):
         """FINAL FIX: Properly captures all LangGraph responses."""
-        state = self._chat_ctx_to_state()
+        timer = TurnTimer(self._metrics) if self._metrics is not None else None
+        # Registered before the first await so the next turn waits for this one to settle.
+        previous = turn = None
+        completed = False
+        if self._thread_delta is not None:
+            previous = self._thread_delta.turn
+            turn = self._thread_delta.begin_turn(self._turn_gate)
         
         try:
+            if turn is not None:
+                await self._settle_turn(previous)
+                turn.checkpoint = await self._thread_checkpoint()
+            state = self._chat_ctx_to_state()
+            if turn is not None:
+                self._thread_delta.sent(turn, state["messages"])
+            if timer is not None:
+                timer.mark("context_conversion_seconds")
+            
             logger.info(f"🎯 Processing voice input with {len(state.get('messages', []))} messages")
             
+            utterance = self._cacheable_utterance(state)
+            version = 0
+            if utterance is not None:
+                version = self._store_version()
+                cached = self._response_cache.get(utterance, version)
+                if cached is not None:
+                    logger.info(f"♻️ Response cache hit: {cached}")
+                    self._event_ch.send_nowait(self._create_livekit_chunk(cached))
+                    if timer is not None:
+                        timer.token("cache")
+                        timer.done("cache")
+                    if self._thread_delta is not None:
+                        # The graph never saw this turn; send it with the next one.
+                        self._thread_delta.unsend(state["messages"])
+                    return
+            
+            config = timer.graph_config(self._config) if timer is not None else self._config
+            if turn is not None:
+                turn.ran = True
+            
+            if self._streaming:
+                async with self._until_deadline():
+                    reply, tools_used = await self._stream_graph(state, config, timer)
+                completed = True
+                if reply:
+                    self._mark_replied()
+                    self._cache_reply(utterance, version, reply, tools_used)
+                else:
+                    self._send_fallback(state)
+                return
+            
             final_response = None
             
             # Execute LangGraph and capture final state
-            final_state = await self._graph.ainvoke(state)
+            async with self._until_deadline():
+                final_state = await self._graph.ainvoke(state, config)
+            completed = True
             
             # Get the final messages from the completed state
+            tools_used: list[str] = []
             if 'messages' in final_state and final_state['messages']:
                 messages = final_state['messages']
                 
@@ -51,63 +412,200 @@ class LangGraphStream(llm.LLMStream):
                             final_response = msg.content.strip()
                             logger.info(f"📝 LangGraph final response: {final_response}")
                             break
+                
+                # Tools run this turn: everything after the last human message
+                for msg in reversed(messages):
+                    if msg.type == "human":
+                        break
+                    tools_used += _tools_used(msg)
             
             # Send the actual response or create appropriate confirmation
             if final_response:
                 tts_chunk = self._create_livekit_chunk(final_response)
                 if tts_chunk:
                     self._event_ch.send_nowait(tts_chunk)
+                    if timer is not None:
+                        timer.token("graph")
+                        timer.done("graph")
+                    self._mark_replied()
+                    self._cache_reply(utterance, version, final_response, tools_used)
                     logger.info(f"✅ Sent LangGraph response to TTS: {final_response}")
             else:
-                # Create success confirmation based on what actually happened
-                last_user_msg = ""
-                for msg in reversed(state.get('messages', [])):
-                    if hasattr(msg, 'type') and msg.type == 'human':
-                        last_user_msg = msg.content.lower()
-                        break
-                
-                # Check if a task was actually added by looking at final state
-                if "add task" in last_user_msg or "buy groceries" in last_user_msg:
-                    success_response = "Great! I added 'buy groceries' to your task list."
-                elif "list" in last_user_msg:
-                    success_response = "Here are your current tasks."
-                else:
-                    success_response = "Done! What else can I help you with?"
-                
-                logger.info(f"🔧 Generated success response: {success_response}")
-                success_chunk = self._create_livekit_chunk(success_response)
-                if success_chunk:
-                    self._event_ch.send_nowait(success_chunk)
-                        
+                self._send_fallback(state)
+        
+        except asyncio.CancelledError:
+            # LiveKit dropped the stream (e.g. a preemptive turn the user kept talking over);
+            # the cancellation propagates into the graph and stops pending LLM calls.
+            logger.info("🛑 Turn cancelled, stopping the graph")
+            raise
+        except TurnAbandoned as e:
+            logger.warning(f"🛑 {e}")
         except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) and self._deadline is not None and self._deadline.expired:
+                # The graph (and any model call in flight) was cancelled; staged writes are dropped below.
+                logger.warning(f"⏱️ No reply within the {self._turn_deadline:.1f}s turn deadline")
+                self._event_ch.send_nowait(self._create_livekit_chunk(TIMEOUT_REPLY))
+                return
             logger.error(f"❌ Error in LangGraph execution: {e}")
-            error_response = "I'm ready to help! Try 'add task' or 'list tasks'."
-            error_chunk = self._create_livekit_chunk(error_response)
+            error_chunk = self._create_livekit_chunk(ERROR_REPLY)
             if error_chunk:
                 self._event_ch.send_nowait(error_chunk)
+        finally:
+            if self._turn_gate is not None and not completed:
+                # Release staged writes; a no-op once the turn was confirmed. A finished
+                # graph has none, and its gate is left for LiveKit to confirm or supersede.
+                self._turn_gate.abort()
+            if turn is not None:
+                turn.completed = completed
+                try:
+                    if turn.ran and not completed:
+                        # Cancelled, timed out or failed mid-graph: the checkpoint may hold
+                        # tool calls without results, which would break every later turn.
+                        await self._roll_back(turn)
+                finally:
+                    turn.done.set()
 
-    def _chat_ctx_to_state(self) -> dict[str, Any]:
-        """Convert LiveKit chat context to LangGraph state."""
-        messages: list[AIMessage | HumanMessage | SystemMessage] = []
+    async def _settle_turn(self, previous: ThreadTurn | None) -> None:
+        """Wait for the previous turn to finish with the thread; drop it if it does not stand."""
+        if previous is None:
+            return
+        await previous.done.wait()
+        if not previous.stands and not previous.rolled_back:
+            # A speculative turn LiveKit discarded after it had already finished.
+            await self._roll_back(previous)
+
+    async def _thread_checkpoint(self) -> dict[str, Any] | None:
+        snapshot = await self._graph.aget_state(self._config)
+        return snapshot.config if snapshot.metadata is not None else None
+
+    async def _roll_back(self, turn: ThreadTurn) -> None:
+        """Restore the thread to its checkpoint from before ``turn``."""
+        try:
+            if turn.checkpoint is None:
+                await self._graph.checkpointer.adelete_thread(self._config["configurable"]["thread_id"])
+            else:
+                # A copy of the old checkpoint becomes the thread's latest.
+                await self._graph.aupdate_state(turn.checkpoint, None, as_node="__copy__")
+        except Exception as e:
+            logger.error(f"❌ Could not roll back the abandoned turn: {e}")
+            return
+        logger.info("↩️ Rolled the thread back past an abandoned turn")
+        self._thread_delta.rolled_back(turn)
+
+    def _until_deadline(self) -> _Deadline:
+        """Bound the wait for the first reply text; ``_stream_graph`` lifts it once speech starts."""
+        self._deadline = _Deadline(self._turn_deadline)
+        return self._deadline
+
+    async def _stream_graph(
+        self, state: dict[str, Any], config: dict[str, Any], timer: TurnTimer | None = None
+    ) -> tuple[str, list[str]]:
+        """Forward AI message deltas to TTS as soon as the graph produces them.
+
+        Tool-call chunks and tool messages are skipped so only spoken text
+        reaches ``_event_ch``. A model may stream a preamble ("Sure, adding
+        that.") before the tool calls of the same message: what was already
+        spoken stays spoken, the rest of that message is dropped, and the next
+        message is set off with a space. Returns the text of the messages
+        without tool calls (what ``ainvoke`` would answer) and the tools that ran.
+        """
+        spoken: dict[str | None, list[str]] = {}  # message id -> text sent, in order
+        tool_messages: set[str | None] = set()
+        tools_used: list[str] = []
+        last = ""
         
-        for item in getattr(self._chat_ctx, "items", []):
-            if getattr(item, "type", None) != "message":
+        # subgraphs=True so tokens from nested agents (e.g. behind a router) stream too
+        async for _namespace, (message_chunk, _metadata) in self._graph.astream(
+            state, config, stream_mode="messages", subgraphs=True
+        ):
+            if not isinstance(message_chunk, BaseMessage):
                 continue
-                
-            role = getattr(item, "role", None)
-            item_id = getattr(item, "id", None)
-            text_content = getattr(item, "text_content", None)
-
-            if not text_content:
+            tools_used += _tools_used(message_chunk)
+            if message_chunk.type not in ("ai", "AIMessageChunk"):
                 continue
-                
-            # Create appropriate message type
-            if role == "assistant":
-                messages.append(AIMessage(content=text_content, id=item_id))
-            elif role == "user":
-                messages.append(HumanMessage(content=text_content, id=item_id))
-            elif role in ["system", "developer"]:
-                messages.append(SystemMessage(content=text_content, id=item_id))
+            if getattr(message_chunk, "tool_call_chunks", None) or getattr(message_chunk, "tool_calls", None):
+                tool_messages.add(message_chunk.id)
+                continue
+            if message_chunk.id in tool_messages:
+                continue
+            
+            content = message_chunk.content if isinstance(message_chunk.content, str) else message_chunk.text
+            if not last:
+                content = content.lstrip()
+            elif message_chunk.id not in spoken and content.strip() and not last[-1].isspace():
+                content = " " + content.lstrip()  # a new message after an earlier one's text
+            
+            chunk = self._create_livekit_chunk(content, id=message_chunk.id)
+            if chunk:
+                if not last and self._deadline is not None:
+                    self._deadline.lift()  # the caller is hearing a reply; let it finish
+                self._event_ch.send_nowait(chunk)
+                spoken.setdefault(message_chunk.id, []).append(content)
+                last = content
+                if timer is not None:
+                    timer.token("graph")
+        
+        if spoken and timer is not None:
+            timer.done("graph")
+        logger.info("✅ Streamed LangGraph response to TTS" if spoken else "⚠️ LangGraph stream produced no text")
+        reply = "".join(text for message_id, texts in spoken.items() if message_id not in tool_messages for text in texts)
+        return reply.strip(), tools_used
+
+    def _cacheable_utterance(self, state: dict[str, Any]) -> str | None:
+        """The user utterance to look up in the response cache, if caching applies."""
+        if self._response_cache is None:
+            return None
+        messages = state.get("messages") or []
+        if not messages or messages[-1].type != "human":
+            return None
+        return messages[-1].text
+
+    def _cache_reply(self, utterance: str | None, version: int, reply: str, tools_used: list[str]) -> None:
+        # A changed version means the turn mutated tasks (or raced with a mutation).
+        if utterance is None or self._store_version() != version:
+            return
+        if self._response_cache.cacheable(tools_used):
+            self._response_cache.put(utterance, version, reply)
+
+    def _mark_replied(self) -> None:
+        if self._thread_delta is not None:
+            self._thread_delta.mark_replied()
+
+    def _send_fallback(self, state: dict[str, Any]) -> None:
+        """Create success confirmation based on what actually happened."""
+        last_user_msg = ""
+        for msg in reversed(state.get('messages', [])):
+            if hasattr(msg, 'type') and msg.type == 'human':
+                last_user_msg = msg.content.lower()
+                break
+        
+        # Check if a task was actually added by looking at final state
+        if "add task" in last_user_msg or "buy groceries" in last_user_msg:
+            success_response = ADDED_REPLY
+        elif "list" in last_user_msg:
+            success_response = LISTED_REPLY
+        else:
+            success_response = DONE_REPLY
+        
+        logger.info(f"🔧 Generated success response: {success_response}")
+        success_chunk = self._create_livekit_chunk(success_response)
+        if success_chunk:
+            self._event_ch.send_nowait(success_chunk)
+
+    def _chat_ctx_to_state(self) -> dict[str, Any]:
+        """Convert LiveKit chat context to LangGraph state."""
+        items = getattr(self._chat_ctx, "items", [])
+        
+        if self._message_cache is not None:
+            messages = self._message_cache.convert(items)
+        else:
+            messages = [
+                message for item in items
+                if (message := _item_to_message(item)) is not None
+            ]
+        
+        if self._thread_delta is not None:
+            messages = self._thread_delta.new_messages(messages)
 
         logger.info(f"🔄 Processed {len(messages)} messages for LangGraph")
         return {"messages": messages}
@@ -126,10 +624,59 @@ class LangGraphStream(llm.LLMStream):
 class LangGraphAdapter(llm.LLM):
     """FINAL WORKING LangGraph adapter."""
     
-    def __init__(self, graph: Any, config: dict[str, Any] | None = None):
+    def __init__(
+        self,
+        graph: Any,
+        config: dict[str, Any] | None = None,
+        *,
+        streaming: bool = False,
+        checkpointing: bool = False,
+        response_cache: ResponseCache | None = None,
+        store_version: Callable[[], int] | None = None,
+        metrics: MetricsSink | None = None,
+        speculative: bool = False,
+        turn_deadline: float | None = None,
+    ):
+        """
+        Args:
+            graph: Compiled LangGraph graph
+            config: RunnableConfig passed to every graph run
+            streaming: Forward AI deltas to TTS as they are generated
+            checkpointing: The graph has a checkpointer and ``config`` carries a
+                thread_id, so only messages added since the last turn are sent.
+                A turn cut off mid-graph, or a speculative one LiveKit never
+                commits, is rolled back out of the thread
+            response_cache: Replay replies to repeated read-only turns
+            store_version: Current task-store version; required by ``response_cache``
+            metrics: Sink for per-turn latency spans; None disables timing entirely
+            speculative: Turns may start before the user has finished (LiveKit
+                ``preemptive_generation``). Mutating tools wait until ``confirm_turn``
+                is called and are dropped if the stream is cancelled first; see
+                ``attach_turn_confirmation``.
+            turn_deadline: Seconds a turn may take before its first reply text;
+                past it the graph is cancelled and ``TIMEOUT_REPLY`` is spoken.
+                None waits as long as the graph takes.
+        """
         super().__init__()
         self._graph = graph
         self._config = config or {}
+        self._streaming = streaming
+        self._message_cache = MessageCache()
+        self._thread_delta: ThreadDelta | None = None
+        self._response_cache = response_cache
+        self._store_version = store_version
+        self._metrics = metrics
+        self._speculative = speculative
+        self._turn_gate: TurnGate | None = None
+        self._turn_deadline = turn_deadline
+        
+        if response_cache is not None and store_version is None:
+            raise ValueError("response_cache requires store_version")
+        
+        if checkpointing:
+            if not self._config.get("configurable", {}).get("thread_id"):
+                raise ValueError("checkpointing requires config['configurable']['thread_id']")
+            self._thread_delta = ThreadDelta()
 
     def chat(
         self,
@@ -144,10 +691,50 @@ class LangGraphAdapter(llm.LLM):
         """Create final working streaming session."""
         logger.info("🚀 Creating FINAL LangGraph chat stream")
         
+        config, turn_gate = self._config, None
+        if self._speculative:
+            # A new turn supersedes any earlier one still waiting for confirmation.
+            if self._turn_gate is not None:
+                self._turn_gate.abort()
+            turn_gate = self._turn_gate = TurnGate()
+            config = {**config, "configurable": {**config.get("configurable", {}), "turn_gate": turn_gate}}
+        
         return LangGraphStream(
             self,
             chat_ctx=chat_ctx,
             tools=tools or [],
             conn_options=conn_options,
             graph=self._graph,
+            config=config,
+            streaming=self._streaming,
+            message_cache=self._message_cache,
+            thread_delta=self._thread_delta,
+            response_cache=self._response_cache,
+            store_version=self._store_version,
+            metrics=self._metrics,
+            turn_gate=turn_gate,
+            turn_deadline=self._turn_deadline,
         )
+
+    def confirm_turn(self) -> None:
+        """Commit the latest speculative turn: its staged tool calls may now run."""
+        if self._turn_gate is not None:
+            self._turn_gate.confirm()
+
+    @property
+    def response_cache(self) -> ResponseCache | None:
+        return self._response_cache
+
+
+def attach_turn_confirmation(session: Any, adapter: LangGraphAdapter) -> None:
+    """Confirm the adapter's speculative turn when LiveKit commits it.
+
+    LiveKit moves the agent to "thinking" only once a reply is scheduled, i.e.
+    the user's turn has ended and the preemptive generation matched it;
+    superseded generations are cancelled instead and never see this.
+    """
+    def on_agent_state_changed(event: Any) -> None:
+        if event.new_state == "thinking":
+            adapter.confirm_turn()
+
+    session.on("agent_state_changed", on_agent_state_changed)
@@ -0,0 +1,291 @@
+"""Per-turn latency spans for the voice pipeline.
+
+The adapter records graph-side spans (context conversion, graph start, first
+token, each tool call, final chunk) and ``attach_session_metrics`` turns
+AgentSession events into session-side spans (endpointing, STT, LLM, TTS).
+Samples go to a ``MetricsSink``; ``InMemorySink`` keeps rolling histograms
+with p50/p95/p99 and ``PrometheusFileSink`` also writes them out in the
+Prometheus text format for node_exporter's textfile collector. With no sink
+configured nothing is timed at all.
+"""
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Rolling window of the last ``window`` samples plus lifetime count and sum."""
+
+    def __init__(self, window: int = 1024):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile of the current window (NaN when empty)."""
+        return _nearest_rank(sorted(self.samples), q)
+
+    def percentiles(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        return {f"p{round(q * 100)}": _nearest_rank(ordered, q) for q in QUANTILES}
+
+
+def _nearest_rank(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return math.nan
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class MetricsSink(ABC):
+    """Destination for latency samples, in seconds."""
+
+    @abstractmethod
+    def record(self, name: str, value: float, labels: Optional[dict[str, str]] = None) -> None:
+        """Add one sample; called on the event loop, so it must not block."""
+
+    def flush(self) -> None:
+        """Persist anything buffered (no-op by default)."""
+
+
+class InMemorySink(MetricsSink):
+    """Keeps one Histogram per metric name and label set."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+
+    def record(self, name: str, value: float, labels: Optional[dict[str, str]] = None) -> None:
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.window)
+            histogram.observe(value)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def percentiles(self, name: str, **labels: str) -> dict[str, float]:
+        """``{"p50", "p95", "p99", "count"}`` for one metric (empty if never recorded)."""
+        histogram = self.histogram(name, **labels)
+        if histogram is None:
+            return {}
+        return {**histogram.percentiles(), "count": histogram.count}
+
+    def snapshot(self) -> dict[tuple[str, Labels], dict[str, float]]:
+        with self._lock:
+            items = list(self._histograms.items())
+        return {key: {**h.percentiles(), "count": h.count, "sum": h.sum} for key, h in items}
+
+
+def _format_labels(labels: Labels, quantile: Optional[float] = None) -> str:
+    pairs = [f'{k}="{v}"' for k, v in labels]
+    if quantile is not None:
+        pairs.append(f'quantile="{quantile}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class PrometheusFileSink(InMemorySink):
+    """InMemorySink that periodically rewrites ``path`` as Prometheus summaries.
+
+    The file is replaced atomically at most every ``flush_interval`` seconds
+    (and on ``flush``). Periodic writes run on a background thread, and disk
+    errors are logged rather than raised, so a full disk never costs a turn.
+    """
+
+    def __init__(self, path: str, *, prefix: str = "voice_agent", flush_interval: float = 10.0, window: int = 1024):
+        super().__init__(window)
+        self.path = path
+        self.prefix = prefix
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+
+    def record(self, name: str, value: float, labels: Optional[dict[str, str]] = None) -> None:
+        super().record(name, value, labels)
+        if time.monotonic() - self._last_flush < self.flush_interval:
+            return
+        if self._pending is not None and not self._pending.done():
+            return
+        self._last_flush = time.monotonic()
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-flush")
+        self._pending = self._writer.submit(self.flush)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        typed: set[str] = set()
+        for (name, labels), stats in sorted(self.snapshot().items()):
+            metric = f"{self.prefix}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} summary")
+                typed.add(metric)
+            for q in QUANTILES:
+                lines.append(f"{metric}{_format_labels(labels, q)} {stats[f'p{round(q * 100)}']:.6f}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {stats['sum']:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """Rewrite the file now (blocking); logs and swallows disk errors."""
+        self._last_flush = time.monotonic()
+        try:
+            self._write()
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write metrics to {self.path}: {e}")
+
+    def _write(self) -> None:
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".prom")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def create_sink(kind: str, path: str) -> Optional[MetricsSink]:
+    """Sink for the METRICS_SINK setting: "", "memory" or "prometheus"."""
+    if not kind:
+        return None
+    if kind == "memory":
+        return InMemorySink()
+    if kind == "prometheus":
+        return PrometheusFileSink(path)
+    raise ValueError(f"Unknown metrics sink: {kind}")
+
+
+class _GraphCallbacks(BaseCallbackHandler):
+    """Times the graph's first callback and every tool run inside it."""
+
+    run_inline = True
+
+    def __init__(self, timer: "TurnTimer"):
+        self._timer = timer
+        self._graph_started = False
+        self._tools: dict[UUID, tuple[str, float]] = {}
+
+    def on_chain_start(self, serialized: Any, inputs: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        if parent_run_id is None and not self._graph_started:
+            self._graph_started = True
+            self._timer.mark("graph_start_seconds")
+
+    def on_tool_start(self, serialized: Any, input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        self._tools[run_id] = (name, self._timer.clock())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tool_done(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tool_done(run_id)
+
+    def _tool_done(self, run_id: UUID) -> None:
+        started = self._tools.pop(run_id, None)
+        if started is not None:
+            name, at = started
+            self._timer.sink.record("tool_call_seconds", self._timer.clock() - at, {"tool": name})
+
+
+class TurnTimer:
+    """Spans for one adapter turn, measured from when the turn started."""
+
+    def __init__(self, sink: MetricsSink, clock: Callable[[], float] = time.perf_counter):
+        self.sink = sink
+        self.clock = clock
+        self.started = clock()
+        self._first_token = False
+
+    def mark(self, name: str, labels: Optional[dict[str, str]] = None) -> None:
+        """Record the time from turn start to now under ``name``."""
+        self.sink.record(name, self.clock() - self.started, labels)
+
+    def record_since(self, name: str, since: float) -> None:
+        self.sink.record(name, self.clock() - since)
+
+    def token(self, path: str) -> None:
+        """Call for every spoken chunk; records first_token once."""
+        if not self._first_token:
+            self._first_token = True
+            self.mark("first_token_seconds", {"path": path})
+
+    def done(self, path: str) -> None:
+        self.mark("final_chunk_seconds", {"path": path})
+
+    def graph_config(self, config: dict[str, Any]) -> dict[str, Any]:
+        """``config`` plus a callback handler timing the graph and its tools."""
+        callbacks = config.get("callbacks")
+        handler = _GraphCallbacks(self)
+        if callbacks is None:
+            callbacks = [handler]
+        elif isinstance(callbacks, list):
+            callbacks = [*callbacks, handler]
+        else:
+            callbacks = callbacks.copy()
+            callbacks.add_handler(handler)
+        return {**config, "callbacks": callbacks}
+
+
+def attach_session_metrics(session: Any, sink: MetricsSink) -> None:
+    """Record AgentSession metrics and state-change events into ``sink``.
+
+    ``response_latency_seconds`` runs from the user going quiet to the agent
+    starting to speak, i.e. what the caller actually waits.
+    """
+    from livekit.agents import metrics
+
+    user_stopped_at: list[Optional[float]] = [None]
+
+    def on_metrics(event: Any) -> None:
+        m = event.metrics
+        if isinstance(m, metrics.EOUMetrics):
+            sink.record("eou_delay_seconds", m.end_of_utterance_delay)
+            sink.record("transcription_delay_seconds", m.transcription_delay)
+        elif isinstance(m, metrics.LLMMetrics):
+            sink.record("llm_ttft_seconds", m.ttft)
+            sink.record("llm_duration_seconds", m.duration)
+        elif isinstance(m, metrics.TTSMetrics):
+            sink.record("tts_ttfb_seconds", m.ttfb)
+            sink.record("tts_duration_seconds", m.duration)
+        elif isinstance(m, metrics.STTMetrics):
+            sink.record("stt_duration_seconds", m.duration)
+
+    def on_user_state(event: Any) -> None:
+        if event.old_state == "speaking" and event.new_state != "speaking":
+            user_stopped_at[0] = event.created_at
+
+    def on_agent_state(event: Any) -> None:
+        if event.new_state == "speaking" and user_stopped_at[0] is not None:
+            sink.record("response_latency_seconds", event.created_at - user_stopped_at[0])
+            user_stopped_at[0] = None
+
+    session.on("metrics_collected", on_metrics)
+    session.on("user_state_changed", on_user_state)
+    session.on("agent_state_changed", on_agent_state)
@@ -0,0 +1,225 @@
+"""Keep slow or failing model endpoints from stalling voice turns.
+
+The agent's ChatOpenAI talks to OpenAI through ``HedgedTransport``, an httpx
+transport that:
+
+- sends a second, identical request once the first has gone unanswered
+  for longer than the recent ``hedge_quantile`` latency (or retries at once
+  if the first fails fast); whichever answers first wins and the other is
+  cancelled, so one slow replica no longer costs the whole turn;
+- gives up on an attempt that has not answered within ``attempt_timeout``;
+- reports each request's outcome to a ``CircuitBreaker``, which opens after
+  ``failure_threshold`` failed requests in a row. While it is open requests
+  fail immediately and the task graph answers from the deterministic command
+  router instead of the agent (``create_task_manager_graph(degraded=...)``);
+  after ``reset_timeout`` one probe request is let through to test recovery.
+
+Latencies are time to response headers, which for streamed completions is
+roughly time to the first token. The per-turn deadline that bounds how long
+a caller waits for the first spoken word lives in the adapter
+(``LangGraphAdapter(turn_deadline=...)``).
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """The breaker is open; the request was not sent."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 20.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0  # times the breaker tripped
+        self._opened_at = 0.0
+
+    def is_open(self) -> bool:
+        """Whether calls are being refused right now (not once a probe is due)."""
+        return self.state == self.OPEN and self._clock() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Whether a request may be sent; claims the probe slot once the reset timeout has passed."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and not self.is_open():
+            self.state = self.HALF_OPEN
+            logger.info("🔌 Model circuit half-open, sending a probe request")
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Give back a probe slot whose request was abandoned, so the next request probes."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+            self._opened_at = self._clock() - self.reset_timeout
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("🔌 Model circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+                logger.warning(f"🔌 Model circuit open after {self.failures} failures, using the command router")
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+
+
+class LatencyWindow:
+    """The last ``size`` latencies, for percentile estimates."""
+
+    def __init__(self, size: int = 100):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _failed(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+class HedgedTransport(httpx.AsyncBaseTransport):
+    """httpx transport adding hedged requests, attempt timeouts and a circuit breaker.
+
+    Args:
+        breaker: Shared by every request through this transport
+        inner: Transport that sends each attempt (default: a pooled HTTP transport)
+        hedge_quantile: Hedge once the first attempt is slower than this latency quantile
+        hedge_delay: Hedge delay until ``min_samples`` latencies have been seen
+        min_hedge_delay: Floor for the hedge delay, so fast endpoints are not doubled
+        max_hedge_delay: Ceiling for the hedge delay
+        attempt_timeout: Seconds an attempt may wait for response headers
+        min_samples: Latencies needed before the quantile is trusted
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+        *,
+        hedge_quantile: float = 0.9,
+        hedge_delay: float = 1.0,
+        min_hedge_delay: float = 0.3,
+        max_hedge_delay: float = 2.0,
+        attempt_timeout: float = 3.0,
+        min_samples: int = 10,
+    ):
+        self.breaker = breaker
+        self._inner = inner or httpx.AsyncHTTPTransport()
+        self.hedge_quantile = hedge_quantile
+        self.initial_hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.attempt_timeout = attempt_timeout
+        self.min_samples = min_samples
+        self.latencies = LatencyWindow()
+        self.requests = 0
+        self.hedges = 0
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return self.initial_hedge_delay
+        delay = self.latencies.quantile(self.hedge_quantile)
+        return min(max(delay, self.min_hedge_delay), self.max_hedge_delay)
+
+    async def _attempt(self, request: httpx.Request) -> httpx.Response:
+        try:
+            return await asyncio.wait_for(self._inner.handle_async_request(request), self.attempt_timeout)
+        except asyncio.TimeoutError:
+            raise httpx.ReadTimeout(f"no response within {self.attempt_timeout:.1f}s", request=request) from None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpenError("model circuit is open", request=request)
+        self.requests += 1
+        await request.aread()  # both attempts send the same body
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        pending = {asyncio.create_task(self._attempt(request))}
+        hedged = False
+        winner: httpx.Response | None = None
+        failure: httpx.Response | Exception | None = None
+        try:
+            while pending and winner is None:
+                wait = None if hedged else max(0.0, started + self.hedge_delay() - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    outcome = task.exception() or task.result()
+                    if winner is None and isinstance(outcome, httpx.Response) and not _failed(outcome):
+                        winner = outcome
+                        continue
+                    if isinstance(failure, httpx.Response):
+                        await failure.aclose()
+                    failure = outcome
+                if winner is None and not hedged:
+                    # The first attempt is slow (nothing done) or already failed: send another.
+                    hedged = True
+                    self.hedges += 1
+                    logger.info(f"🪁 Hedging model request after {loop.time() - started:.2f}s")
+                    pending.add(asyncio.create_task(self._attempt(request)))
+        except asyncio.CancelledError:
+            self.breaker.release_probe()  # the caller gave up; that says nothing about the endpoint
+            raise
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+            for task in pending:
+                if not task.cancelled() and task.exception() is None:
+                    await task.result().aclose()
+
+        if winner is not None:
+            if isinstance(failure, httpx.Response):
+                await failure.aclose()
+            self.latencies.add(loop.time() - started)
+            self.breaker.record_success()
+            return winner
+        self.breaker.record_failure()
+        if isinstance(failure, httpx.Response):
+            return failure  # the client turns the status into its usual API error
+        raise failure
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def resilient_client(breaker: CircuitBreaker, *, timeout: float = 10.0, **transport_options) -> httpx.AsyncClient:
+    """httpx client for ``ChatOpenAI(http_async_client=...)``; retries belong to the transport."""
+    return httpx.AsyncClient(transport=HedgedTransport(breaker, **transport_options), timeout=timeout)
@@ -0,0 +1,64 @@
+"""Commit gate for speculative (preemptive) turns.
+
+With ``preemptive_generation`` LiveKit calls ``LLM.chat`` before the user has
+finished and cancels the stream if the final transcript differs. The graph
+may already be planning tool calls by then, so mutating tools wait on the
+turn's ``TurnGate`` before touching the task store: reads and LLM calls run
+ahead, writes happen only once the turn is confirmed, and a cancelled turn
+releases them without side effects.
+"""
+import concurrent.futures
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Longest a staged write waits for its turn to be confirmed.
+DEFAULT_COMMIT_TIMEOUT = 15.0
+
+
+class TurnAbandoned(Exception):
+    """The speculative turn was cancelled (or never confirmed); its writes were dropped."""
+
+
+class TurnGate:
+    """One-shot confirm/abort latch, safe to wait on from tool worker threads.
+
+    Tools find it at ``config["configurable"]["turn_gate"]`` and call
+    ``wait()`` before mutating; the adapter settles it from the event loop.
+    Whichever of ``confirm``/``abort`` comes first wins.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_COMMIT_TIMEOUT):
+        self.timeout = timeout
+        self._future: concurrent.futures.Future[bool] = concurrent.futures.Future()
+
+    def confirm(self) -> None:
+        self._settle(True)
+
+    def abort(self) -> None:
+        self._settle(False)
+
+    def _settle(self, confirmed: bool) -> None:
+        try:
+            self._future.set_result(confirmed)
+        except concurrent.futures.InvalidStateError:
+            pass  # already settled
+
+    @property
+    def settled(self) -> bool:
+        return self._future.done()
+
+    @property
+    def confirmed(self) -> bool:
+        return self._future.done() and self._future.result()
+
+    def wait(self) -> None:
+        """Block until the turn is confirmed; raise TurnAbandoned if it is not."""
+        try:
+            confirmed = self._future.result(self.timeout)
+        except concurrent.futures.TimeoutError:
+            logger.warning(f"⏳ Turn not confirmed within {self.timeout:.0f}s, dropping its writes")
+            self.abort()
+            confirmed = self._future.result()
+        if not confirmed:
+            raise TurnAbandoned("turn was cancelled before its writes were committed")
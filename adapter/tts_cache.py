@@ -0,0 +1,421 @@
+"""Cache synthesized speech for phrases the agent says over and over.
+
+The greeting, the adapter's fallback replies and short tool confirmations are
+re-synthesized by the vendor TTS on every call in every session, paying its
+first-byte latency and quota each time. ``CachedTTS`` wraps any LiveKit TTS
+and keeps the decoded PCM of those known phrases in ``AudioCache``: one file
+per (voice_id, model, normalized text) under a directory, memory-mapped when
+replayed and evicted least-recently-used once the directory exceeds its byte
+budget. The directory is shared by every session and worker process and
+survives restarts; ``prewarm_phrases`` fills it with a fixed phrase list.
+Free-form LLM replies are never stored, and clips are written on an executor.
+
+Streamed text is held back only while it can still match a cached phrase,
+so an uncached LLM reply reaches the vendor stream after a few tokens.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from livekit.agents import tts
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+from livekit.agents.utils import shortuuid
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<I")  # length of the JSON metadata that precedes the PCM
+_SEP = "\x1f"
+
+
+def normalize_text(text: str) -> str:
+    """NFC, with runs of whitespace collapsed; what the cache key is built from."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _touch(path: str) -> None:
+    # Explicit nanoseconds: the kernel's own timestamps are tick-coarse, too coarse to order clips.
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+class _Entry:
+    __slots__ = ("path", "size", "sample_rate", "num_channels", "offset", "map")
+
+    def __init__(self, path: str, size: int, sample_rate: int, num_channels: int, offset: int):
+        self.path = path
+        self.size = size
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.offset = offset
+        self.map: Optional[mmap.mmap] = None
+
+
+class AudioCache:
+    """Size-bounded LRU of PCM clips stored as memory-mapped files in ``directory``.
+
+    Each file is a small JSON header (key, sample rate, channels) followed by
+    16-bit PCM. Only the ``max_open`` most recently replayed files stay
+    mapped, so a large cache does not hold a file descriptor per entry.
+    The byte budget is checked against the files actually in ``directory``,
+    since other worker processes write to it too; file mtimes (bumped on
+    replay) order the eviction. ``put`` blocks on disk, so call it off the
+    event loop; a lock keeps the index consistent for readers on the loop.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 << 20, *, max_open: int = 32):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_open = max_open
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._keys: list[str] = []  # sorted, for prefix lookups
+        self._open: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def key(voice_id: str, model: str, text: str) -> str:
+        return _SEP.join((voice_id, model, normalize_text(text)))
+
+    def _load(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pcm"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    (length,) = _HEADER.unpack(f.read(_HEADER.size))
+                    meta = json.loads(f.read(length))
+                stat = os.stat(path)
+            except (OSError, ValueError, struct.error):
+                logger.warning(f"⚠️ Dropping unreadable TTS cache file {name}")
+                os.unlink(path)
+                continue
+            entry = _Entry(path, stat.st_size, meta["sample_rate"], meta["num_channels"], _HEADER.size + length)
+            files.append((stat.st_mtime, meta["key"], entry))
+        for _, key, entry in sorted(files, key=lambda item: item[0]):
+            self._add(key, entry)
+        self._evict()
+        if self._entries:
+            logger.info(f"🔊 TTS cache: {len(self._entries)} clips, {self._bytes >> 10} KiB")
+
+    def _add(self, key: str, entry: _Entry) -> None:
+        if key in self._entries:
+            self._remove(key, unlink=False)
+        self._entries[key] = entry
+        insort(self._keys, key)
+        self._bytes += entry.size
+
+    def _remove(self, key: str, unlink: bool = True) -> None:
+        entry = self._entries.pop(key)
+        del self._keys[bisect_left(self._keys, key)]
+        self._bytes -= entry.size
+        self._unmap(key, entry)
+        if unlink:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+
+    def _unmap(self, key: str, entry: _Entry) -> None:
+        self._open.pop(key, None)
+        if entry.map is not None:
+            entry.map.close()
+            entry.map = None
+
+    def _evict(self) -> None:
+        """Delete the least recently used clips until the directory fits the budget."""
+        files, total = [], 0
+        for item in os.scandir(self.directory):
+            if not item.name.endswith(".pcm"):
+                continue
+            try:
+                stat = item.stat()
+            except FileNotFoundError:
+                continue  # another worker evicted it mid-scan
+            files.append((stat.st_mtime, item.path, stat.st_size))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        keys = {entry.path: key for key, entry in self._entries.items()}
+        for _, path, size in sorted(files):
+            if total <= self.max_bytes:
+                break
+            key = keys.get(path)
+            if key is not None:
+                self._remove(key)
+            else:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Whether some cached key starts with ``prefix`` (a partial key)."""
+        with self._lock:
+            i = bisect_left(self._keys, prefix)
+            return i < len(self._keys) and self._keys[i].startswith(prefix)
+
+    def get(self, key: str, sample_rate: int, num_channels: int) -> Optional[bytes]:
+        """The clip's PCM, read from its mapped file, or None."""
+        with self._lock:
+            return self._get(key, sample_rate, num_channels)
+
+    def _get(self, key: str, sample_rate: int, num_channels: int) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or (entry.sample_rate, entry.num_channels) != (sample_rate, num_channels):
+            self.misses += 1
+            return None
+        if entry.map is None:
+            try:
+                with open(entry.path, "rb") as f:
+                    entry.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                _touch(entry.path)  # recency survives restarts and orders eviction for every worker
+            except (OSError, ValueError):
+                self._remove(key)
+                self.misses += 1
+                return None
+            while len(self._open) >= self.max_open:
+                old_key, old = self._open.popitem(last=False)
+                self._unmap(old_key, old)
+        self._open[key] = entry
+        self._open.move_to_end(key)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.map[entry.offset:]
+
+    def put(self, key: str, pcm: bytes, sample_rate: int, num_channels: int) -> None:
+        """Write a clip and evict past the budget (blocking; run it on an executor)."""
+        meta = json.dumps({"key": key, "sample_rate": sample_rate, "num_channels": num_channels}).encode()
+        name = hashlib.sha256(key.encode()).hexdigest()[:32] + ".pcm"
+        path = os.path.join(self.directory, name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".pcm")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(len(meta)))
+                f.write(meta)
+                f.write(pcm)
+            os.replace(tmp_path, path)
+            _touch(path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        size = _HEADER.size + len(meta) + len(pcm)
+        with self._lock:
+            self._add(key, _Entry(path, size, sample_rate, num_channels, _HEADER.size + len(meta)))
+            self._evict()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            for key, entry in list(self._open.items()):
+                self._unmap(key, entry)
+
+
+class CachedTTS(tts.TTS):
+    """LiveKit TTS that replays cached clips and records known phrases.
+
+    Args:
+        inner: The vendor TTS that synthesizes misses
+        cache: Where clips live
+        voice_id: Part of the cache key; clips never cross voices
+        max_chars: Segments longer than this are synthesized but not stored
+        phrases: Fixed texts worth storing when spoken (``prewarm_phrases``
+            adds its own); any other segment is synthesized but not stored
+    """
+
+    def __init__(
+        self, inner: tts.TTS, cache: AudioCache, *, voice_id: str, max_chars: int = 200, phrases: Iterable[str] = ()
+    ):
+        super().__init__(
+            # Replayed clips carry no word timings, so aligned transcripts are off.
+            capabilities=tts.TTSCapabilities(streaming=inner.capabilities.streaming),
+            sample_rate=inner.sample_rate,
+            num_channels=inner.num_channels,
+        )
+        self._inner = inner
+        self._cache = cache
+        self._voice_id = voice_id
+        self.max_chars = max_chars
+        self._phrases = {normalize_text(p) for p in phrases}
+
+    @property
+    def model(self) -> str:
+        return self._inner.model
+
+    @property
+    def provider(self) -> str:
+        return self._inner.provider
+
+    @property
+    def cache(self) -> AudioCache:
+        return self._cache
+
+    def key(self, text: str) -> str:
+        return AudioCache.key(self._voice_id, self.model, text)
+
+    def lookup(self, text: str) -> Optional[bytes]:
+        return self._cache.get(self.key(text), self.sample_rate, self.num_channels)
+
+    async def store(self, text: str, pcm: bytes) -> None:
+        """Save a known phrase's audio on an executor; other text is skipped."""
+        text = normalize_text(text)
+        if not pcm or text not in self._phrases or len(text) > self.max_chars:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._cache.put, self.key(text), pcm, self.sample_rate, self.num_channels)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not store TTS clip: {e}")
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "CachedChunkedStream":
+        return CachedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> "CachedSynthesizeStream":
+        return CachedSynthesizeStream(tts=self, conn_options=conn_options)
+
+    async def prewarm_phrases(self, phrases: Iterable[str]) -> int:
+        """Synthesize and store every phrase not cached yet; returns how many were synthesized."""
+        synthesized = 0
+        for phrase in dict.fromkeys(normalize_text(p) for p in phrases):
+            self._phrases.add(phrase)
+            if phrase and self.lookup(phrase) is None:
+                async with self.synthesize(phrase) as stream:
+                    async for _ in stream:
+                        pass
+                synthesized += 1
+        return synthesized
+
+    def prewarm(self) -> None:
+        self._inner.prewarm()
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def _pcm(event: tts.SynthesizedAudio) -> bytes:
+    return event.frame.data.tobytes()
+
+
+class CachedChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: CachedTTS, input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._cached_tts = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        cached_tts = self._cached_tts
+        output_emitter.initialize(
+            request_id=shortuuid(),
+            sample_rate=cached_tts.sample_rate,
+            num_channels=cached_tts.num_channels,
+            mime_type="audio/pcm",
+        )
+        clip = cached_tts.lookup(self.input_text)
+        if clip is not None:
+            output_emitter.push(clip)
+            output_emitter.flush()
+            return
+
+        parts: list[bytes] = []
+        async with cached_tts._inner.synthesize(self.input_text, conn_options=self._conn_options) as stream:
+            async for event in stream:
+                pcm = _pcm(event)
+                if event.is_final and not pcm.strip(b"\0"):
+                    continue  # the padding frame every chunked stream ends with; ours adds its own
+                parts.append(pcm)
+                output_emitter.push(pcm)
+        output_emitter.flush()
+        await cached_tts.store(self.input_text, b"".join(parts))
+
+
+class CachedSynthesizeStream(tts.SynthesizeStream):
+    """One segment: replayed from the cache if its text is cached, else streamed by the inner TTS."""
+
+    def __init__(self, *, tts: CachedTTS, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, conn_options=conn_options)
+        self._cached_tts = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        cached_tts = self._cached_tts
+        output_emitter.initialize(
+            request_id=shortuuid(),
+            sample_rate=cached_tts.sample_rate,
+            num_channels=cached_tts.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        text = ""
+        inner: Optional[tts.SynthesizeStream] = None
+        forward: Optional[asyncio.Task[bytes]] = None
+        try:
+            async for token in self._input_ch:
+                if isinstance(token, self._FlushSentinel):
+                    break
+                text += token
+                if inner is None:
+                    if cached_tts.cache.has_prefix(cached_tts.key(text)):
+                        continue  # may still be a cached phrase
+                    inner, forward = self._start_inner(output_emitter)
+                    inner.push_text(text)
+                else:
+                    inner.push_text(token)
+
+            if not text.strip():
+                return
+            if inner is None:
+                clip = cached_tts.lookup(text)
+                if clip is not None:
+                    output_emitter.start_segment(segment_id=shortuuid())
+                    output_emitter.push(clip)
+                    output_emitter.end_segment()
+                    return
+                inner, forward = self._start_inner(output_emitter)
+                inner.push_text(text)
+
+            inner.end_input()
+            pcm = await forward
+            await cached_tts.store(text, pcm)
+        finally:
+            if forward is not None and not forward.done():
+                forward.cancel()
+            if inner is not None:
+                await inner.aclose()
+
+    def _start_inner(self, output_emitter: tts.AudioEmitter) -> tuple[tts.SynthesizeStream, asyncio.Task[bytes]]:
+        inner = self._cached_tts._inner.stream(conn_options=self._conn_options)
+        output_emitter.start_segment(segment_id=shortuuid())
+
+        async def forward() -> bytes:
+            parts: list[bytes] = []
+            async for event in inner:
+                pcm = _pcm(event)
+                parts.append(pcm)
+                output_emitter.push(pcm)
+            output_emitter.end_segment()
+            return b"".join(parts)
+
+        return inner, asyncio.create_task(forward())
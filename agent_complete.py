@@ -1,12 +1,23 @@
 from dotenv import load_dotenv
+import asyncio
 import logging
 import os
+import time
 from livekit import agents
-from livekit.agents import AgentSession, Agent, JobContext, WorkerOptions, RoomInputOptions
+from livekit.agents import AgentSession, Agent, JobContext, JobProcess, WorkerOptions, RoomInputOptions
 from livekit.plugins import noise_cancellation, silero, google, openai
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
-from task_manager.graph_simple import create_task_manager_graph
-from adapter.langgraph import LangGraphAdapter
+from task_manager.graph_simple import DEGRADED_REPLY, NO_TASKS_REPLY, STORES, create_checkpointer, create_task_manager_graph, session_config
+from adapter.langgraph import FALLBACK_REPLIES, LangGraphAdapter, ResponseCache, attach_turn_confirmation, session_thread_id
+from adapter.endpointing import EndpointingController, attach_endpointing
+from adapter.metrics import attach_session_metrics, create_sink
+from adapter.resilience import CircuitBreaker, resilient_client
+from adapter.tts_cache import AudioCache, CachedTTS
+from task_manager import tools as task_tools
+from task_manager.reminders import ReminderScheduler
+from task_manager.store import TaskStore
+from task_manager.render import speakable
+from config.settings import settings
 from livekit.plugins import elevenlabs
 
 
@@ -14,33 +25,116 @@ load_dotenv(".env.local")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+VOICE_ID = "pNInz6obpgDQGcFmaJgB"
+TTS_MODEL = "eleven_multilingual_v2"
+GREETING = "Hi! I'm your voice task manager. Say 'add task buy groceries' or 'list my tasks' to get started."
+
+# The VAD reports end of speech after this much silence; endpointing delays count from speech end
+VAD_MIN_SILENCE = 0.55
+
+# Said verbatim in many sessions; synthesized once into the TTS cache, then replayed
+PREWARM_PHRASES = (GREETING, NO_TASKS_REPLY, DEGRADED_REPLY, *FALLBACK_REPLIES)
+
 class TaskManagerAgent(Agent):
     def __init__(self):
         super().__init__(instructions="You are a helpful voice task manager.")
 
-async def entrypoint(ctx: JobContext):
-    logger.info("🚀 Starting SMOOTH Voice Task Manager...")
-    
-    # Verify credentials
-    google_creds = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-    openai_key = os.getenv('OPENAI_API_KEY')
-    
-    if not openai_key:
-        raise ValueError("Missing OPENAI_API_KEY")
-    if not os.path.exists(google_creds):
-        raise ValueError("Missing Google Cloud credentials")
-        
-    logger.info("✅ All credentials verified")
-    
-    # Create optimized ReAct agent
-    task_graph = create_task_manager_graph()
-    logger.info("✅ Optimized ReAct agent created")
+def load_shared(userdata: dict) -> None:
+    """Load the process-wide pieces every job reuses: VAD weights, the compiled graph, the TTS cache, metrics.
+
+    The graph is immutable once compiled (per-session state travels in its
+    config), so sharing it also shares its ChatOpenAI clients and their
+    connection pools. With the SQLite checkpointer the graph is built by
+    ``shared_graph`` instead, since that saver binds to the job's event loop.
+    One metrics sink per process, so its histograms cover every session it
+    runs, and one circuit breaker, since every session shares the same
+    OpenAI endpoint.
+    """
+    if "metrics" not in userdata:
+        userdata["metrics"] = create_sink(settings.METRICS_SINK, settings.METRICS_FILE)
+    if "breaker" not in userdata:
+        userdata["breaker"] = (
+            CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET) if settings.LLM_RESILIENCE else None
+        )
+    if "vad" not in userdata:
+        userdata["vad"] = silero.VAD.load(min_silence_duration=VAD_MIN_SILENCE)
+    if "graph" not in userdata and settings.LANGGRAPH_CHECKPOINTER != "sqlite":
+        userdata["graph"] = build_graph(userdata["breaker"])
+    if "tts_cache" not in userdata and settings.TTS_CACHE_MAX_MB:
+        userdata["tts_cache"] = AudioCache(settings.TTS_CACHE_DIR, settings.TTS_CACHE_MAX_MB << 20)
+
+def build_graph(breaker: CircuitBreaker | None = None):
+    """Optimized ReAct agent (opt-in checkpointer keeps history inside LangGraph)."""
+    checkpointer = None
+    if settings.LANGGRAPH_CHECKPOINTER:
+        checkpointer = create_checkpointer(settings.LANGGRAPH_CHECKPOINTER)
+    if breaker is None:
+        return create_task_manager_graph(checkpointer=checkpointer)
+    # Hedged, circuit-broken model calls; while the breaker is open only the command router answers
+    return create_task_manager_graph(
+        checkpointer=checkpointer,
+        http_async_client=resilient_client(
+            breaker,
+            attempt_timeout=settings.LLM_ATTEMPT_TIMEOUT,
+            hedge_quantile=settings.LLM_HEDGE_QUANTILE,
+        ),
+        degraded=breaker.is_open,
+    )
+
+def shared_graph(userdata: dict):
+    graph = userdata.get("graph")
+    if graph is None:
+        graph = userdata["graph"] = build_graph(userdata.get("breaker"))
+    return graph
+
+def build_tts(shared: dict):
+    """ElevenLabs voice, behind the process's audio cache when one is configured."""
+    voice = elevenlabs.TTS(voice_id=VOICE_ID, model=TTS_MODEL)
+    if "tts_cache" not in shared:
+        return voice
+    return CachedTTS(
+        inner=voice,
+        cache=shared["tts_cache"],
+        voice_id=VOICE_ID,
+        max_chars=settings.TTS_CACHE_MAX_CHARS,
+        phrases=PREWARM_PHRASES,
+    )
+
+async def prewarm_phrases(tts: CachedTTS) -> None:
+    try:
+        synthesized = await tts.prewarm_phrases(PREWARM_PHRASES)
+    except Exception as e:
+        logger.warning(f"⚠️ TTS cache prewarm failed: {e}")
+        return
+    if synthesized:
+        logger.info(f"🔊 Pre-synthesized {synthesized} phrases into the TTS cache")
+
+def prewarm(proc: JobProcess):
+    """Runs once per worker process, before it is handed a job."""
+    start = time.perf_counter()
+    load_shared(proc.userdata)
+    logger.info(f"🔥 Prewarmed VAD and task graph in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+def create_session(shared: dict, thread_id: str) -> AgentSession:
+    """Per-session state only: task store, caches, adapter and the vendor streams."""
+    graph_config = session_config(thread_id)
+    task_store = graph_config["configurable"]["task_store"]
+    response_cache = None
+    if settings.RESPONSE_CACHE_SIZE:
+        response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL)
     
     # Create session with FIXED configuration
-    session = AgentSession(
+    return AgentSession(
         llm=LangGraphAdapter(
-            graph=task_graph,
-            config={}
+            graph=shared_graph(shared),  # Compiled once per process
+            config=graph_config,  # Per-caller task store, no shared state
+            streaming=True,  # Speak AI deltas as they arrive instead of after the whole graph
+            checkpointing=bool(settings.LANGGRAPH_CHECKPOINTER),  # Send only new messages per turn
+            response_cache=response_cache,  # Repeated "list tasks" skips the graph until tasks change
+            store_version=lambda: task_store.version,
+            metrics=shared["metrics"],  # Per-turn graph/tool latency spans (None = no timing)
+            speculative=True,  # Preemptive turns hold task writes until LiveKit commits them
+            turn_deadline=settings.LLM_TURN_DEADLINE or None,  # Apologize instead of leaving the caller waiting
         ),
         
         # Google Cloud STT
@@ -51,21 +145,70 @@ async def entrypoint(ctx: JobContext):
             interim_results=True
         ),
         
-        # OpenAI TTS
-        tts=elevenlabs.TTS(
-        voice_id="pNInz6obpgDQGcFmaJgB",
-        model="eleven_multilingual_v2"
-        ),
+        # ElevenLabs TTS; cached phrases replay from disk without a vendor round trip
+        tts=build_tts(shared),
         
-        # FIXED: Use default VAD configuration (no custom parameters)
+        # The turn detector needs the job's inference executor, so it is built per job;
+        # its model itself is loaded once per worker by the inference process.
         turn_detection=MultilingualModel(),
-        vad=silero.VAD.load(),  # <-- FIXED: Remove all unsupported parameters
+        vad=shared["vad"],  # Loaded once per process in prewarm
         
         # Performance optimizations
         preemptive_generation=True,
-        min_endpointing_delay=0.2,
-        max_endpointing_delay=2.0,
+        min_endpointing_delay=settings.ENDPOINTING_MIN_DELAY,  # Retuned per caller when adaptive
+        max_endpointing_delay=settings.ENDPOINTING_MAX_DELAY,
+    )
+
+def start_reminders(session: AgentSession, task_store: TaskStore) -> ReminderScheduler:
+    """Speak up in ``session`` when one of its tasks comes due (set_due_date in the graph).
+
+    Timer-driven: the loop sleeps until the caller's next due task.
+    """
+    reminders = ReminderScheduler(
+        task_store,
+        lambda todo: session.say(f"Reminder: {speakable(todo['task'])} is due now."),
+        lead=settings.REMINDER_LEAD,
     )
+    reminders.start()
+    return reminders
+
+async def entrypoint(ctx: JobContext):
+    logger.info("🚀 Starting SMOOTH Voice Task Manager...")
+    
+    # Verify credentials
+    google_creds = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+    openai_key = os.getenv('OPENAI_API_KEY')
+    
+    if not openai_key:
+        raise ValueError("Missing OPENAI_API_KEY")
+    if not os.path.exists(google_creds):
+        raise ValueError("Missing Google Cloud credentials")
+        
+    logger.info("✅ All credentials verified")
+    
+    # No-op when prewarm already ran in this process
+    load_shared(ctx.proc.userdata)
+    
+    metrics = ctx.proc.userdata["metrics"]
+    participant_identity = ctx.job.participant.identity if ctx.job.HasField("participant") else None
+    thread_id = session_thread_id(ctx.job.room.name, participant_identity)
+    session = create_session(ctx.proc.userdata, thread_id)
+    attach_turn_confirmation(session, session.llm)
+    
+    if settings.ENDPOINTING_ADAPTIVE:
+        # Learns this caller's pauses: quicker turns for fast talkers, fewer cut-offs for slow ones
+        endpointing = EndpointingController(
+            settings.ENDPOINTING_MIN_DELAY, settings.ENDPOINTING_MAX_DELAY, sink=metrics, vad_silence=VAD_MIN_SILENCE
+        )
+        attach_endpointing(session, endpointing)
+    
+    if metrics is not None:
+        attach_session_metrics(session, metrics)
+        
+        async def flush_metrics():
+            await asyncio.get_running_loop().run_in_executor(task_tools.IO_EXECUTOR, metrics.flush)
+        
+        ctx.add_shutdown_callback(flush_metrics)
     
     await session.start(
         agent=TaskManagerAgent(),
@@ -80,11 +223,34 @@ async def entrypoint(ctx: JobContext):
     logger.info("✅ Optimized for smooth voice interaction")
     
     # Brief, clear greeting
-    await session.say(
-        "Hi! I'm your voice task manager. Say 'add task buy groceries' or 'list my tasks' to get started."
-    )
+    await session.say(GREETING)
+    
+    if settings.TASK_REMINDERS:
+        reminders = start_reminders(session, STORES.get(thread_id))
+        
+        async def stop_reminders():
+            reminders.close()
+        
+        ctx.add_shutdown_callback(stop_reminders)
+    
+    async def release_tasks():
+        # The session's in-memory TaskStore would otherwise outlive the job in this worker
+        STORES.drop(thread_id)
+        # Syncs and releases the caller's task storage, if a storage tool opened one
+        await asyncio.get_running_loop().run_in_executor(task_tools.IO_EXECUTOR, task_tools.close_storage, thread_id)
+    
+    ctx.add_shutdown_callback(release_tasks)
+    
+    if isinstance(session.tts, CachedTTS):
+        # Fills the shared cache after the greeting; a no-op once every phrase is on disk
+        prewarm_task = asyncio.create_task(prewarm_phrases(session.tts))
+        
+        async def stop_prewarm():
+            prewarm_task.cancel()
+        
+        ctx.add_shutdown_callback(stop_prewarm)
     
     await ctx.connect()
 
 if __name__ == "__main__":
-    agents.cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    agents.cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -0,0 +1,7 @@
+"""Offline micro- and macro-benchmarks. Run each module with ``python -m benchmarks.<name>``."""
+import os
+
+# config.settings validates these on first use; benchmarks never reach the real services.
+for _name in ("OPENAI_API_KEY", "GOOGLE_APPLICATION_CREDENTIALS", "ELEVEN_API_KEY",
+              "LIVEKIT_URL", "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET"):
+    os.environ.setdefault(_name, "bench")
@@ -0,0 +1,95 @@
+"""Benchmark: LLM round-trips for a compound command with single, parallel and batch tools.
+
+"add milk, eggs and bread, and complete task 3" against a store that already
+holds three tasks. The scripted fake model either makes one tool call per
+round (what a token-capped model tends to do), emits all single-task calls in
+one message, or uses the batch tools. Each model call waits ``LATENCY``.
+
+    python -m benchmarks.bench_batch_tools
+"""
+import asyncio
+import json
+import logging
+import time
+
+from langchain_core.messages import AIMessage, BaseMessage
+from livekit.agents import llm
+
+from adapter.langgraph import LangGraphAdapter
+from benchmarks.fakes import FakeChatModel
+from task_manager import graph_simple
+
+LATENCY = 0.35
+COMMAND = "add milk, eggs and bread, and complete task 3"
+
+SINGLE_CALLS = [
+    {"name": "add_todo", "args": {"task": "milk"}},
+    {"name": "add_todo", "args": {"task": "eggs"}},
+    {"name": "add_todo", "args": {"task": "bread"}},
+    {"name": "complete_todo", "args": {"todo_id": 3}},
+]
+BATCH_CALLS = [
+    {"name": "add_todos", "args": {"tasks": ["milk", "eggs", "bread"]}},
+    {"name": "complete_todos", "args": {"todo_ids": [3]}},
+]
+
+
+def with_ids(calls: list[dict], offset: int = 0) -> list[dict]:
+    return [{**call, "id": f"call_{offset + i}"} for i, call in enumerate(calls)]
+
+
+def sequential(messages: list[BaseMessage]) -> AIMessage:
+    done = sum(1 for m in messages if m.type == "tool")
+    if done < len(SINGLE_CALLS):
+        return AIMessage(content="", tool_calls=with_ids(SINGLE_CALLS[done:done + 1], done))
+    return AIMessage(content="Added milk, eggs and bread and completed task 3.")
+
+
+def parallel(messages: list[BaseMessage]) -> AIMessage:
+    if messages[-1].type != "tool":
+        return AIMessage(content="", tool_calls=with_ids(SINGLE_CALLS))
+    return AIMessage(content="Added milk, eggs and bread and completed task 3.")
+
+
+def batched(messages: list[BaseMessage]) -> AIMessage:
+    if messages[-1].type != "tool":
+        return AIMessage(content="", tool_calls=with_ids(BATCH_CALLS))
+    return AIMessage(content="Added milk, eggs and bread and completed task 3.")
+
+
+async def run(policy, name: str) -> tuple[float, int]:
+    model = FakeChatModel(respond=policy, latency=LATENCY, finished_at=[], inputs=[])
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=False)
+    config = graph_simple.session_config(f"bench-batch-{name}")
+    config["configurable"]["task_store"].add_many(["pay rent", "call mom", "walk dog"])
+    adapter = LangGraphAdapter(graph=graph, config=config, streaming=True)
+
+    chat_ctx = llm.ChatContext.empty()
+    chat_ctx.add_message(role="user", content=COMMAND)
+    start = time.perf_counter()
+    async for _ in adapter.chat(chat_ctx=chat_ctx):
+        pass
+    elapsed = time.perf_counter() - start
+
+    store = config["configurable"]["task_store"]
+    assert [t["task"] for t in store] == ["pay rent", "call mom", "walk dog", "milk", "eggs", "bread"]
+    assert store.get(3)["completed"]
+    return elapsed, model.calls
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    print(f"fake LLM latency {LATENCY * 1000:.0f} ms/call: {COMMAND!r}")
+    print(f"{'tools':>10} {'LLM calls':>10} {'turn ms':>9} {'tool-call JSON chars':>21}")
+    # JSON size of the tool calls the model has to generate (output tokens ~ chars / 4)
+    for name, policy, calls_json in (
+        ("sequential", sequential, SINGLE_CALLS),
+        ("parallel", parallel, SINGLE_CALLS),
+        ("batched", batched, BATCH_CALLS),
+    ):
+        elapsed, calls = asyncio.run(run(policy, name))
+        print(f"{name:>10} {calls:>10} {elapsed * 1e3:>9.1f} {len(json.dumps(calls_json)):>21}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Microbenchmark: LiveKit ChatContext -> LangGraph state conversion per turn.
+
+Compares rebuilding every LangChain message (uncached) against the per-session
+MessageCache used by LangGraphAdapter, for 10/100/1000-item contexts.
+
+    python -m benchmarks.bench_chat_ctx
+"""
+import time
+
+from livekit.agents import llm
+
+from adapter.langgraph import MessageCache, _item_to_message
+
+SIZES = (10, 100, 1000)
+TURNS = 50
+
+
+def build_ctx(size: int) -> llm.ChatContext:
+    chat_ctx = llm.ChatContext.empty()
+    chat_ctx.add_message(role="system", content="You are a voice task manager.")
+    for i in range(size - 1):
+        role = "user" if i % 2 == 0 else "assistant"
+        chat_ctx.add_message(role=role, content=f"utterance number {i} add task buy item {i}")
+    return chat_ctx
+
+
+def convert_uncached(items) -> list:
+    return [m for item in items if (m := _item_to_message(item)) is not None]
+
+
+def bench(size: int) -> tuple[float, float]:
+    """Return per-turn microseconds for (uncached, cached) conversion."""
+    chat_ctx = build_ctx(size)
+    items = chat_ctx.items
+
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        convert_uncached(items)
+    uncached = (time.perf_counter() - start) / TURNS * 1e6
+
+    cache = MessageCache()
+    cache.convert(items)  # first turn converts everything
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        cache.convert(items)
+    cached = (time.perf_counter() - start) / TURNS * 1e6
+
+    return uncached, cached
+
+
+def main() -> None:
+    print(f"{'items':>6} {'uncached us/turn':>18} {'cached us/turn':>16} {'speedup':>8}")
+    for size in SIZES:
+        uncached, cached = bench(size)
+        print(f"{size:>6} {uncached:>18.1f} {cached:>16.1f} {uncached / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark: due-date range queries and reminder scheduling at 100k tasks.
+
+Range queries go through JournalStorage's DueIndex and are compared with
+the scan they replace (filter every task, then sort). The reminder queue is
+driven through a simulated day by a fake clock: it wakes once per distinct
+due instant, where a poller would re-scan every task each minute.
+
+    python -m benchmarks.bench_due_index
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from task_manager.due_index import DueIndex
+from task_manager.records import Status, TaskRecord, day_start
+from task_manager.reminders import ReminderQueue, ReminderScheduler
+from task_manager.storage import JournalStorage, open_due
+
+TASKS = 100_000
+QUERIES = 200
+NOW = 1_741_788_000.0  # fixed "now" for the fake clock
+DAY = 86_400.0
+
+
+def make_tasks(n: int, rng: random.Random) -> list[TaskRecord]:
+    """Due dates spread over a month either side of NOW; some done, some undated."""
+    tasks = []
+    for i in range(n):
+        due = NOW + rng.uniform(-30, 30) * DAY if rng.random() < 0.9 else None
+        status = Status.COMPLETED if rng.random() < 0.2 else Status.PENDING
+        tasks.append(TaskRecord(f"task_{i}", f"errand {i}", status=status, due_date=due, created_at=NOW))
+    return tasks
+
+
+def per_query_us(fn, queries: int = QUERIES) -> float:
+    start = time.perf_counter()
+    for _ in range(queries):
+        fn()
+    return (time.perf_counter() - start) / queries * 1e6
+
+
+def scan(storage: JournalStorage, start, end, limit: int = 5) -> list[TaskRecord]:
+    """What a range query costs without the index."""
+    hits = [
+        t for t in storage.all()
+        if (due := open_due(t)) is not None and (start is None or due >= start) and (end is None or due < end)
+    ]
+    hits.sort(key=lambda t: t.due_date)
+    return hits[:limit]
+
+
+def bench_queries(storage: JournalStorage) -> None:
+    windows = {
+        "overdue": (None, NOW),
+        "today": (day_start(NOW), day_start(NOW, 1)),
+        "next 7 days": (NOW, day_start(NOW, 8)),
+    }
+    print(f"{'window':>12} {'matches':>8} {'index us':>9} {'scan us':>9}")
+    for name, (start, end) in windows.items():
+        assert [t.id for t in storage.due_between(start, end, 0, 5)] == [t.id for t in scan(storage, start, end)]
+        indexed = per_query_us(lambda: (storage.count_due(start, end), storage.due_between(start, end, 0, 5)))
+        scanned = per_query_us(lambda: scan(storage, start, end), queries=5)
+        print(f"{name:>12} {storage.count_due(start, end):>8} {indexed:>9.1f} {scanned:>9.0f}")
+
+
+def bench_maintenance(storage: JournalStorage, rng: random.Random) -> None:
+    tasks = [t for t in storage.all() if open_due(t) is not None]
+    index = DueIndex()
+    index.rebuild((t.id, t.due_date) for t in tasks)
+    moves = [(rng.choice(tasks).id, NOW + rng.uniform(-30, 30) * DAY) for _ in range(5_000)]
+    start = time.perf_counter()
+    for task_id, due in moves:
+        index.set(task_id, due)
+    index_us = (time.perf_counter() - start) / len(moves) * 1e6
+
+    start = time.perf_counter()
+    for task in tasks[:2_000]:
+        task.due_date += 3600
+        storage.put(task)
+    put_us = (time.perf_counter() - start) / 2_000 * 1e6
+    print(f"moving a due date: {index_us:.1f} us in the index, {put_us:.1f} us for the whole journaled put")
+
+
+def bench_reminders(storage: JournalStorage, rng: random.Random) -> None:
+    async def load() -> tuple[float, int]:
+        reminders = ReminderScheduler(storage, lambda task: None, clock=lambda: NOW)
+        start = time.perf_counter()
+        reminders.start()
+        took = time.perf_counter() - start
+        queued = len(reminders.queue)
+        reminders.close()
+        return took, queued
+
+    took, queued = asyncio.run(load())
+    print(f"scheduler start: {queued} upcoming reminders queued in {took * 1e3:.0f} ms")
+
+    queue = ReminderQueue()
+    upcoming = storage.due_between(NOW)
+    for task in upcoming:
+        queue.schedule(task.id, task.due_date)
+    for task in rng.sample(upcoming, min(5_000, len(upcoming))):  # edits while the day goes on
+        queue.schedule(task.id, task.due_date + rng.uniform(-1, 1) * 3600)
+
+    # Fake clock: jump straight to each next due instant, as the armed timer would.
+    clock, wakeups, fired = NOW, 0, 0
+    start = time.perf_counter()
+    while (due := queue.next_due()) is not None and due < NOW + DAY:
+        clock = due
+        wakeups += 1
+        fired += len(queue.pop_due(clock))
+    elapsed = time.perf_counter() - start
+
+    poll_scan = per_query_us(lambda: scan(storage, NOW, NOW + 60), queries=3) / 1e6
+    polls = int(DAY / 60)
+    print(f"one simulated day: {fired} reminders, {wakeups} timer wakeups, "
+          f"{elapsed * 1e3:.0f} ms total ({elapsed / max(fired, 1) * 1e6:.1f} us per reminder)")
+    print(f"polling every minute instead: {polls} wakeups x {poll_scan * 1e3:.0f} ms scan = {polls * poll_scan:.0f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=TASKS)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = JournalStorage(f"{directory}/tasks.json", fsync_batch=1 << 30, compact_every=1 << 30)
+        start = time.perf_counter()
+        for task in make_tasks(args.tasks, rng):
+            storage.put(task)
+        print(f"{args.tasks} tasks stored in {time.perf_counter() - start:.1f} s, "
+              f"{len(storage._due)} open with a due date")
+        bench_queries(storage)
+        bench_maintenance(storage, rng)
+        bench_reminders(storage, rng)
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Benchmark: end-to-end turn latency through LangGraphAdapter, fully offline.
+
+Builds the task-manager graph with a fake ChatOpenAI (configurable first-token
+latency, token rate and tool-call script), drives scripted multi-turn
+conversations through ``LangGraphAdapter`` for 1..N concurrent sessions and
+reports time-to-first-chunk, turn time, throughput and tracemalloc
+allocations per turn. Results are written as JSON for release-to-release
+comparison.
+
+    python -m benchmarks.bench_e2e --sessions 1 10 50 --output bench_e2e.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any
+
+from livekit.agents import llm
+
+from adapter.langgraph import LangGraphAdapter
+from adapter.metrics import Histogram
+from benchmarks.fakes import FakeChatModel, ScriptedResponder
+from task_manager import graph_simple
+
+CONVERSATION = [
+    "hello",
+    "add task buy milk",
+    "add task call mom",
+    "what do I have",
+    "complete task 1",
+    "list tasks",
+    "delete task 2",
+    "thanks",
+]
+
+# What the fake LLM does for utterances that are not plain "add task X".
+SCRIPT = {
+    "hello": "Hi! Try 'add task' or 'list tasks'.",
+    "what do I have": ("list_todos", {}),
+    "complete task 1": ("complete_todo", {"todo_id": 1}),
+    "list tasks": ("list_todos", {}),
+    "delete task 2": ("delete_todo", {"todo_id": 2}),
+    "thanks": "You're welcome! Anything else?",
+}
+
+
+def build_adapter(graph: Any, session_id: str) -> LangGraphAdapter:
+    return LangGraphAdapter(graph=graph, config=graph_simple.session_config(session_id), streaming=True)
+
+
+async def run_turn(adapter: LangGraphAdapter, chat_ctx: llm.ChatContext, text: str) -> tuple[float, float]:
+    """One user turn; returns (time to first chunk, total turn time) in seconds."""
+    chat_ctx.add_message(role="user", content=text)
+    start = time.perf_counter()
+    first_chunk, reply = None, ""
+    async with adapter.chat(chat_ctx=chat_ctx) as stream:
+        async for chunk in stream:
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            reply += chunk.delta.content
+    total = time.perf_counter() - start
+    chat_ctx.add_message(role="assistant", content=reply)
+    return (first_chunk if first_chunk is not None else total), total
+
+
+async def run_session(adapter: LangGraphAdapter, turns: list[str]) -> list[tuple[float, float]]:
+    chat_ctx = llm.ChatContext.empty()
+    return [await run_turn(adapter, chat_ctx, text) for text in turns]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    histogram = Histogram(window=len(samples))
+    for value in samples:
+        histogram.observe(value * 1e3)
+    return {**{k: round(v, 3) for k, v in histogram.percentiles().items()},
+            "max": round(max(samples) * 1e3, 3)}
+
+
+async def run_concurrent(model: FakeChatModel, graph: Any, sessions: int, turns: list[str], run_id: str) -> dict:
+    adapters = [build_adapter(graph, f"bench-{run_id}-{i}") for i in range(sessions)]
+    calls_before = model.calls
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_session(adapter, turns) for adapter in adapters))
+    wall = time.perf_counter() - start
+
+    timings = [timing for session in results for timing in session]
+    return {
+        "sessions": sessions,
+        "turns": len(timings),
+        "wall_s": round(wall, 4),
+        "throughput_turns_per_s": round(len(timings) / wall, 2),
+        "ttfc_ms": summarize([ttfc for ttfc, _ in timings]),
+        "turn_ms": summarize([total for _, total in timings]),
+        "llm_calls": model.calls - calls_before,
+    }
+
+
+async def measure_allocations(graph: Any, turns: list[str]) -> dict:
+    """tracemalloc bytes per turn for one session (timing is not measured here)."""
+    adapter = build_adapter(graph, "bench-alloc")
+    chat_ctx = llm.ChatContext.empty()
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for text in turns:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await run_turn(adapter, chat_ctx, text)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib_per_turn": {"mean": round(sum(peaks) / len(peaks) / 1024, 1), "max": round(max(peaks) / 1024, 1)},
+        "retained_kib_per_turn": {"mean": round(sum(retained) / len(retained) / 1024, 1)},
+    }
+
+
+def environment() -> dict[str, str]:
+    versions = {}
+    for package in ("langgraph", "langchain-core", "livekit-agents"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = "missing"
+    return {"python": sys.version.split()[0], "platform": platform.platform(), **versions}
+
+
+def make_graph(model: FakeChatModel, use_fast_path: bool) -> Any:
+    return graph_simple.create_task_manager_graph(model=model, use_fast_path=use_fast_path)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    turns = CONVERSATION * args.repeat
+    model = FakeChatModel(
+        respond=ScriptedResponder(SCRIPT),
+        latency=args.latency,
+        token_delay=1.0 / args.token_rate if args.token_rate else 0.0,
+        finished_at=[], inputs=[],
+    )
+    graph = make_graph(model, args.fast_path)
+
+    runs = []
+    for sessions in args.sessions:
+        runs.append(await run_concurrent(model, graph, sessions, turns, run_id=str(sessions)))
+        model.inputs.clear()
+        model.finished_at.clear()
+
+    instant = FakeChatModel(respond=ScriptedResponder(SCRIPT), finished_at=[], inputs=[])
+    allocations = await measure_allocations(make_graph(instant, args.fast_path), turns)
+
+    return {
+        "benchmark": "e2e_turn_latency",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "params": {
+            "latency_s": args.latency,
+            "token_rate": args.token_rate,
+            "fast_path": args.fast_path,
+            "turns_per_session": len(turns),
+        },
+        "runs": runs,
+        "allocations": allocations,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50],
+                        help="concurrent session counts to run")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM first-token latency, seconds")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="fake LLM words per second (0 = instant)")
+    parser.add_argument("--repeat", type=int, default=1, help="times to repeat the scripted conversation")
+    parser.add_argument("--fast-path", action=argparse.BooleanOptionalAction, default=True,
+                        help="route exact commands around the LLM")
+    parser.add_argument("--output", default="bench_e2e.json", help="where to write the JSON results")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> dict:
+    logging.disable(logging.INFO)
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"fake LLM {args.latency * 1000:.0f} ms first token, {args.token_rate:g} words/s, "
+          f"fast path {'on' if args.fast_path else 'off'}")
+    print(f"{'sessions':>8} {'turns/s':>8} {'ttfc p50':>9} {'ttfc p95':>9} {'turn p50':>9} {'turn p95':>9}")
+    for r in results["runs"]:
+        print(f"{r['sessions']:>8} {r['throughput_turns_per_s']:>8.1f} {r['ttfc_ms']['p50']:>9.1f} "
+              f"{r['ttfc_ms']['p95']:>9.1f} {r['turn_ms']['p50']:>9.1f} {r['turn_ms']['p95']:>9.1f}")
+    alloc = results["allocations"]
+    print(f"allocations: {alloc['peak_kib_per_turn']['mean']} KiB peak/turn, "
+          f"{alloc['retained_kib_per_turn']['mean']} KiB retained/turn")
+    print(f"wrote {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: fixed vs adaptive endpointing delays over replayed VAD timelines.
+
+Each timeline is endpointed twice: with the stock 0.2 s / 2.0 s delays and
+with an EndpointingController learning the caller's pauses as it plays.
+Synthetic callers range from fast to slow talkers; ``--timeline`` replays a
+recorded one instead (JSON lines of start, end, likely_done, turn_end).
+
+    python -m benchmarks.bench_endpointing
+"""
+import argparse
+import json
+import random
+
+from adapter.endpointing import EndpointingController, ReplayStats, Segment, replay
+from adapter.metrics import InMemorySink
+from benchmarks.fakes import talker_timeline
+
+TALKERS = {"fast": 0.3, "average": 0.55, "slow": 0.8, "very slow": 1.1}  # median pause, seconds
+
+
+def load_timeline(path: str) -> list[Segment]:
+    with open(path) as f:
+        return [Segment(**json.loads(line)) for line in f if line.strip()]
+
+
+def p95(stats: ReplayStats) -> float:
+    ordered = sorted(stats.latencies)
+    return ordered[int(0.95 * (len(ordered) - 1))] if ordered else 0.0
+
+
+def compare(name: str, timeline: list[Segment]) -> None:
+    fixed = replay(timeline, min_delay=0.2, max_delay=2.0)
+    sink = InMemorySink()
+    controller = EndpointingController(0.2, 2.0, sink=sink)
+    adaptive = replay(timeline, controller)
+    for label, stats in (("fixed", fixed), ("adaptive", adaptive)):
+        print(f"{name:>10} {label:>9} {stats.turns:>6} {stats.false_endpoint_rate:>12.1%} "
+              f"{stats.mean_latency:>9.2f} {p95(stats):>8.2f}")
+    print(f"{'':>10} {'':>9} learned {controller.min_delay:.2f}s / {controller.max_delay:.2f}s "
+          f"from {controller.pauses} pauses in {controller.updates} updates")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--timeline", help="replay a recorded timeline instead of the synthetic callers")
+    args = parser.parse_args()
+
+    print(f"{'caller':>10} {'delays':>9} {'turns':>6} {'false ends':>12} {'mean s':>9} {'p95 s':>8}")
+    if args.timeline:
+        compare("recorded", load_timeline(args.timeline))
+        return
+    for name, pause_median in TALKERS.items():
+        compare(name, talker_timeline(random.Random(0), pause_median, turns=args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: cold vs prewarmed job start in agent_complete.
+
+Cold start loads the VAD and compiles the task graph inside the job, as the
+entrypoint used to; a warm start finds them in the process userdata filled
+by ``prewarm`` and only builds per-session state. Vendor plugins are stubbed
+so this runs offline: STT/TTS/turn detector/AgentSession are free (the TTS
+cache index is real), and the VAD load sleeps ``--vad-load-ms`` (default: a
+silero load on a laptop) unless ``--real-vad`` is given. The graph compile and ChatOpenAI clients are real.
+
+    python -m benchmarks.bench_prewarm
+"""
+import argparse
+import contextlib
+import logging
+import statistics
+import time
+from types import SimpleNamespace
+
+import agent_complete
+
+JOBS = 20
+
+
+def stub(**kwargs):
+    return SimpleNamespace(**kwargs)
+
+
+@contextlib.contextmanager
+def stubbed_plugins(vad_load_s: float | None):
+    def load_vad(**kwargs):
+        time.sleep(vad_load_s)
+        return stub(kind="vad")
+
+    patches = {
+        "google": SimpleNamespace(STT=stub),
+        "elevenlabs": SimpleNamespace(TTS=stub),
+        "CachedTTS": stub,
+        "MultilingualModel": stub,
+        "AgentSession": stub,
+    }
+    if vad_load_s is not None:
+        patches["silero"] = SimpleNamespace(VAD=SimpleNamespace(load=load_vad))
+    saved = {name: getattr(agent_complete, name) for name in patches}
+    for name, value in patches.items():
+        setattr(agent_complete, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(agent_complete, name, value)
+
+
+def job_start(shared: dict, job: int) -> float:
+    """What the entrypoint does before ``session.start``; returns seconds."""
+    start = time.perf_counter()
+    agent_complete.load_shared(shared)
+    agent_complete.create_session(shared, f"bench-room-{job}:caller")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=JOBS)
+    parser.add_argument("--vad-load-ms", type=float, default=80.0)
+    parser.add_argument("--real-vad", action="store_true", help="load the actual silero model")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with stubbed_plugins(None if args.real_vad else args.vad_load_ms / 1000):
+        # Cold: every job runs in a fresh process with nothing loaded.
+        cold = [job_start({}, job) for job in range(args.jobs)]
+
+        # Warm: prewarm ran before the job was assigned.
+        warm = []
+        for job in range(args.jobs):
+            proc = SimpleNamespace(userdata={})
+            prewarm_start = time.perf_counter()
+            agent_complete.prewarm(proc)
+            prewarm_time = time.perf_counter() - prewarm_start
+            warm.append(job_start(proc.userdata, job))
+
+    print(f"{args.jobs} jobs, VAD load {'real silero' if args.real_vad else f'stubbed {args.vad_load_ms:.0f} ms'}")
+    print(f"{'start':>6} {'median ms':>10} {'max ms':>8}")
+    for name, times in (("cold", cold), ("warm", warm)):
+        print(f"{name:>6} {statistics.median(times) * 1e3:>10.2f} {max(times) * 1e3:>8.2f}")
+    print(f"prewarm (off the critical path): {prewarm_time * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark: fast-path routed turns vs the same commands through the ReAct agent.
+
+The fake LLM waits ``LATENCY`` seconds per call (a typical gpt-4o-mini first
+token), so unrouted commands pay two model calls per turn (tool call + reply).
+
+    python -m benchmarks.bench_router
+"""
+import asyncio
+import logging
+import statistics
+import time
+
+from livekit.agents import llm
+
+from adapter.langgraph import LangGraphAdapter
+from benchmarks.fakes import FakeChatModel, command_responder
+from task_manager import graph_simple
+
+LATENCY = 0.35
+COMMANDS = ["add task buy milk", "add task call mom", "list tasks", "add task pay rent", "list tasks"]
+
+
+async def run_session(use_fast_path: bool) -> tuple[list[float], int]:
+    model = FakeChatModel(respond=command_responder, latency=LATENCY, finished_at=[], inputs=[])
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=use_fast_path)
+    adapter = LangGraphAdapter(graph=graph, config=graph_simple.session_config(f"bench-{use_fast_path}"),
+                               streaming=True)
+    chat_ctx, turn_times = llm.ChatContext.empty(), []
+    for text in COMMANDS:
+        chat_ctx.add_message(role="user", content=text)
+        start = time.perf_counter()
+        reply = ""
+        async for chunk in adapter.chat(chat_ctx=chat_ctx):
+            reply += chunk.delta.content
+        turn_times.append(time.perf_counter() - start)
+        chat_ctx.add_message(role="assistant", content=reply)
+    return turn_times, model.calls
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    print(f"fake LLM latency {LATENCY * 1000:.0f} ms/call, {len(COMMANDS)} grammar commands")
+    print(f"{'mode':>9} {'median turn ms':>15} {'max turn ms':>12} {'LLM calls':>10}")
+    for use_fast_path in (False, True):
+        times, calls = asyncio.run(run_session(use_fast_path))
+        mode = "routed" if use_fast_path else "unrouted"
+        print(f"{mode:>9} {statistics.median(times) * 1e3:>15.1f} {max(times) * 1e3:>12.1f} {calls:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark: per-mutation cost of the JSON task file tools.
+
+Compares the original load_tasks()/save_tasks() round trip (parse + validate +
+rewrite the whole file per voice command, kept here as the baseline) with
+JournalStorage (in-memory tasks, one appended journal line per mutation) at
+1k/10k/100k tasks.
+
+    python -m benchmarks.bench_task_file
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from config.settings import settings
+from task_manager.models import Task
+from task_manager.records import Status, TaskRecord, as_record
+from task_manager.storage import JournalStorage, atomic_write_json
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def make_tasks(n: int) -> list[Task]:
+    now = datetime.now()
+    return [Task(id=f"task_{i}", title=f"task number {i}", created_at=now) for i in range(n)]
+
+
+def load_tasks() -> list[Task]:
+    """The original tool-side load: parse and validate the whole snapshot."""
+    with open(settings.TASKS_FILE) as f:
+        return [TaskRecord.from_row(row).to_task() for row in json.load(f)]
+
+
+def save_tasks(tasks: list[Task]) -> None:
+    """The original tool-side save: rewrite the whole snapshot."""
+    atomic_write_json(settings.TASKS_FILE, [as_record(task).to_row() for task in tasks])
+
+
+def bench_load_save(n: int, ops: int) -> float:
+    save_tasks(make_tasks(n))
+    start = time.perf_counter()
+    for i in range(ops):
+        tasks = load_tasks()
+        tasks[i].status = "completed"
+        save_tasks(tasks)
+    return (time.perf_counter() - start) / ops * 1e3
+
+
+def bench_journal(n: int, ops: int) -> tuple[float, float]:
+    save_tasks(make_tasks(n))
+    start = time.perf_counter()
+    storage = JournalStorage(settings.TASKS_FILE, compact_every=10_000)
+    startup = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    for i in range(ops):
+        task = storage.get(f"task_{i % n}")
+        task.status = Status.COMPLETED
+        storage.put(task)
+    storage.sync()
+    per_op = (time.perf_counter() - start) / ops * 1e3
+    storage.close()
+    os.unlink(storage.journal_path)
+    return per_op, startup
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.TASKS_FILE = os.path.join(tmp, "tasks.json")
+        print(f"{'tasks':>8} {'load/save ms/op':>16} {'journal ms/op':>14} {'journal startup ms':>19}")
+        for n in SIZES:
+            ops = 20 if n <= 10_000 else 3
+            legacy = bench_load_save(n, ops)
+            journal, startup = bench_journal(n, 1000)
+            print(f"{n:>8} {legacy:>16.2f} {journal:>14.4f} {startup:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: pydantic Task vs compact TaskRecord for large task lists.
+
+For 1k/10k/100k tasks, compares retained memory (tracemalloc), loading from
+snapshot rows (``Task(**row)`` with ISO timestamps vs ``TaskRecord.from_row``
+with epoch timestamps), saving (the old save_tasks: hand-built dicts with
+``isoformat()`` per field through ``json.dump(indent=2)``, vs ``to_row`` and
+one ``json.dumps`` call) and a status/priority scan like ``summary()``.
+
+    python -m benchmarks.bench_task_records
+"""
+import gc
+import io
+import json
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from task_manager.models import Task
+from task_manager.records import TaskRecord
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def legacy_row(task: Task) -> dict:
+    """What save_tasks() used to build for every task."""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "priority": task.priority,
+        "status": task.status,
+        "due_date": task.due_date.isoformat() if task.due_date else None,
+        "created_at": task.created_at.isoformat(),
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+    }
+
+
+def make_tasks(n: int) -> list[Task]:
+    now = datetime.now()
+    return [
+        Task(id=f"task_{i}", title=f"task number {i}", priority=("low", "medium", "high")[i % 3],
+             status="completed" if i % 4 == 0 else "pending", created_at=now,
+             completed_at=now if i % 4 == 0 else None)
+        for i in range(n)
+    ]
+
+
+def retained_bytes(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before, objects
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1e3
+
+
+def bench(n: int) -> dict[str, tuple[float, float]]:
+    tasks = make_tasks(n)
+    model_rows = json.loads(json.dumps([legacy_row(t) for t in tasks]))
+    record_rows = json.loads(json.dumps([TaskRecord.from_task(t).to_row() for t in tasks]))
+
+    model_bytes, models = retained_bytes(lambda: [Task(**row) for row in model_rows])
+    record_bytes, records = retained_bytes(lambda: [TaskRecord.from_row(row) for row in record_rows])
+    return {
+        "bytes/task": (model_bytes / n, record_bytes / n),
+        "load ms": (timed(lambda: [Task(**row) for row in model_rows]),
+                    timed(lambda: [TaskRecord.from_row(row) for row in record_rows])),
+        "save ms": (timed(lambda: json.dump([legacy_row(t) for t in models], io.StringIO(), indent=2)),
+                    timed(lambda: json.dumps([r.to_row() for r in records], separators=(",", ":")))),
+        "scan ms": (timed(lambda: Counter((t.status, t.priority) for t in models)),
+                    timed(lambda: Counter((r.status, r.priority) for r in records))),
+    }
+
+
+def main() -> None:
+    print(f"{'tasks':>8} {'metric':>11} {'Task':>10} {'TaskRecord':>11} {'ratio':>6}")
+    for n in SIZES:
+        for metric, (model, record) in bench(n).items():
+            print(f"{n:>8} {metric:>11} {model:>10.1f} {record:>11.1f} {model / record:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: TaskStore against the previous linear-scan list at 100k tasks.
+
+    python -m benchmarks.bench_task_store
+"""
+import random
+import time
+
+from task_manager.store import TaskStore
+
+N = 100_000
+OPS = 2_000
+
+
+class ListStore:
+    """The previous global-list implementation, for comparison."""
+
+    def __init__(self):
+        self.tasks = []
+
+    def add(self, task):
+        self.tasks.append({"id": len(self.tasks) + 1, "task": task, "completed": False})
+
+    def complete(self, todo_id):
+        for task in self.tasks:
+            if task["id"] == todo_id:
+                task["completed"] = True
+                return
+
+    def delete(self, todo_id):
+        for i, task in enumerate(self.tasks):
+            if task["id"] == todo_id:
+                self.tasks.pop(i)
+                return
+
+    def list(self):
+        pending = [t for t in self.tasks if not t["completed"]]
+        completed = [t for t in self.tasks if t["completed"]]
+        return len(pending), len(completed), pending[:2]
+
+
+def list_indexed(store: TaskStore):
+    return store.pending_count, store.completed_count, store.first_pending(2)
+
+
+def timed(fn, *args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / max(len(args_list), 1) * 1e6
+
+
+def bench(store, list_fn) -> dict[str, float]:
+    rng = random.Random(0)
+    results = {"add": timed(store.add, *[(f"task {i}",) for i in range(N)])}
+    ids = rng.sample(range(1, N + 1), 2 * OPS)
+    results["complete"] = timed(store.complete, *[(i,) for i in ids[:OPS]])
+    results["delete"] = timed(store.delete, *[(i,) for i in ids[OPS:]])
+    results["list"] = timed(list_fn, *[() for _ in range(100)])
+    return results
+
+
+def main() -> None:
+    legacy = ListStore()
+    indexed = TaskStore()
+    before = bench(legacy, legacy.list)
+    after = bench(indexed, lambda: list_indexed(indexed))
+
+    print(f"{N} tasks, microseconds per operation")
+    print(f"{'op':>9} {'list scan':>12} {'TaskStore':>12}")
+    for op in before:
+        print(f"{op:>9} {before[op]:>12.2f} {after[op]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
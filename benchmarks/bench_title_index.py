@@ -0,0 +1,64 @@
+"""Benchmark: fuzzy title lookup latency at 10k+ titles.
+
+    python -m benchmarks.bench_title_index
+"""
+import random
+import time
+
+from task_manager.title_index import TitleIndex
+
+VERBS = ["buy", "call", "email", "pay", "book", "clean", "fix", "order", "review", "schedule",
+         "renew", "write", "read", "pick up", "drop off", "cancel", "submit", "water", "walk", "mail"]
+OBJECTS = ["groceries", "mom", "report", "electricity bill", "flight", "garage", "sink", "pizza",
+           "pull request", "meeting", "passport", "essay", "chapter", "kids", "package", "gym membership",
+           "tax return", "plants", "dog", "invoice", "car", "insurance", "rent", "budget", "slides"]
+QUALIFIERS = ["", "today", "tomorrow", "for work", "for sarah", "before friday", "next week",
+              "with jon", "at noon", "online", "again", "for the trip", "in boston", "for dad"]
+SIZES = (10_000, 50_000)
+QUERIES = 2_000
+
+
+def make_titles(n: int, rng: random.Random) -> list[str]:
+    titles = []
+    for i in range(n):
+        title = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}".strip()
+        titles.append(f"{title} {i}" if i >= len(VERBS) * len(OBJECTS) * len(QUALIFIERS) else title)
+    return titles
+
+
+def garble(title: str, rng: random.Random) -> str:
+    """Drop or swap a character to mimic an STT near miss."""
+    i = rng.randrange(len(title))
+    return title[:i] + title[i + 1:] if rng.random() < 0.5 else title + "s"
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'titles':>7} {'build ms':>9} {'exact us':>9} {'fuzzy p50 us':>13} {'fuzzy p99 us':>13}")
+    for n in SIZES:
+        titles = make_titles(n, rng)
+        index = TitleIndex()
+        start = time.perf_counter()
+        for i, title in enumerate(titles):
+            index.add(str(i), title)
+        build = (time.perf_counter() - start) * 1e3
+
+        queries = [titles[rng.randrange(n)] for _ in range(QUERIES)]
+        start = time.perf_counter()
+        for query in queries:
+            index.resolve(query)
+        exact = (time.perf_counter() - start) / QUERIES * 1e6
+
+        latencies = []
+        for query in queries:
+            spoken = garble(query, rng)
+            start = time.perf_counter()
+            index.lookup(spoken)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        latencies.sort()
+        p50, p99 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+        print(f"{n:>7} {build:>9.0f} {exact:>9.2f} {p50:>13.0f} {p99:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
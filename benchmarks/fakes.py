@@ -0,0 +1,284 @@
+"""Offline stand-ins for the LLM, TTS and callers, shared by the tests and the benchmarks."""
+import asyncio
+import json
+import math
+import random
+from typing import Any, Callable
+
+from aiohttp import web
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from livekit.agents import APIConnectOptions, tts
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+from livekit.agents.utils import shortuuid
+
+from adapter.endpointing import Segment
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted stand-in for ChatOpenAI.
+
+    Each call pops the next AIMessage from ``responses`` (or asks ``respond``
+    to build one from the input messages). When streamed, text
+    is emitted word by word with ``token_delay`` seconds between
+    words and tool calls follow as a single tool-call chunk, as OpenAI
+    streams a message with both. ``latency``
+    is waited once per call before anything is returned (network + queueing).
+    """
+
+    responses: list[AIMessage] = []
+    respond: Any = None
+    latency: float = 0.0
+    token_delay: float = 0.0
+    calls: int = 0
+    finished_at: list[float] = []
+    inputs: list[list[BaseMessage]] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _next_response(self, messages: list[BaseMessage]) -> AIMessage:
+        self.inputs.append(list(messages))
+        if self.respond is not None:
+            response = self.respond(messages)
+        else:
+            response = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        return response
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._next_response(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._generate(messages)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        response = self._next_response(messages)
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(self.latency)
+
+        if response.content or not response.tool_calls:
+            words = response.content.split(" ")
+            for i, word in enumerate(words):
+                await asyncio.sleep(self.token_delay)
+                yield ChatGenerationChunk(message=AIMessageChunk(
+                    content=word if i == len(words) - 1 else word + " "
+                ))
+        if response.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                    for i, call in enumerate(response.tool_calls)
+                ],
+            ))
+
+        self.finished_at.append(loop.time())
+
+
+def tool_call(name: str, args: dict[str, Any], call_id: str = "call_1") -> AIMessage:
+    """Build a scripted AI reply that calls a single tool."""
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+def command_responder(messages: list[BaseMessage]) -> AIMessage:
+    """Fake LLM policy: "add task X" -> add_todo, anything else -> list_todos, then read the tool result back."""
+    last = messages[-1]
+    if last.type == "tool":
+        return AIMessage(content=last.content)
+    if last.content.startswith("add task "):
+        return tool_call("add_todo", {"task": last.content[len("add task "):]}, call_id=f"call_{len(messages)}")
+    return tool_call("list_todos", {}, call_id=f"call_{len(messages)}")
+
+
+class ScriptedResponder:
+    """Fake LLM policy driven by a tool-call script.
+
+    ``script`` maps an utterance to either a ``(tool, args)`` call or a plain
+    text reply; tool results are read back verbatim. Utterances not in the
+    script fall back to ``command_responder``.
+    """
+
+    def __init__(self, script: dict[str, tuple[str, dict[str, Any]] | str]):
+        self.script = script
+
+    def __call__(self, messages: list[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if last.type == "tool":
+            return AIMessage(content=last.content)
+        step = self.script.get(last.content)
+        if step is None:
+            return command_responder(messages)
+        if isinstance(step, str):
+            return AIMessage(content=step)
+        name, args = step
+        return tool_call(name, args, call_id=f"call_{len(messages)}")
+
+
+
+def fake_pcm(text: str, sample_rate: int = 16000) -> bytes:
+    """20 ms of 16-bit mono audio per character, derived from the character."""
+    samples = sample_rate // 50
+    return b"".join(bytes([ord(ch) % 256, 0]) * samples for ch in text)
+
+
+class FakeTTS(tts.TTS):
+    """Scripted stand-in for the ElevenLabs TTS.
+
+    Every synthesis waits ``latency`` before its first frame and yields
+    ``fake_pcm`` of the text, so replays can be compared byte for byte.
+    ``calls`` counts synthesis requests; ``texts`` records each streamed
+    token with the loop time it arrived.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=True), sample_rate=16000, num_channels=1)
+        self.latency = latency
+        self.calls = 0
+        self.texts: list[tuple[float, str]] = []
+
+    @property
+    def model(self) -> str:
+        return "fake-model"
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        return _FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS):
+        return _FakeSynthesizeStream(tts=self, conn_options=conn_options)
+
+
+class _FakeChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        self._tts.calls += 1
+        output_emitter.initialize(request_id=shortuuid(), sample_rate=16000, num_channels=1, mime_type="audio/pcm")
+        await asyncio.sleep(self._tts.latency)
+        output_emitter.push(fake_pcm(self.input_text))
+        output_emitter.flush()
+
+
+class _FakeSynthesizeStream(tts.SynthesizeStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id=shortuuid(), sample_rate=16000, num_channels=1, mime_type="audio/pcm", stream=True
+        )
+        loop = asyncio.get_running_loop()
+        text = ""
+        async for token in self._input_ch:
+            if isinstance(token, self._FlushSentinel):
+                break
+            self._tts.texts.append((loop.time(), token))
+            text += token
+        if not text.strip():
+            return
+        self._tts.calls += 1
+        output_emitter.start_segment(segment_id=shortuuid())
+        await asyncio.sleep(self._tts.latency)
+        output_emitter.push(fake_pcm(text))
+        output_emitter.end_segment()
+
+
+class StubOpenAI:
+    """Local HTTP server speaking enough of the chat completions API for ChatOpenAI.
+
+    ``behave(n)`` gives the (delay seconds, HTTP status) of the n-th request
+    (default: instant 200); swap it between turns to make the endpoint slow,
+    fail or recover. Successful requests answer ``reply``, streamed word by
+    word when the client asks for a stream. Use as ``async with`` to get
+    ``base_url``.
+    """
+
+    def __init__(self, reply: str = "Hi! Try 'add task' or 'list tasks'."):
+        self.reply = reply
+        self.behave: Callable[[int], tuple[float, int]] = lambda n: (0.0, 200)
+        self.requests = 0
+        self.answered = 0
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def __aenter__(self) -> "StubOpenAI":
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        self._runner = web.AppRunner(app, handler_cancellation=True)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}/v1"
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._runner.cleanup()
+
+    async def _completions(self, request: web.Request) -> web.StreamResponse:
+        delay, status = self.behave(self.requests)
+        self.requests += 1
+        body = await request.json()
+        await asyncio.sleep(delay)
+        if status != 200:
+            return web.json_response({"error": {"message": "stub failure", "type": "server_error"}}, status=status)
+        self.answered += 1
+        completion = {"id": f"chatcmpl-{self.requests}", "created": 0, "model": body["model"]}
+        if not body.get("stream"):
+            message = {"role": "assistant", "content": self.reply}
+            return web.json_response({
+                **completion,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        words = self.reply.split(" ")
+        deltas = [{"role": "assistant", "content": words[0]}] + [{"content": f" {word}"} for word in words[1:]]
+        for i, delta in enumerate(deltas + [{}]):
+            chunk = {
+                **completion,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None if i < len(deltas) else "stop"}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+def talker_timeline(
+    rng: random.Random,
+    pause_median: float,
+    *,
+    pause_sigma: float = 0.45,
+    turns: int = 200,
+    detector_miss: float = 0.15,
+    detector_doubt: float = 0.3,
+    turn_gap: float = 5.0,
+) -> list[Segment]:
+    """A labelled VAD timeline for a synthetic caller.
+
+    Each turn is one to four stretches of speech separated by log-normal
+    pauses around ``pause_median``. The turn detector wrongly calls a
+    mid-turn pause complete with probability ``detector_miss`` and doubts a
+    real turn end with probability ``detector_doubt``. Turns are
+    ``turn_gap`` seconds apart (the agent's reply).
+    """
+    segments: list[Segment] = []
+    at = 0.0
+    for _ in range(turns):
+        stretches = rng.randint(1, 4)
+        for i in range(stretches):
+            end = at + rng.uniform(0.5, 2.5)
+            if i + 1 < stretches:
+                segments.append(Segment(at, end, rng.random() < detector_miss, False))
+                at = end + rng.lognormvariate(math.log(pause_median), pause_sigma)
+            else:
+                segments.append(Segment(at, end, rng.random() >= detector_doubt, True))
+                at = end + turn_gap
+    return segments
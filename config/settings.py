@@ -1,4 +1,3 @@
-import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -16,10 +15,88 @@ class Settings(BaseSettings):
     LIVEKIT_API_KEY: str
     LIVEKIT_API_SECRET: str
     
+    # Task storage used by task_manager.tools ("json" journal or "sqlite")
+    TASKS_BACKEND: str = "json"
+    TASKS_FILE: str = "data/tasks.json"  # plus a ".journal" alongside it
+    TASKS_DB: str = "data/tasks.sqlite"
+    TASK_PAGE_SIZE: int = 5  # tasks read out per list_tasks page
+    TASK_REMINDERS: bool = True  # speak a reminder in the session when one of its tasks comes due
+    REMINDER_LEAD: float = 0.0  # seconds before the due time
+    
+    # LangGraph checkpointing ("" disables, "memory" or "sqlite")
+    LANGGRAPH_CHECKPOINTER: str = ""
+    CHECKPOINT_DB: str = "data/checkpoints.sqlite"
+    
+    # Model context window (history sent to the LLM each turn)
+    CONTEXT_MAX_TOKENS: int = 1500
+    CONTEXT_KEEP_TURNS: int = 8
+    CONTEXT_SUMMARY: bool = False
+    
+    # Answer exact commands ("add task X", "list tasks", ...) without the LLM
+    FAST_PATH_ROUTER: bool = True
+    
+    # Model call resilience (hedged requests + circuit breaker to the command router)
+    LLM_RESILIENCE: bool = True
+    LLM_TURN_DEADLINE: float = 4.0  # seconds to the first reply word; 0 waits indefinitely
+    LLM_ATTEMPT_TIMEOUT: float = 3.0  # per request attempt, to response headers
+    LLM_HEDGE_QUANTILE: float = 0.9  # hedge requests slower than this recent latency quantile
+    LLM_BREAKER_FAILURES: int = 3  # consecutive failed requests that open the breaker
+    LLM_BREAKER_RESET: float = 20.0  # seconds open before a probe request is let through
+    
+    # Replay answers to repeated read-only turns until the tasks change
+    RESPONSE_CACHE_SIZE: int = 128  # 0 disables the cache
+    RESPONSE_CACHE_TTL: float = 30.0
+    
+    # Replay synthesized audio for repeated short phrases (greeting, canned replies)
+    TTS_CACHE_DIR: str = "data/tts_cache"
+    TTS_CACHE_MAX_MB: int = 64  # 0 disables the cache
+    TTS_CACHE_MAX_CHARS: int = 200  # longer segments are never stored
+    
+    # Endpointing: silence before the caller's turn ends, when the turn detector thinks it is
+    # complete (min) or unfinished (max); adaptive delays follow each caller's own pauses
+    ENDPOINTING_MIN_DELAY: float = 0.2
+    ENDPOINTING_MAX_DELAY: float = 2.0
+    ENDPOINTING_ADAPTIVE: bool = True
+    
+    # Per-turn latency histograms: "" (off), "memory" or "prometheus" (text file)
+    METRICS_SINK: str = ""
+    METRICS_FILE: str = "data/metrics.prom"
+    
     model_config = SettingsConfigDict(
         env_file=".env.local",
         case_sensitive=True,
         extra='ignore'  # Allow extra environment variables
     )
 
-settings = Settings()
+
+class LazySettings:
+    """Module-level ``settings`` that builds (and validates) Settings on first use.
+
+    Importing modules that read settings stays free, and offline tools that
+    never touch a vendor do not need the credentials in the environment.
+    """
+    
+    __slots__ = ("_settings",)
+    
+    def __init__(self):
+        object.__setattr__(self, "_settings", None)
+    
+    def _load(self) -> Settings:
+        if self._settings is None:
+            object.__setattr__(self, "_settings", Settings())
+        return self._settings
+    
+    @property
+    def loaded(self) -> bool:
+        return self._settings is not None
+    
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+    
+    def __delattr__(self, name):
+        delattr(self._load(), name)
+
+settings = LazySettings()
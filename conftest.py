@@ -0,0 +1,21 @@
+"""Shared test fixtures. The fake chat model itself lives in benchmarks/fakes.py."""
+import os
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from benchmarks.fakes import FakeChatModel, command_responder, tool_call  # noqa: F401
+
+# config.settings validates these on first use; tests never reach the real services.
+for _name in ("OPENAI_API_KEY", "GOOGLE_APPLICATION_CREDENTIALS", "ELEVEN_API_KEY",
+              "LIVEKIT_URL", "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET"):
+    os.environ.setdefault(_name, "test")
+
+
+@pytest.fixture
+def fake_model():
+    """Factory for scripted fake chat models."""
+    def _make(*responses: AIMessage | str, token_delay: float = 0.0) -> FakeChatModel:
+        scripted = [AIMessage(content=r) if isinstance(r, str) else r for r in responses]
+        return FakeChatModel(responses=scripted, token_delay=token_delay, finished_at=[], inputs=[])
+    return _make
@@ -0,0 +1,163 @@
+"""Bounded context window for the task manager agent.
+
+Runs as the ReAct agent's ``pre_model_hook``: it trims the history that goes to
+the model (the checkpointed state keeps everything) to the last N turns within a
+token budget, always keeping system messages. Older turns can optionally be
+folded into a rolling summary that is computed in the background, so the hot
+path only ever reads the latest finished summary.
+"""
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[Sequence[BaseMessage]], int]
+
+SUMMARY_PREFIX = "Earlier in this conversation: "
+
+
+def _split_turns(messages: Sequence[BaseMessage]) -> list[list[BaseMessage]]:
+    """Group messages into turns, each starting at a HumanMessage.
+
+    Keeping whole turns means AI tool calls always stay with their ToolMessages.
+    """
+    turns: list[list[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+class RollingSummarizer:
+    """Folds turns dropped from the context window into a short per-thread summary."""
+
+    def __init__(self, model: "BaseChatModel", *, max_threads: int = 1024):
+        self._model = model
+        self._max_threads = max_threads
+        self._threads: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def _thread(self, thread_id: str) -> dict[str, Any]:
+        thread = self._threads.get(thread_id)
+        if thread is None:
+            thread = {"summary": "", "covered": set(), "task": None}
+            self._threads[thread_id] = thread
+            if len(self._threads) > self._max_threads:
+                self._threads.popitem(last=False)
+        else:
+            self._threads.move_to_end(thread_id)
+        return thread
+
+    def summary(self, thread_id: str) -> str:
+        """Latest finished summary for the thread (may lag behind by a turn)."""
+        thread = self._threads.get(thread_id)
+        return thread["summary"] if thread else ""
+
+    def schedule(self, thread_id: str, dropped: Sequence[BaseMessage]) -> asyncio.Task | None:
+        """Start a background update if there are dropped messages not yet summarized."""
+        thread = self._thread(thread_id)
+        pending = [m for m in dropped if m.id not in thread["covered"]]
+        if not pending or (thread["task"] is not None and not thread["task"].done()):
+            return None
+
+        # Run in an empty context so the summary call is not streamed or traced
+        # as part of the user's turn.
+        task = contextvars.Context().run(
+            asyncio.ensure_future, self._update(thread, pending)
+        )
+        thread["task"] = task
+        return task
+
+    async def _update(self, thread: dict[str, Any], pending: list[BaseMessage]) -> None:
+        transcript = "\n".join(f"{m.type}: {m.text}" for m in pending if m.text)
+        prompt = [
+            SystemMessage(content="Summarize this voice task-manager conversation in under 60 words. "
+                                  "Keep task names, numbers and decisions."),
+            HumanMessage(content=f"Current summary: {thread['summary'] or '(none)'}\n\nNew turns:\n{transcript}"),
+        ]
+        try:
+            response = await self._model.ainvoke(prompt)
+        except Exception as e:
+            logger.warning(f"⚠️ Rolling summary failed: {e}")
+            return
+        thread["summary"] = response.text.strip()
+        thread["covered"].update(m.id for m in pending)
+        logger.info(f"📝 Rolling summary updated ({len(pending)} messages folded in)")
+
+
+class ContextWindow:
+    """Trims model input to the last ``keep_last_turns`` turns within ``max_tokens``.
+
+    System messages are pinned. The budget covers the history sent to the model;
+    the agent prompt is added on top of it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_tokens: int = 1500,
+        keep_last_turns: int = 8,
+        token_counter: TokenCounter = count_tokens_approximately,
+        summarizer: RollingSummarizer | None = None,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_last_turns = keep_last_turns
+        self.token_counter = token_counter
+        self.summarizer = summarizer
+
+    def trim(self, messages: Sequence[BaseMessage], summary: str = "") -> tuple[list[BaseMessage], list[BaseMessage]]:
+        """Return ``(kept, dropped)`` messages for one model call."""
+        pinned = [m for m in messages if isinstance(m, SystemMessage)]
+        turns = _split_turns([m for m in messages if not isinstance(m, SystemMessage)])
+
+        head = pinned + ([SystemMessage(content=SUMMARY_PREFIX + summary)] if summary else [])
+        budget = self.max_tokens - self.token_counter(head)
+
+        kept_turns: list[list[BaseMessage]] = []
+        used = 0
+        for turn in reversed(turns[-self.keep_last_turns:] if self.keep_last_turns > 0 else []):
+            cost = self.token_counter(turn)
+            # The current turn is always kept, even if it alone exceeds the budget.
+            if kept_turns and used + cost > budget:
+                break
+            kept_turns.append(turn)
+            used += cost
+
+        kept_turns.reverse()
+        dropped = [m for turn in turns[:len(turns) - len(kept_turns)] for m in turn]
+        kept = head + [m for turn in kept_turns for m in turn]
+        return kept, dropped
+
+    def _thread_id(self, config: RunnableConfig | None) -> str:
+        return str((config or {}).get("configurable", {}).get("thread_id", ""))
+
+    def _hook(self, state: dict[str, Any], config: RunnableConfig) -> dict[str, Any]:
+        thread_id = self._thread_id(config)
+        summary = self.summarizer.summary(thread_id) if self.summarizer else ""
+        kept, _ = self.trim(state["messages"], summary)
+        return {"llm_input_messages": kept}
+
+    async def _ahook(self, state: dict[str, Any], config: RunnableConfig) -> dict[str, Any]:
+        thread_id = self._thread_id(config)
+        summary = self.summarizer.summary(thread_id) if self.summarizer else ""
+        kept, dropped = self.trim(state["messages"], summary)
+        if dropped:
+            logger.info(f"✂️ Trimmed {len(dropped)} old messages from model input")
+            if self.summarizer:
+                self.summarizer.schedule(thread_id, dropped)
+        return {"llm_input_messages": kept}
+
+    def as_pre_model_hook(self) -> RunnableLambda:
+        """Runnable for ``create_react_agent(pre_model_hook=...)``."""
+        return RunnableLambda(self._hook, afunc=self._ahook, name="context_window")
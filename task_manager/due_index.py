@@ -0,0 +1,88 @@
+"""Due-date index over the open tasks of one storage.
+
+"What's overdue" or "what's due this week" should not mean reading every
+task. DueIndex keeps the (due, task_id) pairs of tasks that have a due date
+and are not completed in one sorted list, updated incrementally by the
+storage on every put/delete, so a time-range query is two bisections plus
+the slice it returns. Listeners (e.g. a ``reminders.ReminderScheduler``)
+are told whenever a task's due date enters, moves or leaves the index.
+Task ids may be strings (the storage engines) or ints (the session TaskStore).
+"""
+from bisect import bisect_left, insort
+from typing import Any, Callable, Iterable, List, Optional
+
+# Called with (task_id, due epoch seconds or None when no longer due).
+DueListener = Callable[[Any, Optional[float]], None]
+
+
+def _due_of(key: tuple[float, Any]) -> float:
+    return key[0]
+
+
+class DueIndex:
+    def __init__(self):
+        self._due: dict[str, float] = {}
+        self._keys: list[tuple[float, str]] = []  # sorted
+        self._listeners: list[DueListener] = []
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._due
+
+    def get(self, task_id: str) -> Optional[float]:
+        return self._due.get(task_id)
+
+    def rebuild(self, pairs: Iterable[tuple[str, float]]) -> None:
+        """Replace the contents in one sort (startup); listeners are not told."""
+        self._due = dict(pairs)
+        self._keys = sorted((due, task_id) for task_id, due in self._due.items())
+
+    def set(self, task_id: str, due: Optional[float]) -> None:
+        """Index ``task_id`` at ``due``, or drop it when ``due`` is None."""
+        old = self._due.get(task_id)
+        if old == due:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (old, task_id))]
+            del self._due[task_id]
+        if due is not None:
+            self._due[task_id] = due
+            insort(self._keys, (due, task_id))
+        for listener in self._listeners:
+            listener(task_id, due)
+
+    def discard(self, task_id: str) -> None:
+        self.set(task_id, None)
+
+    def _bounds(self, start: Optional[float], end: Optional[float]) -> tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self._keys, start, key=_due_of)
+        hi = len(self._keys) if end is None else bisect_left(self._keys, end, key=_due_of)
+        return lo, max(lo, hi)
+
+    def count(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+
+    def between(
+        self, start: Optional[float] = None, end: Optional[float] = None, offset: int = 0, limit: Optional[int] = None
+    ) -> List[str]:
+        """Ids due in [start, end), earliest first; None leaves that side open."""
+        lo, hi = self._bounds(start, end)
+        lo += offset
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [task_id for _, task_id in self._keys[lo:hi]]
+
+    def entries(self, start: Optional[float] = None, end: Optional[float] = None) -> List[tuple[Any, float]]:
+        """(task_id, due) pairs due in [start, end), earliest first."""
+        lo, hi = self._bounds(start, end)
+        return [(task_id, due) for due, task_id in self._keys[lo:hi]]
+
+    def subscribe(self, listener: DueListener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: DueListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
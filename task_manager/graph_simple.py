@@ -1,81 +1,295 @@
-from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import END, START
 from config.settings import settings
+from .context import ContextWindow, RollingSummarizer
+from .records import due_window, parse_due
+from .render import spoken_due
+from .router import parse_command
+from .store import TaskStore, TaskStoreRegistry
 import logging
+import os
+import time
+
+# langgraph.prebuilt, langchain_openai and the checkpointers are imported where
+# they are used, so importing the tools does not pay for the whole LLM stack.
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langgraph.checkpoint.base import BaseCheckpointSaver
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory task storage
-TASKS = []
+# Simple in-memory task storage: one store per session, TASKS when none is configured
+TASKS = TaskStore()
+STORES = TaskStoreRegistry()
+
+NO_TASKS_REPLY = "You have no tasks. Say 'add task' followed by your task description."
+# Wall clock for the due-date tools (epoch seconds); tests pin it.
+clock: Callable[[], float] = time.time
+
+# Spoken instead of an agent reply while the model is unavailable
+DEGRADED_REPLY = "I can only do simple commands right now. Try 'add task' and your task, or 'list tasks'."
+
+def session_config(thread_id: str) -> dict:
+    """LangGraph config for one session, carrying that session's own task store."""
+    return {"configurable": {"thread_id": thread_id, "task_store": STORES.get(thread_id)}}
+
+def _store(config: RunnableConfig | None) -> TaskStore:
+    """Task store injected through the LangGraph config."""
+    store = ((config or {}).get("configurable") or {}).get("task_store")
+    return store if store is not None else TASKS
 
-def add_todo(task: str) -> str:
+def _writable_store(config: RunnableConfig | None) -> TaskStore:
+    """Task store for a mutating tool.
+
+    In a speculative turn (the adapter put a ``turn_gate`` in the config) this
+    blocks the tool's worker thread until the turn is confirmed, and raises
+    if it was cancelled instead, so abandoned turns never write.
+    """
+    gate = ((config or {}).get("configurable") or {}).get("turn_gate")
+    if gate is not None:
+        gate.wait()
+    return _store(config)
+
+def add_todo(task: str, config: RunnableConfig = None) -> str:
     """Add a new task."""
-    global TASKS
-    todo_id = len(TASKS) + 1
-    new_todo = {"id": todo_id, "task": task, "completed": False}
-    TASKS.append(new_todo)
+    new_todo = _writable_store(config).add(task)
+    todo_id = new_todo["id"]
     logger.info(f"✅ Added task #{todo_id}: {task}")
     return f"Added task #{todo_id}: {task}"
 
-def list_todos() -> str:
+def list_todos(config: RunnableConfig = None) -> str:
     """List all tasks."""
-    global TASKS
-    if not TASKS:
-        return "You have no tasks. Say 'add task' followed by your task description."
+    store = _store(config)
+    if not store:
+        return NO_TASKS_REPLY
     
-    if len(TASKS) == 1:
-        task = TASKS[0]
+    if len(store) == 1:
+        task = next(iter(store))
         status = "done" if task["completed"] else "pending"
         return f"You have 1 task: {task['task']} - {status}"
     
-    pending = [t for t in TASKS if not t["completed"]]
-    completed = [t for t in TASKS if t["completed"]]
+    pending_count = store.pending_count
+    completed_count = store.completed_count
     
-    summary = f"You have {len(TASKS)} tasks"
-    if pending:
-        summary += f", {len(pending)} pending"
-    if completed:
-        summary += f", {len(completed)} completed"
+    summary = f"You have {len(store)} tasks"
+    if pending_count:
+        summary += f", {pending_count} pending"
+    if completed_count:
+        summary += f", {completed_count} completed"
     
     # List first 2 pending tasks for brevity
-    if pending:
-        task_list = ". ".join([f"Task {t['id']}: {t['task']}" for t in pending[:2]])
+    if pending_count:
+        task_list = ". ".join([f"Task {t['id']}: {t['task']}" for t in store.first_pending(2)])
         summary += f". Pending: {task_list}"
     
     return summary
 
-def complete_todo(todo_id: int) -> str:
+def complete_todo(todo_id: int, config: RunnableConfig = None) -> str:
     """Complete a task."""
-    global TASKS
-    for task in TASKS:
-        if task["id"] == todo_id:
-            if task["completed"]:
-                return f"Task #{todo_id} is already done"
-            task["completed"] = True
-            return f"Completed: {task['task']}"
-    return f"Task #{todo_id} not found"
-
-def delete_todo(todo_id: int) -> str:
+    store = _writable_store(config)
+    task = store.get(todo_id)
+    if task is None:
+        return f"Task #{todo_id} not found"
+    if task["completed"]:
+        return f"Task #{todo_id} is already done"
+    store.complete(todo_id)
+    return f"Completed: {task['task']}"
+
+def add_todos(tasks: list[str], config: RunnableConfig = None) -> str:
+    """Add several tasks at once."""
+    added = _writable_store(config).add_many([task for task in tasks if task.strip()])
+    if not added:
+        return "No tasks to add"
+    logger.info(f"✅ Added {len(added)} tasks")
+    return f"Added {len(added)} tasks: " + ", ".join(f"#{todo['id']} {todo['task']}" for todo in added)
+
+def complete_todos(todo_ids: list[int], config: RunnableConfig = None) -> str:
+    """Complete several tasks at once."""
+    completed, already_done, missing = _writable_store(config).complete_many(todo_ids)
+    parts = []
+    if completed:
+        parts.append("Completed: " + ", ".join(todo["task"] for todo in completed))
+    if already_done:
+        parts.append("Already done: " + ", ".join(todo["task"] for todo in already_done))
+    if missing:
+        parts.append("Not found: " + ", ".join(f"#{todo_id}" for todo_id in missing))
+    return ". ".join(parts) or "No tasks to complete"
+
+def delete_todo(todo_id: int, config: RunnableConfig = None) -> str:
     """Delete a task."""
-    global TASKS
-    for i, task in enumerate(TASKS):
-        if task["id"] == todo_id:
-            removed = TASKS.pop(i)
-            return f"Deleted: {removed['task']}"
-    return f"Task #{todo_id} not found"
-
-def create_task_manager_graph():
-    """Create optimized ReAct agent."""
-    return create_react_agent(
-        model=ChatOpenAI(
+    removed = _writable_store(config).delete(todo_id)
+    if removed is None:
+        return f"Task #{todo_id} not found"
+    return f"Deleted: {removed['task']}"
+
+def set_due_date(todo_id: int, due: str, config: RunnableConfig = None) -> str:
+    """Set when a task is due: 'today', 'tomorrow', 'in N days', a date (2025-03-14) or date and time (2025-03-14T17:00); 'none' clears it."""
+    store = _writable_store(config)
+    task = store.get(todo_id)
+    if task is None:
+        return f"Task #{todo_id} not found"
+    if task["completed"]:
+        return f"Task #{todo_id} is already done"
+    now = clock()
+    if due.strip().lower() in ("", "none", "clear"):
+        store.set_due(todo_id, None)
+        return f"Cleared the due date of {task['task']}"
+    due_at = parse_due(due, now)
+    if due_at is None:
+        return "Say the due date as today, tomorrow, in N days or a date"
+    store.set_due(todo_id, due_at)
+    return f"{task['task']} is due {spoken_due(due_at, now)}"
+
+def list_due_todos(window: str = "upcoming", days: int = 7, config: RunnableConfig = None) -> str:
+    """List pending tasks by due date: window 'overdue', 'today' or 'upcoming' (due in the next ``days`` days)."""
+    now = clock()
+    bounds = due_window(window, days, now)
+    if bounds is None:
+        return "Window must be overdue, today or upcoming"
+    start, end, phrase = bounds
+    store = _store(config)
+    total = store.count_due(start, end)
+    if not total:
+        return f"Nothing is {phrase}"
+    
+    # First 2 for brevity, like list_todos
+    summary = "1 task is" if total == 1 else f"{total} tasks are"
+    due = ". ".join(
+        f"Task {t['id']}: {t['task']}, due {spoken_due(store.due_of(t['id']), now)}"
+        for t in store.due_between(start, end, limit=2)
+    )
+    return f"{summary} {phrase}. {due}"
+
+def fast_path(
+    state: dict,
+    config: RunnableConfig,
+    degraded: Callable[[], bool] | None = None,
+    commands: bool = True,
+) -> dict:
+    """Answer exact grammar commands without the LLM; anything else goes to the agent.
+
+    While ``degraded()`` is true (the model's circuit breaker is open) nothing
+    goes to the agent: commands are still answered, even with ``commands``
+    off, and anything else gets ``DEGRADED_REPLY`` at once.
+    """
+    last = state["messages"][-1]
+    if last.type != "human":
+        return {}
+    offline = degraded is not None and degraded()
+    command = parse_command(last.text) if commands or offline else None
+    if command is None:
+        if offline:
+            logger.warning(f"🔌 Model unavailable, not sending to the agent: {last.text}")
+            return {"messages": [AIMessage(content=DEGRADED_REPLY)]}
+        return {}
+    
+    # Invoked as tools so callbacks (e.g. latency metrics) see the call by name.
+    reply = _fast_path_tool(command.tool).invoke(command.args, config)
+    logger.info(f"⚡ Fast path {command.tool}{command.args}: {reply}")
+    # Name the tool so callers (e.g. the adapter's response cache) know what ran.
+    return {"messages": [AIMessage(content=reply, response_metadata={"tool": command.tool})]}
+
+FAST_PATH_FUNCTIONS = {fn.__name__: fn for fn in (add_todo, list_todos, complete_todo, delete_todo)}
+FAST_PATH_TOOLS = {}
+
+def _fast_path_tool(name: str):
+    tool = FAST_PATH_TOOLS.get(name)
+    if tool is None:
+        from langchain_core.tools import StructuredTool
+        tool = FAST_PATH_TOOLS[name] = StructuredTool.from_function(FAST_PATH_FUNCTIONS[name])
+    return tool
+
+def _after_fast_path(state: dict) -> str:
+    return END if state["messages"][-1].type == "ai" else "agent"
+
+def create_checkpointer(backend: str = "memory", sqlite_path: str | None = None) -> "BaseCheckpointSaver":
+    """Create a LangGraph checkpointer ("memory" or "sqlite").
+
+    The SQLite backend is async and must be created inside a running event loop.
+    """
+    if backend == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        return InMemorySaver()
+    if backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        path = sqlite_path or settings.CHECKPOINT_DB
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        return AsyncSqliteSaver(aiosqlite.connect(path))
+    raise ValueError(f"Unknown checkpointer backend: {backend}")
+
+def create_context_window() -> ContextWindow:
+    """Create the context-trimming stage configured from settings."""
+    summarizer = None
+    if settings.CONTEXT_SUMMARY:
+        from langchain_openai import ChatOpenAI
+
+        summarizer = RollingSummarizer(
+            ChatOpenAI(
+                model="gpt-4o-mini",
+                api_key=settings.OPENAI_API_KEY,
+                temperature=0.0,
+                max_tokens=120,
+                timeout=10.0
+            )
+        )
+    return ContextWindow(
+        max_tokens=settings.CONTEXT_MAX_TOKENS,
+        keep_last_turns=settings.CONTEXT_KEEP_TURNS,
+        summarizer=summarizer,
+    )
+
+def create_task_manager_graph(
+    checkpointer: "BaseCheckpointSaver | None" = None,
+    context_window: ContextWindow | None = None,
+    model: "BaseChatModel | None" = None,
+    use_fast_path: bool | None = None,
+    http_async_client: Any = None,
+    degraded: Callable[[], bool] | None = None,
+):
+    """Create optimized ReAct agent.
+
+    Pass a checkpointer to keep conversation history inside LangGraph, so each
+    turn only needs to send the new messages for its thread_id. Model input is
+    bounded by ``context_window`` (defaults to the settings-based window).
+    Tools use the task store from ``session_config`` when one is provided.
+    With the fast path (default from settings) a router node answers exact
+    grammar commands directly and only falls through to the agent otherwise.
+    ``http_async_client`` (see ``adapter.resilience``) carries the default
+    model's requests and owns their retries; with ``degraded`` the router
+    node is always present and skips the agent while ``degraded()`` is true.
+    """
+    from langgraph.graph import StateGraph
+    from langgraph.prebuilt import create_react_agent
+    from langgraph.prebuilt.chat_agent_executor import AgentState
+
+    context_window = context_window or create_context_window()
+    if use_fast_path is None:
+        use_fast_path = settings.FAST_PATH_ROUTER
+    
+    if model is None:
+        from langchain_openai import ChatOpenAI
+
+    agent = create_react_agent(
+        model=model or ChatOpenAI(
             model="gpt-4o-mini",
             api_key=settings.OPENAI_API_KEY,
             temperature=0.2,        # More consistent responses
             max_tokens=40,          # Shorter responses
-            timeout=10.0            # Faster timeout
+            timeout=10.0,           # Faster timeout
+            http_async_client=http_async_client,
+            # A resilient client hedges and retries itself; the SDK's backoff would only add delay.
+            max_retries=0 if http_async_client is not None else None,
         ),
-        tools=[add_todo, list_todos, complete_todo, delete_todo],
+        tools=[add_todo, add_todos, list_todos, complete_todo, complete_todos, delete_todo, set_due_date, list_due_todos],
+        checkpointer=None if use_fast_path or degraded else checkpointer,
+        pre_model_hook=context_window.as_pre_model_hook(),
         prompt="""You are a voice task manager. Keep responses under 15 words for smooth voice interaction.
 
 COMMANDS:
@@ -83,16 +297,32 @@ COMMANDS:
 - "list tasks" → use list_todos  
 - "complete task [number]" → use complete_todo
 - "delete task [number]" → use delete_todo
+- Several tasks at once → use add_todos / complete_todos with a list
+- "task [number] is due [when]" → use set_due_date
+- "what's due today / this week / overdue" → use list_due_todos
 
 RULES:
 - Be brief and natural
 - Always use appropriate tools
+- Make all independent tool calls in one step
 - For greetings, be welcoming but brief
 - For unclear requests, ask for clarification
 
 Examples:
 - "add task buy milk" → add_todo("buy milk") → "Added task #1: buy milk"  
 - "list tasks" → list_todos() → [brief summary]
+- "add milk, eggs and bread, and complete task 3" → add_todos(["milk", "eggs", "bread"]) + complete_todos([3])
+- "what's due this week" → list_due_todos("upcoming", 7)
 - "hello" → "Hi! Try 'add task' or 'list tasks'"
 """
     )
+    if not use_fast_path and degraded is None:
+        return agent
+    
+    # The agent runs as a subgraph and shares the parent's checkpointer.
+    builder = StateGraph(AgentState)
+    builder.add_node("fast_path", partial(fast_path, degraded=degraded, commands=use_fast_path))
+    builder.add_node("agent", agent)
+    builder.add_edge(START, "fast_path")
+    builder.add_conditional_edges("fast_path", _after_fast_path, ["agent", END])
+    return builder.compile(checkpointer=checkpointer)
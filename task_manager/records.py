@@ -0,0 +1,167 @@
+"""Compact task records for the storage engines and the tool hot paths.
+
+``models.Task`` is a pydantic model: every instance carries validation state,
+a ``__dict__`` and three datetime objects, and building one runs the
+validator. Storage holds thousands of tasks per user and rebuilds them on
+every load, so it keeps ``TaskRecord`` instead: a ``__slots__`` dataclass
+with int-coded status/priority and epoch-second timestamps. Conversion to
+and from ``Task`` happens only at the boundary (``from_task``/``to_task``).
+
+On disk a record is a flat JSON row with status/priority labels and epoch
+timestamps. ``from_row`` also accepts the older rows with ISO-8601 strings,
+so existing snapshots, journals and SQLite databases load unchanged.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import IntEnum
+from typing import Any, Optional, Union
+
+from .models import Task
+
+
+class Status(IntEnum):
+    PENDING = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+
+
+class Priority(IntEnum):
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+# Indexed by code; faster than ``member.name.lower()`` in the serializer loop.
+STATUS_LABELS = tuple(status.name.lower() for status in Status)
+PRIORITY_LABELS = tuple(priority.name.lower() for priority in Priority)
+STATUS_CODES = {label: Status(code) for code, label in enumerate(STATUS_LABELS)}
+PRIORITY_CODES = {label: Priority(code) for code, label in enumerate(PRIORITY_LABELS)}
+
+
+def to_epoch(value: Union[None, float, int, str, datetime]) -> Optional[float]:
+    """Epoch seconds from a stored timestamp (number, ISO-8601 string or datetime)."""
+    if value is None or isinstance(value, float):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def to_datetime(value: Optional[float]) -> Optional[datetime]:
+    """Naive local datetime, as ``datetime.now()`` produced it, or None."""
+    return None if value is None else datetime.fromtimestamp(value)
+
+
+def day_start(now: float, days: int = 0) -> float:
+    """Local midnight ``days`` days after the day containing ``now``."""
+    midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight + timedelta(days=days)).timestamp()
+
+
+# Date-only due dates ("tomorrow", "2025-03-14") fall due at this local hour.
+DUE_HOUR = 9
+_IN_DAYS = re.compile(r"^in (\d+) days?$")
+
+
+def parse_due(text: str, now: float) -> Optional[float]:
+    """'today', 'tomorrow', 'in N days' or an ISO date/datetime as epoch seconds; None if unparseable."""
+    text = " ".join(text.lower().split())
+    days = {"today": 0, "tomorrow": 1}.get(text)
+    if days is None and (match := _IN_DAYS.match(text)):
+        days = int(match.group(1))
+    if days is not None:
+        return datetime.fromtimestamp(day_start(now, days)).replace(hour=DUE_HOUR).timestamp()
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if "t" not in text and " " not in text:
+        moment = moment.replace(hour=DUE_HOUR)
+    return moment.timestamp()
+
+
+def due_window(window: str, days: int, now: float) -> Optional[tuple[Optional[float], float, str]]:
+    """(start, end, phrase) of a due-date query window, or None for an unknown window.
+
+    ``window`` is 'overdue', 'today' or 'upcoming' (due within the next
+    ``days`` days); ``phrase`` completes "N tasks are ...".
+    """
+    if window == "overdue":
+        return None, now, "overdue"
+    if window == "today":
+        return day_start(now), day_start(now, 1), "due today"
+    if window == "upcoming":
+        days = max(days, 1)
+        return now, day_start(now, days + 1), "due by tomorrow" if days == 1 else f"due in the next {days} days"
+    return None
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    id: str
+    title: str
+    description: Optional[str] = None
+    priority: Priority = Priority.MEDIUM
+    status: Status = Status.PENDING
+    due_date: Optional[float] = None
+    created_at: float = 0.0
+    completed_at: Optional[float] = None
+
+    @classmethod
+    def from_task(cls, task: Task) -> "TaskRecord":
+        return cls(
+            task.id,
+            task.title,
+            task.description,
+            PRIORITY_CODES[task.priority],
+            STATUS_CODES[task.status],
+            to_epoch(task.due_date),
+            task.created_at.timestamp(),
+            to_epoch(task.completed_at),
+        )
+
+    def to_task(self) -> Task:
+        """Validated pydantic model, for callers outside the storage layer."""
+        return Task(
+            id=self.id,
+            title=self.title,
+            description=self.description,
+            priority=PRIORITY_LABELS[self.priority],
+            status=STATUS_LABELS[self.status],
+            due_date=to_datetime(self.due_date),
+            created_at=to_datetime(self.created_at),
+            completed_at=to_datetime(self.completed_at),
+        )
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "TaskRecord":
+        """Trusted row from our own snapshot, journal or database; not validated."""
+        return cls(
+            row["id"],
+            row["title"],
+            row.get("description"),
+            PRIORITY_CODES[row.get("priority") or "medium"],
+            STATUS_CODES[row.get("status") or "pending"],
+            to_epoch(row.get("due_date")),
+            to_epoch(row["created_at"]),
+            to_epoch(row.get("completed_at")),
+        )
+
+    def to_row(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "priority": PRIORITY_LABELS[self.priority],
+            "status": STATUS_LABELS[self.status],
+            "due_date": self.due_date,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+        }
+
+
+def as_record(task: Union[Task, TaskRecord]) -> TaskRecord:
+    return task if isinstance(task, TaskRecord) else TaskRecord.from_task(task)
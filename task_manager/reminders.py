@@ -0,0 +1,175 @@
+"""Reminders for due tasks, fired from a single timer instead of a polling loop.
+
+``ReminderQueue`` is a min-heap of (due, task_id) with lazy invalidation: a
+moved or cancelled reminder leaves its old heap entry behind, and entries
+that no longer match ``_due`` are skipped when they reach the top (the heap
+is rebuilt once stale entries outnumber live ones). It never reads a clock,
+so it can be driven by a fake one.
+
+``ReminderScheduler`` feeds the queue from a storage's due-date index and
+keeps exactly one ``loop.call_at`` armed for the earliest reminder; the
+event loop sleeps until then. Index changes arrive from tool worker threads
+and are handed to the loop with ``call_soon_threadsafe``; when the timer
+fires, the due tasks are read back from storage on ``IO_EXECUTOR``.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional
+
+from .tools import IO_EXECUTOR
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderQueue:
+    def __init__(self):
+        self._heap: list[tuple[float, str]] = []
+        self._due: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, task_id: str, due: float) -> None:
+        """Remind about ``task_id`` at ``due``, replacing any earlier reminder for it."""
+        if self._due.get(task_id) == due:
+            return
+        self._due[task_id] = due
+        heapq.heappush(self._heap, (due, task_id))
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, task_id) for task_id, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, task_id: str) -> None:
+        self._due.pop(task_id, None)
+
+    def next_due(self) -> Optional[float]:
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)  # moved or cancelled since it was pushed
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: float) -> List[tuple[str, float]]:
+        """Remove and return the reminders due at or before ``now``, earliest first."""
+        fired = []
+        while (due := self.next_due()) is not None and due <= now:
+            _, task_id = heapq.heappop(self._heap)
+            del self._due[task_id]
+            fired.append((task_id, due))
+        return fired
+
+
+class ReminderScheduler:
+    """Call ``on_due(task)`` when each open task of ``storage`` comes due.
+
+    Args:
+        storage: A task storage (``JournalStorage``/``SqliteStorage``) or a
+            session's ``store.TaskStore``
+        on_due: Called on the event loop with the due task, as ``storage.get`` returns it
+        lead: Seconds before the due time to remind
+        clock: Wall clock, in the epoch seconds due dates use
+        executor: Where storage reads run, off the event loop
+    """
+
+    def __init__(
+        self,
+        storage: Any,
+        on_due: Callable[[Any], Any],
+        *,
+        lead: float = 0.0,
+        clock: Callable[[], float] = time.time,
+        executor: Executor = IO_EXECUTOR,
+    ):
+        self._storage = storage
+        self._on_due = on_due
+        self.lead = lead
+        self._clock = clock
+        self._executor = executor
+        self.queue = ReminderQueue()
+        self.fired = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._armed_for: Optional[float] = None
+        self._deliveries: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Load upcoming due dates and arm the timer; call from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._storage.watch_due(self._on_index_change)
+        # Already-past due dates are what the overdue query is for, not a burst of reminders.
+        for task_id, due in self._storage.due_entries(self._clock() + self.lead):
+            self.queue.schedule(task_id, due)
+        self._arm()
+
+    def close(self) -> None:
+        self._storage.unwatch_due(self._on_index_change)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for delivery in self._deliveries:
+            delivery.cancel()
+        self._deliveries.clear()
+        self._armed_for = None
+        self._loop = None
+
+    def _on_index_change(self, task_id: Any, due: Optional[float]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if _running_on(loop):
+            self._update(task_id, due)
+        else:
+            loop.call_soon_threadsafe(self._update, task_id, due)
+
+    def _update(self, task_id: Any, due: Optional[float]) -> None:
+        if self._loop is None:
+            return
+        if due is None or due - self.lead <= self._clock():
+            self.queue.cancel(task_id)
+        else:
+            self.queue.schedule(task_id, due)
+        self._arm()
+
+    def _arm(self) -> None:
+        due = self.queue.next_due()
+        if due == self._armed_for:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._armed_for = due
+        if due is not None:
+            delay = max(0.0, due - self.lead - self._clock())
+            self._timer = self._loop.call_at(self._loop.time() + delay, self._fire)
+
+    def _fire(self) -> None:
+        self._timer = self._armed_for = None
+        due = self.queue.pop_due(self._clock() + self.lead)
+        if due:
+            delivery = self._loop.create_task(self._deliver(due))
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+        self._arm()
+
+    async def _deliver(self, due: List[tuple[Any, float]]) -> None:
+        storage = self._storage
+        found = await self._loop.run_in_executor(
+            self._executor, lambda: [(storage.get(task_id), storage.due_of(task_id)) for task_id, _ in due]
+        )
+        for (task_id, due_at), (task, still_due) in zip(due, found):
+            if task is None or still_due != due_at:
+                continue  # deleted, completed or moved after it was queued
+            self.fired += 1
+            try:
+                self._on_due(task)
+            except Exception as e:
+                logger.error(f"❌ Reminder for {task_id} failed: {e}")
+
+
+def _running_on(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
@@ -0,0 +1,151 @@
+"""Speech-friendly, size-bounded rendering of task tool results.
+
+Tool output goes straight back into the LLM context and, usually verbatim,
+into TTS. A list is therefore rendered one page at a time as plain sentences
+(no emoji or markdown, long titles cut at a word boundary), so its size does
+not grow with the number of tasks; "next page" asks for the following page.
+The full structured page rides alongside as the tool artifact for non-voice
+clients and never reaches the prompt.
+"""
+import math
+import re
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from .records import PRIORITY_LABELS, STATUS_LABELS, Priority, Status, TaskRecord
+
+PAGE_SIZE = 5
+MAX_TITLE_CHARS = 60
+
+_SPACE = re.compile(r"\s+")
+# Emoji and pictographs, which TTS engines spell out or skip awkwardly.
+_SYMBOLS = re.compile("[\U0001F000-\U0001FAFF\u2600-\u27BF\uFE0F]")
+
+_STATUS_WORDS = {Status.IN_PROGRESS: "in progress", Status.COMPLETED: "done"}
+
+
+def speakable(text: str, limit: int = MAX_TITLE_CHARS) -> str:
+    """Collapse whitespace, drop emoji and cut at a word boundary within ``limit``."""
+    text = _SPACE.sub(" ", _SYMBOLS.sub("", text)).strip()
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip(" ,.;:") + "..."
+
+
+def _describe(task: TaskRecord, with_status: bool) -> str:
+    notes = []
+    if task.priority is Priority.HIGH:
+        notes.append("high priority")
+    if with_status and task.status in _STATUS_WORDS:
+        notes.append(_STATUS_WORDS[task.status])
+    title = speakable(task.title)
+    return f"{title} ({', '.join(notes)})" if notes else title
+
+
+def _payload(task: TaskRecord) -> dict[str, Any]:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "priority": PRIORITY_LABELS[task.priority],
+        "status": STATUS_LABELS[task.status],
+    }
+
+
+def paginate(total: int, page: int, page_size: int) -> tuple[int, int, int, Optional[int]]:
+    """(page clamped to range, page count, offset of its first item, next page or None)."""
+    pages = max(1, math.ceil(total / page_size))
+    page = min(max(page, 1), pages)
+    return page, pages, (page - 1) * page_size, page + 1 if page < pages else None
+
+
+def render_task_list(
+    tasks: Sequence[TaskRecord],
+    status: Optional[str] = None,
+    page: int = 1,
+    page_size: int = PAGE_SIZE,
+) -> tuple[str, dict[str, Any]]:
+    """One page of ``tasks`` as (spoken summary, structured payload)."""
+    total = len(tasks)
+    page, pages, start, next_page = paginate(total, page, page_size)
+    shown = tasks[start:start + page_size]
+
+    kind = f"{status.replace('_', ' ')} " if status else ""
+    noun = "task" if total == 1 else "tasks"
+    items = [f"{start + i}. {_describe(task, status is None)}." for i, task in enumerate(shown, 1)]
+    if pages == 1:
+        parts = [f"You have {total} {kind}{noun}."]
+    else:
+        parts = [f"You have {total} {kind}{noun}. Page {page} of {pages}:"]
+    parts.extend(items)
+    if next_page:
+        parts.append(f"Say 'next page' to hear {min(page_size, total - start - len(shown))} more.")
+
+    payload = {
+        "status": status or "all",
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "next_page": next_page,
+        "tasks": [_payload(task) for task in shown],
+    }
+    return " ".join(parts), payload
+
+
+def _clock_time(moment: datetime) -> str:
+    hour = moment.hour % 12 or 12
+    suffix = "AM" if moment.hour < 12 else "PM"
+    return f"{hour} {suffix}" if not moment.minute else f"{hour}:{moment.minute:02d} {suffix}"
+
+
+def spoken_due(due: float, now: float) -> str:
+    """'today at 5 PM', 'tomorrow at 9 AM', 'Friday at 9:30 AM' or 'October 20'."""
+    moment, today = datetime.fromtimestamp(due), datetime.fromtimestamp(now).date()
+    days = (moment.date() - today).days
+    if days == 0:
+        return f"today at {_clock_time(moment)}"
+    if days == 1:
+        return f"tomorrow at {_clock_time(moment)}"
+    if days == -1:
+        return f"yesterday at {_clock_time(moment)}"
+    if 1 < days < 7:
+        return f"{moment:%A} at {_clock_time(moment)}"
+    return f"{moment:%B} {moment.day}"
+
+
+def render_due_tasks(
+    shown: Sequence[TaskRecord],
+    total: int,
+    window: str,
+    phrase: str,
+    now: float,
+    page: int = 1,
+    page_size: int = PAGE_SIZE,
+) -> tuple[str, dict[str, Any]]:
+    """A page of a due-date query (``shown`` is already that page) as (spoken summary, payload).
+
+    ``phrase`` completes "N tasks are ...", e.g. "overdue" or "due today".
+    """
+    page, pages, start, next_page = paginate(total, page, page_size)
+    if not total:
+        parts = [f"Nothing is {phrase}."]
+    else:
+        noun = "1 task is" if total == 1 else f"{total} tasks are"
+        parts = [f"{noun} {phrase}." if pages == 1 else f"{noun} {phrase}. Page {page} of {pages}:"]
+    parts.extend(
+        f"{start + i}. {_describe(task, False)}, due {spoken_due(task.due_date, now)}."
+        for i, task in enumerate(shown, 1)
+    )
+    if next_page:
+        parts.append(f"Say 'next page' to hear {min(page_size, total - start - len(shown))} more.")
+
+    payload = {
+        "window": window,
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "next_page": next_page,
+        "tasks": [{**_payload(task), "due": datetime.fromtimestamp(task.due_date).isoformat()} for task in shown],
+    }
+    return " ".join(parts), payload
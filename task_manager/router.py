@@ -0,0 +1,62 @@
+"""Deterministic parser for the fixed voice command grammar.
+
+"add task X", "list tasks", "complete task N" and "delete task N" do not need
+the LLM. ``parse_command`` maps an utterance to the todo tool it names, and
+returns None for anything it is not sure about so the agent handles it.
+"""
+import re
+from typing import Any, NamedTuple, Optional
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20,
+    # common STT homophones
+    "won": 1, "to": 2, "too": 2, "for": 4, "ate": 8,
+}
+
+_PREFIX = r"^(?:(?:please|okay|ok|hey)[,\s]+)*"
+_NUMBER = r"(?:number\s+|#\s*)?(?P<number>\w+)"
+
+_ADD = re.compile(_PREFIX + r"add\s+(?:a\s+)?(?:new\s+)?task[:,]?\s+(?P<task>.+)$", re.I)
+_LIST = re.compile(_PREFIX + r"(?:list|show)(?:\s+me)?(?:\s+all)?(?:\s+(?:my|the))?\s+tasks?$", re.I)
+_COMPLETE = re.compile(
+    _PREFIX + r"(?:complete|finish|mark)\s+task\s+" + _NUMBER + r"(?:\s+(?:as\s+)?(?:done|complete|completed))?$",
+    re.I,
+)
+_DELETE = re.compile(_PREFIX + r"(?:delete|remove)\s+task\s+" + _NUMBER + r"$", re.I)
+
+# An add that might really be several tasks is left to the agent.
+_COMPOUND = re.compile(r",|\band\b|\bthen\b|\balso\b", re.I)
+
+
+class Command(NamedTuple):
+    tool: str
+    args: dict[str, Any]
+
+
+def parse_number(word: str) -> Optional[int]:
+    if word.isdigit():
+        return int(word)
+    return NUMBER_WORDS.get(word.lower())
+
+
+def parse_command(text: str) -> Optional[Command]:
+    """Map an utterance to ``Command(tool, args)``, or None if it is not an exact command."""
+    text = text.strip().rstrip(".!?").strip()
+
+    if match := _ADD.match(text):
+        task = match.group("task").strip()
+        if not task or _COMPOUND.search(task):
+            return None
+        return Command("add_todo", {"task": task})
+
+    if _LIST.match(text):
+        return Command("list_todos", {})
+
+    for pattern, tool in ((_COMPLETE, "complete_todo"), (_DELETE, "delete_todo")):
+        if match := pattern.match(text):
+            number = parse_number(match.group("number"))
+            return Command(tool, {"todo_id": number}) if number is not None else None
+
+    return None
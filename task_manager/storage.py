@@ -0,0 +1,461 @@
+"""Storage engines for the task tools in ``tools.py``: JSON journal or SQLite.
+
+Both hold and return ``records.TaskRecord``s; ``put`` also accepts a ``models.Task``.
+Each keeps a ``DueIndex`` of its open tasks' due dates for range queries and reminders.
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Iterable, List, Optional
+
+from .due_index import DueIndex, DueListener
+from .models import Task
+from .records import PRIORITY_LABELS, STATUS_CODES, STATUS_LABELS, Status, TaskRecord, as_record, to_datetime, to_epoch
+from .title_index import TitleIndex, normalize_title
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """Write JSON to ``path`` via a temp file + rename so a crash never truncates it.
+
+    Encodes with ``json.dumps`` rather than ``json.dump``: the latter streams
+    through the pure-Python encoder, about 3x slower on large task lists.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps(data, indent=indent, separators=None if indent else (",", ":")))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def summarize(counts: Iterable[tuple[str, str, int]]) -> dict[str, int]:
+    """Fold ``(status, priority, count)`` rows into the get_task_summary counters."""
+    summary = {"total": 0, "pending": 0, "in_progress": 0, "completed": 0, "high_priority": 0}
+    for status, priority, count in counts:
+        summary["total"] += count
+        summary[status] += count
+        if priority == "high" and status != "completed":
+            summary["high_priority"] += count
+    return summary
+
+
+def open_due(task: TaskRecord) -> Optional[float]:
+    """The due date the DueIndex tracks: only tasks still to be done count."""
+    return task.due_date if task.status is not Status.COMPLETED else None
+
+
+class JournalStorage:
+    """In-memory tasks backed by a JSON snapshot plus an append-only JSON-lines journal.
+
+    Every mutation is appended to ``<path>.journal`` and fsynced in batches
+    (every ``fsync_batch`` records or ``fsync_interval`` seconds, whichever
+    comes first; a timer syncs a batch that stops growing). Once the journal holds ``compact_every`` records it is folded
+    into a fresh snapshot at ``path``. On startup the snapshot is loaded and the
+    journal replayed; a torn last line from a crash mid-append is ignored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        fsync_batch: int = 32,
+        fsync_interval: float = 0.5,
+        compact_every: int = 1000,
+    ):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self.version = 0  # bumped on every mutation
+        self._lock = threading.RLock()
+        self._tasks: dict[str, TaskRecord] = {}
+        self._titles = TitleIndex()
+        self._due = DueIndex()
+        self._journal_records = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+
+        self._load()
+        self._index()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    # -- startup -----------------------------------------------------------
+
+    def _load(self) -> None:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    for row in json.load(f):
+                        task = TaskRecord.from_row(row)
+                        self._tasks[task.id] = task
+            except json.JSONDecodeError:
+                logger.error(f"❌ Corrupt task snapshot {self.path}, starting empty")
+        else:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        if not os.path.exists(self.journal_path):
+            return
+        good_offset = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if record is None or not line.endswith(b"\n"):
+                    # Cut the torn tail so new records are not appended after it.
+                    logger.warning("⚠️ Ignoring torn journal record")
+                    os.truncate(self.journal_path, good_offset)
+                    break
+                self._apply(record)
+                self._journal_records += 1
+                good_offset += len(line)
+        logger.info(f"🔄 Replayed {self._journal_records} journal records onto {len(self._tasks)} tasks")
+
+    def _index(self) -> None:
+        for task in self._tasks.values():
+            self._titles.add(task.id, task.title)
+        self._due.rebuild(
+            (task.id, task.due_date) for task in self._tasks.values() if open_due(task) is not None
+        )
+
+    def _apply(self, record: dict) -> None:
+        if record["op"] == "put":
+            task = TaskRecord.from_row(record["task"])
+            self._tasks[task.id] = task
+        elif record["op"] == "delete":
+            self._tasks.pop(record["id"], None)
+
+    # -- reads -------------------------------------------------------------
+
+    def all(self) -> List[TaskRecord]:
+        with self._lock:
+            return list(self._tasks.values())
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        return self._tasks.get(task_id)
+
+    def find_by_title(self, title: str) -> Optional[TaskRecord]:
+        """Exact (normalized) or confident fuzzy match for a spoken title."""
+        with self._lock:
+            task_id = self._titles.resolve(title)
+            return self._tasks.get(task_id) if task_id else None
+
+    def title_candidates(self, title: str, limit: int = 3) -> List[TaskRecord]:
+        with self._lock:
+            return [self._tasks[task_id] for task_id in self._titles.suggest(title, limit)]
+
+    def list(self, status: Optional[str] = None) -> List[TaskRecord]:
+        with self._lock:
+            if status is None:
+                return list(self._tasks.values())
+            code = STATUS_CODES.get(status)
+            return [task for task in self._tasks.values() if task.status is code]
+
+    def due_between(
+        self, start: Optional[float] = None, end: Optional[float] = None, offset: int = 0, limit: Optional[int] = None
+    ) -> List[TaskRecord]:
+        """Open tasks due in [start, end) (epoch seconds), earliest first."""
+        with self._lock:
+            return [self._tasks[task_id] for task_id in self._due.between(start, end, offset, limit)]
+
+    def count_due(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        with self._lock:
+            return self._due.count(start, end)
+
+    def due_of(self, task_id: str) -> Optional[float]:
+        """The due date the index holds for ``task_id`` (None once completed or cleared)."""
+        with self._lock:
+            return self._due.get(task_id)
+
+    def due_entries(self, start: Optional[float] = None, end: Optional[float] = None) -> List[tuple[str, float]]:
+        """(task_id, due) of open tasks due in [start, end), earliest first, without reading the tasks."""
+        with self._lock:
+            return self._due.entries(start, end)
+
+    def watch_due(self, listener: DueListener) -> None:
+        """Call ``listener(task_id, due or None)`` whenever an open task's due date changes."""
+        with self._lock:
+            self._due.subscribe(listener)
+
+    def unwatch_due(self, listener: DueListener) -> None:
+        with self._lock:
+            self._due.unsubscribe(listener)
+
+    def summary(self) -> dict[str, int]:
+        with self._lock:
+            counts = Counter((task.status, task.priority) for task in self._tasks.values())
+        return summarize(
+            (STATUS_LABELS[status], PRIORITY_LABELS[priority], n) for (status, priority), n in counts.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    # -- writes ------------------------------------------------------------
+
+    def put(self, task: TaskRecord | Task) -> None:
+        """Insert or replace a task."""
+        task = as_record(task)
+        with self._lock:
+            self._tasks[task.id] = task
+            self._titles.add(task.id, task.title)
+            self._due.set(task.id, open_due(task))
+            self.version += 1
+            self._append({"op": "put", "task": task.to_row()})
+
+    def delete(self, task_id: str) -> Optional[TaskRecord]:
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is not None:
+                self._titles.remove(task_id)
+                self._due.discard(task_id)
+                self.version += 1
+                self._append({"op": "delete", "id": task_id})
+            return task
+
+    def _append(self, record: dict) -> None:
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal_records += 1
+        self._unsynced += 1
+        self._maybe_sync()
+
+    def _maybe_sync(self) -> None:
+        if self._journal_records >= self.compact_every:
+            self.compact()
+        elif (self._unsynced >= self.fsync_batch
+              or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+        else:
+            # Hand the record to the OS so another process/reader can see it.
+            self._journal.flush()
+            if self._sync_timer is None:
+                delay = max(0.0, self._last_sync + self.fsync_interval - time.monotonic())
+                self._sync_timer = threading.Timer(delay, self._timed_sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+    def _timed_sync(self) -> None:
+        with self._lock:
+            self._sync_timer = None
+            if self._unsynced and not self._journal.closed:
+                self.sync()
+
+    def sync(self) -> None:
+        """Flush and fsync pending journal records."""
+        with self._lock:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def compact(self) -> None:
+        """Write a fresh snapshot atomically, then start an empty journal."""
+        with self._lock:
+            # Replaying put/delete records is idempotent, so a crash between the
+            # snapshot rename and the journal reset loses nothing.
+            atomic_write_json(self.path, [t.to_row() for t in self._tasks.values()])
+            self._journal.close()
+            self._journal = open(self.journal_path, "w", encoding="utf-8")
+            self._journal_records = 0
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if not self._journal.closed:
+                self.sync()
+                self._journal.close()
+
+
+class SqliteStorage:
+    """Task storage in a local SQLite database (stdlib ``sqlite3``, WAL mode).
+
+    Same interface as JournalStorage. Title lookups, status filters and the
+    summary are answered by indexed queries instead of scanning every task.
+    """
+
+    _COLUMNS = ("id", "title", "description", "priority", "status", "due_date", "created_at", "completed_at")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = 0  # bumped on every mutation made through this instance
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                title_norm TEXT NOT NULL,
+                description TEXT,
+                priority TEXT NOT NULL,
+                status TEXT NOT NULL,
+                due_date TEXT,
+                created_at TEXT NOT NULL,
+                completed_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_title_norm ON tasks(title_norm);
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+            CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+        """)
+        # Fuzzy title matching runs in memory; exact matches use idx_tasks_title_norm.
+        self._titles = TitleIndex()
+        for task_id, title in self._conn.execute("SELECT id, title FROM tasks ORDER BY rowid"):
+            self._titles.add(task_id, title)
+        # Range queries and reminders use an in-memory DueIndex too; rows are fetched by id.
+        self._due = DueIndex()
+        self._due.rebuild(
+            (task_id, to_epoch(due_date)) for task_id, due_date in self._conn.execute(
+                "SELECT id, due_date FROM tasks WHERE due_date IS NOT NULL AND status != 'completed'"
+            )
+        )
+
+    def _select(self, where: str = "", params: tuple = (), limit: str = "") -> List[TaskRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM tasks {where} ORDER BY rowid {limit}", params
+            ).fetchall()
+        return [TaskRecord.from_row(dict(zip(self._COLUMNS, row))) for row in rows]
+
+    # -- reads -------------------------------------------------------------
+
+    def all(self) -> List[TaskRecord]:
+        return self._select()
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        rows = self._select("WHERE id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def find_by_title(self, title: str) -> Optional[TaskRecord]:
+        """Exact (normalized) or confident fuzzy match for a spoken title."""
+        rows = self._select("WHERE title_norm = ?", (normalize_title(title),), "LIMIT 1")
+        if rows:
+            return rows[0]
+        with self._lock:
+            task_id = self._titles.resolve(title)
+        return self.get(task_id) if task_id else None
+
+    def title_candidates(self, title: str, limit: int = 3) -> List[TaskRecord]:
+        with self._lock:
+            task_ids = self._titles.suggest(title, limit)
+        return [task for task in map(self.get, task_ids) if task is not None]
+
+    def list(self, status: Optional[str] = None) -> List[TaskRecord]:
+        if status is None:
+            return self._select()
+        return self._select("WHERE status = ?", (status,))
+
+    def due_between(
+        self, start: Optional[float] = None, end: Optional[float] = None, offset: int = 0, limit: Optional[int] = None
+    ) -> List[TaskRecord]:
+        """Open tasks due in [start, end) (epoch seconds), earliest first."""
+        with self._lock:
+            task_ids = self._due.between(start, end, offset, limit)
+        found: dict[str, TaskRecord] = {}
+        for i in range(0, len(task_ids), 500):  # stay under SQLite's bound-parameter limit
+            chunk = task_ids[i:i + 500]
+            for task in self._select(f"WHERE id IN ({', '.join('?' * len(chunk))})", tuple(chunk)):
+                found[task.id] = task
+        return [found[task_id] for task_id in task_ids if task_id in found]
+
+    def count_due(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        with self._lock:
+            return self._due.count(start, end)
+
+    def due_of(self, task_id: str) -> Optional[float]:
+        """The due date the index holds for ``task_id`` (None once completed or cleared)."""
+        with self._lock:
+            return self._due.get(task_id)
+
+    def due_entries(self, start: Optional[float] = None, end: Optional[float] = None) -> List[tuple[str, float]]:
+        """(task_id, due) of open tasks due in [start, end), earliest first, without reading the tasks."""
+        with self._lock:
+            return self._due.entries(start, end)
+
+    def watch_due(self, listener: DueListener) -> None:
+        """Call ``listener(task_id, due or None)`` whenever an open task's due date changes."""
+        with self._lock:
+            self._due.subscribe(listener)
+
+    def unwatch_due(self, listener: DueListener) -> None:
+        with self._lock:
+            self._due.unsubscribe(listener)
+
+    def summary(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, priority, COUNT(*) FROM tasks GROUP BY status, priority"
+            ).fetchall()
+        return summarize(rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    # -- writes ------------------------------------------------------------
+
+    def put(self, task: TaskRecord | Task) -> None:
+        """Insert or replace a task (keeping its original position)."""
+        task = as_record(task)
+        row = task.to_row()
+        # Timestamp columns keep their ISO-8601 text so existing databases stay readable.
+        for column in ("due_date", "created_at", "completed_at"):
+            if row[column] is not None:
+                row[column] = to_datetime(row[column]).isoformat()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO tasks (id, title, title_norm, description, priority, status, due_date, created_at, completed_at)
+                VALUES (:id, :title, :title_norm, :description, :priority, :status, :due_date, :created_at, :completed_at)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title, title_norm = excluded.title_norm,
+                    description = excluded.description, priority = excluded.priority,
+                    status = excluded.status, due_date = excluded.due_date,
+                    created_at = excluded.created_at, completed_at = excluded.completed_at
+                """,
+                {**row, "title_norm": normalize_title(task.title)},
+            )
+            self._titles.add(task.id, task.title)
+            self._due.set(task.id, open_due(task))
+            self.version += 1
+
+    def delete(self, task_id: str) -> Optional[TaskRecord]:
+        with self._lock:
+            task = self.get(task_id)
+            if task is not None:
+                self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                self._titles.remove(task_id)
+                self._due.discard(task_id)
+                self.version += 1
+            return task
+
+    def sync(self) -> None:
+        """Every statement autocommits; nothing is buffered."""
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
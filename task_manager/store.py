@@ -0,0 +1,199 @@
+"""Indexed in-memory task storage for the voice agent tools."""
+import threading
+from itertools import islice
+from typing import Any, Optional
+
+from .due_index import DueIndex, DueListener
+
+
+class TaskStore:
+    """Tasks indexed by id, with per-status indexes and a monotonic id counter.
+
+    Every operation is O(1) (``first_pending`` is O(n) in the number requested).
+    Tasks are plain dicts: ``{"id": int, "task": str, "completed": bool}``.
+    The status indexes are dicts, so they keep insertion (= id) order.
+    Mutations take a per-store lock, which only guards parallel tool calls
+    within one session; separate sessions never share a store. ``version``
+    increases on every mutation so callers can cache read results.
+
+    Due dates (epoch seconds) live in a ``DueIndex`` over the pending tasks,
+    so "what's due this week" is a range query and a
+    ``reminders.ReminderScheduler`` can watch the store like it watches the
+    storage engines. Completing or deleting a task drops its due date.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._lock = threading.Lock()
+        self._tasks: dict[int, dict[str, Any]] = {}
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._completed: dict[int, dict[str, Any]] = {}
+        self._due = DueIndex()
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks.values())
+
+    def get(self, todo_id: int) -> dict[str, Any] | None:
+        return self._tasks.get(todo_id)
+
+    def add(self, task: str) -> dict[str, Any]:
+        """Add a task with the next id. Ids are never reused after deletion."""
+        with self._lock:
+            todo = {"id": self._next_id, "task": task, "completed": False}
+            self._next_id += 1
+            self._tasks[todo["id"]] = todo
+            self._pending[todo["id"]] = todo
+            self.version += 1
+        return todo
+
+    def add_many(self, tasks: list[str]) -> list[dict[str, Any]]:
+        """Add several tasks under one lock acquisition; ids are consecutive."""
+        with self._lock:
+            added = []
+            for task in tasks:
+                todo = {"id": self._next_id, "task": task, "completed": False}
+                self._next_id += 1
+                self._tasks[todo["id"]] = todo
+                self._pending[todo["id"]] = todo
+                added.append(todo)
+            if added:
+                self.version += 1
+        return added
+
+    def complete(self, todo_id: int) -> dict[str, Any] | None:
+        """Mark a task completed. Returns the task, or None if it does not exist."""
+        with self._lock:
+            todo = self._tasks.get(todo_id)
+            if todo is not None and not todo["completed"]:
+                todo["completed"] = True
+                del self._pending[todo_id]
+                self._completed[todo_id] = todo
+                self._due.discard(todo_id)
+                self.version += 1
+        return todo
+
+    def complete_many(self, todo_ids: list[int]) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[int]]:
+        """Complete several tasks under one lock acquisition.
+
+        Returns ``(completed, already_done, missing_ids)``.
+        """
+        completed, already_done, missing = [], [], []
+        with self._lock:
+            for todo_id in dict.fromkeys(todo_ids):
+                todo = self._tasks.get(todo_id)
+                if todo is None:
+                    missing.append(todo_id)
+                elif todo["completed"]:
+                    already_done.append(todo)
+                else:
+                    todo["completed"] = True
+                    del self._pending[todo_id]
+                    self._completed[todo_id] = todo
+                    self._due.discard(todo_id)
+                    completed.append(todo)
+            if completed:
+                self.version += 1
+        return completed, already_done, missing
+
+    def delete(self, todo_id: int) -> dict[str, Any] | None:
+        """Remove a task. Returns the removed task, or None if it does not exist."""
+        with self._lock:
+            todo = self._tasks.pop(todo_id, None)
+            if todo is not None:
+                self._pending.pop(todo_id, None)
+                self._completed.pop(todo_id, None)
+                self._due.discard(todo_id)
+                self.version += 1
+        return todo
+
+    def set_due(self, todo_id: int, due: Optional[float]) -> dict[str, Any] | None:
+        """Set (or with None clear) a pending task's due date. Returns the task, or None if not pending."""
+        with self._lock:
+            todo = self._pending.get(todo_id)
+            if todo is not None and self._due.get(todo_id) != due:
+                self._due.set(todo_id, due)
+                self.version += 1
+        return todo
+
+    def due_of(self, todo_id: int) -> Optional[float]:
+        return self._due.get(todo_id)
+
+    def due_between(
+        self, start: Optional[float] = None, end: Optional[float] = None, offset: int = 0, limit: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """Pending tasks due in [start, end) (epoch seconds), earliest first."""
+        with self._lock:
+            return [self._tasks[todo_id] for todo_id in self._due.between(start, end, offset, limit)]
+
+    def due_entries(self, start: Optional[float] = None, end: Optional[float] = None) -> list[tuple[int, float]]:
+        """(todo_id, due) of pending tasks due in [start, end), earliest first."""
+        with self._lock:
+            return self._due.entries(start, end)
+
+    def count_due(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        with self._lock:
+            return self._due.count(start, end)
+
+    def watch_due(self, listener: DueListener) -> None:
+        """Call ``listener(todo_id, due or None)`` whenever a pending task's due date changes."""
+        with self._lock:
+            self._due.subscribe(listener)
+
+    def unwatch_due(self, listener: DueListener) -> None:
+        with self._lock:
+            self._due.unsubscribe(listener)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def completed_count(self) -> int:
+        return len(self._completed)
+
+    def first_pending(self, n: int) -> list[dict[str, Any]]:
+        """The ``n`` oldest pending tasks."""
+        return list(islice(self._pending.values(), n))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tasks.clear()
+            self._pending.clear()
+            self._completed.clear()
+            for todo_id in self._due.between():
+                self._due.discard(todo_id)
+            self._next_id = 1
+            self.version += 1
+
+
+class TaskStoreRegistry:
+    """One TaskStore per user/room identity.
+
+    The registry is only consulted when a session starts; the session then
+    passes its own store to the tools through the LangGraph config, so the
+    per-turn hot path never touches shared state. Stores live only as long
+    as their session: the worker drops each one when its job shuts down.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stores: dict[str, TaskStore] = {}
+
+    def get(self, key: str) -> TaskStore:
+        """Return the store for ``key``, creating it on first use."""
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                store = self._stores[key] = TaskStore()
+            return store
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            self._stores.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._stores)
@@ -0,0 +1,205 @@
+"""Fuzzy task-title lookup for voice-transcribed references.
+
+STT often hands the tools a near miss ("buy grocery", "by groceries", "call
+mum") for a stored title ("Buy groceries", "Call mom"). TitleIndex keeps a
+trigram index and a phonetic (Soundex) index over normalized titles, updated
+incrementally, and ranks candidates so the tools can resolve these in one call.
+"""
+import re
+from collections import Counter
+from typing import Iterable, Optional
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Words STT and users add or drop freely; they carry no identity.
+STOPWORDS = frozenset({"a", "an", "the", "my", "to", "task", "for", "of", "and"})
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+_SILENT_PREFIXES = (("wr", "r"), ("kn", "n"), ("gn", "n"), ("ph", "f"), ("wh", "w"))
+
+
+def _stem(word: str) -> str:
+    """Very light plural stripping: groceries -> grocery, boxes -> box, bills -> bill."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ses", "xes", "zes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokens(text: str) -> list[str]:
+    """Lowercase, strip punctuation and stopwords, and stem each word."""
+    words = _WORD.findall(text.lower())
+    kept = [_stem(w) for w in words if w not in STOPWORDS]
+    return kept or [_stem(w) for w in words]
+
+
+def soundex(word: str) -> str:
+    """Soundex variant tuned for STT confusions.
+
+    Silent letters are folded first (write/right -> rite) and the leading
+    consonant is coded by its sound class, so sink/zinc and call/kall match.
+    """
+    for prefix, replacement in _SILENT_PREFIXES:
+        if word.startswith(prefix):
+            word = replacement + word[len(prefix):]
+            break
+    word = word[:1] + word[1:].replace("gh", "")
+    if not word:
+        return ""
+    if word.isdigit():
+        return word
+    last = _SOUNDEX_CODES.get(word[0], "")
+    code = last or word[0]
+    for ch in word[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "hw":
+            last = digit
+    return code.ljust(4, "0")
+
+
+def normalize_title(title: str) -> str:
+    """Case- and whitespace-insensitive key used for exact title lookups."""
+    return " ".join(title.lower().split())
+
+
+def trigrams(words: Iterable[str]) -> set[str]:
+    """Character trigrams of the space-free word sequence (so 'pickup' ~ 'pick up')."""
+    joined = f"  {''.join(words)} "
+    return {joined[i:i + 3] for i in range(len(joined) - 2)}
+
+
+def _discard(postings: dict[str, set[str]], keys: Iterable[str], task_id: str) -> None:
+    for key in keys:
+        ids = postings[key]
+        ids.discard(task_id)
+        if not ids:
+            del postings[key]
+
+
+class TitleIndex:
+    """Incremental trigram + phonetic index from task titles to task ids.
+
+    ``lookup`` scores candidates as a weighted mix of trigram Dice similarity
+    and phonetic token overlap; ``resolve`` returns an exact (normalized) match
+    if there is one, otherwise the best candidate only when it clears
+    ``threshold`` and beats the runner-up by ``margin``.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.6,
+        margin: float = 0.1,
+        suggest_threshold: float = 0.35,
+        max_candidates: int = 64,
+    ):
+        self.threshold = threshold
+        self.margin = margin
+        self.suggest_threshold = suggest_threshold
+        self.max_candidates = max_candidates
+        self._entries: dict[str, tuple[set[str], set[str], str]] = {}
+        self._by_exact: dict[str, dict[str, None]] = {}
+        self._by_trigram: dict[str, set[str]] = {}
+        self._by_sound: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._entries
+
+    @staticmethod
+    def _features(title: str) -> tuple[set[str], set[str]]:
+        words = tokens(title)
+        return trigrams(words), {soundex(w) for w in words}
+
+    def add(self, task_id: str, title: str) -> None:
+        """Index a title (replacing any previous title for ``task_id``)."""
+        exact = normalize_title(title)
+        entry = self._entries.get(task_id)
+        if entry is not None:
+            if entry[2] == exact:
+                return
+            self.remove(task_id)
+        grams, sounds = self._features(title)
+        self._entries[task_id] = (grams, sounds, exact)
+        self._by_exact.setdefault(exact, {})[task_id] = None
+        for gram in grams:
+            self._by_trigram.setdefault(gram, set()).add(task_id)
+        for sound in sounds:
+            self._by_sound.setdefault(sound, set()).add(task_id)
+
+    rename = add
+
+    def remove(self, task_id: str) -> None:
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        grams, sounds, exact = entry
+        _discard(self._by_trigram, grams, task_id)
+        _discard(self._by_sound, sounds, task_id)
+        same_title = self._by_exact[exact]
+        del same_title[task_id]
+        if not same_title:
+            del self._by_exact[exact]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_exact.clear()
+        self._by_trigram.clear()
+        self._by_sound.clear()
+
+    def lookup(self, query: str, limit: int = 3) -> list[tuple[str, float]]:
+        """Ranked ``(task_id, score)`` candidates for a spoken title, best first."""
+        grams, sounds = self._features(query)
+        postings = [(self._by_trigram.get(gram, ()), 1) for gram in grams]
+        # A phonetic match is worth a few shared trigrams when pre-ranking.
+        postings += [(self._by_sound.get(sound, ()), 3) for sound in sounds]
+
+        # Very common keys ("  b", the sound of "buy") add little but dominate
+        # the cost on large indexes; only fall back to them if nothing else hits.
+        common = max(256, len(self._entries) // 50)
+        hits: Counter[str] = Counter()
+        for skip_common in (True, False):
+            for ids, weight in postings:
+                if (len(ids) > common) == skip_common:
+                    continue
+                for task_id in ids:
+                    hits[task_id] += weight
+            if hits:
+                break
+
+        scored = []
+        for task_id, _ in hits.most_common(self.max_candidates):
+            entry_grams, entry_sounds, _ = self._entries[task_id]
+            dice = 2 * len(grams & entry_grams) / (len(grams) + len(entry_grams))
+            phonetic = len(sounds & entry_sounds) / len(sounds | entry_sounds)
+            scored.append((task_id, 0.6 * dice + 0.4 * phonetic))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:limit]
+
+    def suggest(self, query: str, limit: int = 3) -> list[str]:
+        """Task ids worth offering as "did you mean" when ``resolve`` fails."""
+        return [task_id for task_id, score in self.lookup(query, limit) if score >= self.suggest_threshold]
+
+    def resolve(self, query: str) -> Optional[str]:
+        """The task id ``query`` confidently refers to, or None."""
+        exact = self._by_exact.get(normalize_title(query))
+        if exact:
+            return next(iter(exact))
+        candidates = self.lookup(query, limit=2)
+        if not candidates or candidates[0][1] < self.threshold:
+            return None
+        if len(candidates) > 1 and candidates[0][1] - candidates[1][1] < self.margin:
+            return None
+        return candidates[0][0]
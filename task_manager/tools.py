@@ -1,51 +1,143 @@
 # task_manager/tools_fixed.py - CORRECTED for LangGraph compatibility
-import json
+import asyncio
+import functools
 import os
-from datetime import datetime
-from typing import List, Optional
-from langchain_core.tools import tool
-from .models import Task
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from urllib.parse import quote
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from .records import PRIORITY_CODES, Status, TaskRecord, due_window, parse_due
+from .render import paginate, render_due_tasks, render_task_list, spoken_due
+from .storage import JournalStorage, SqliteStorage
+from .title_index import normalize_title
 from config.settings import settings
 
-def load_tasks() -> List[Task]:
-    """Load tasks from JSON file"""
-    if not os.path.exists(settings.TASKS_FILE):
-        os.makedirs(os.path.dirname(settings.TASKS_FILE), exist_ok=True)
-        with open(settings.TASKS_FILE, 'w') as f:
-            json.dump([], f)
-        return []
-    
-    try:
-        with open(settings.TASKS_FILE, 'r') as f:
-            tasks_data = json.load(f)
-            return [Task(**task) for task in tasks_data]
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-
-def save_tasks(tasks: List[Task]) -> None:
-    """Save tasks to JSON file"""
-    os.makedirs(os.path.dirname(settings.TASKS_FILE), exist_ok=True)
-    
-    # Convert tasks to dictionaries for JSON serialization
-    tasks_data = []
-    for task in tasks:
-        task_dict = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "priority": task.priority,
-            "status": task.status,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-            "created_at": task.created_at.isoformat(),
-            "completed_at": task.completed_at.isoformat() if task.completed_at else None
-        }
-        tasks_data.append(task_dict)
-    
-    with open(settings.TASKS_FILE, 'w') as f:
-        json.dump(tasks_data, f, indent=2)
-
-@tool
-def add_task(title: str, description: str = "", priority: str = "medium") -> str:
+# Wall clock for the due-date tools (epoch seconds); tests pin it.
+clock: Callable[[], float] = time.time
+
+_storage: Optional[JournalStorage | SqliteStorage] = None
+_user_storages: dict[str, JournalStorage | SqliteStorage] = {}
+_storages_lock = threading.Lock()
+
+# File and SQLite work for the async tool path runs here, never on the event loop.
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="task-io")
+_user_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+# Held around every tool body, whichever path (invoke or ainvoke) runs it
+_user_thread_locks: dict[str, threading.Lock] = {}
+
+def user_path(path: str, user_id: str) -> str:
+    """Per-user variant of a storage path: data/tasks.json -> data/tasks.<user>.json
+
+    The id is percent-encoded (``room:alice`` -> ``room%3Aalice``), so distinct
+    ids always get distinct files.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{quote(user_id, safe='')}{ext}"
+
+def create_storage(backend: str, user_id: Optional[str] = None) -> JournalStorage | SqliteStorage:
+    """Create a task storage backend ("json" or "sqlite"), optionally for one user."""
+    if backend == "json":
+        path = settings.TASKS_FILE
+        return JournalStorage(user_path(path, user_id) if user_id else path)
+    if backend == "sqlite":
+        path = settings.TASKS_DB
+        return SqliteStorage(user_path(path, user_id) if user_id else path)
+    raise ValueError(f"Unknown task storage backend: {backend}")
+
+def get_storage(user_id: Optional[str] = None) -> JournalStorage | SqliteStorage:
+    """Task storage for ``user_id`` (opened from settings on first use).
+
+    Without a user id this is the single shared storage.
+    """
+    global _storage
+    if user_id is None:
+        if _storage is None:
+            _storage = create_storage(settings.TASKS_BACKEND)
+        return _storage
+    with _storages_lock:
+        storage = _user_storages.get(user_id)
+        if storage is None:
+            storage = _user_storages[user_id] = create_storage(settings.TASKS_BACKEND, user_id)
+        return storage
+
+def close_storage(user_id: str) -> None:
+    """Flush and forget one user's storage (e.g. when their session ends)."""
+    with _storages_lock:
+        storage = _user_storages.pop(user_id, None)
+        _user_thread_locks.pop(user_id, None)
+    if storage is not None:
+        storage.close()
+
+def _user_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """User the tool call belongs to: ``user_id`` or the session's ``thread_id``."""
+    configurable = (config or {}).get("configurable") or {}
+    return configurable.get("user_id") or configurable.get("thread_id")
+
+def _user_lock(user_id: Optional[str]) -> asyncio.Lock:
+    locks = _user_locks.setdefault(asyncio.get_running_loop(), {})
+    lock = locks.get(user_id or "")
+    if lock is None:
+        lock = locks[user_id or ""] = asyncio.Lock()
+    return lock
+
+def _user_thread_lock(user_id: Optional[str]) -> threading.Lock:
+    with _storages_lock:
+        lock = _user_thread_locks.get(user_id or "")
+        if lock is None:
+            lock = _user_thread_locks[user_id or ""] = threading.Lock()
+        return lock
+
+def io_tool(func: Optional[Callable[..., Any]] = None, *, response_format: str = "content"):
+    """Like ``@tool``, plus an async path that keeps storage I/O off the event loop.
+
+    ``ainvoke`` runs ``func`` on IO_EXECUTOR while holding the caller's
+    per-user lock, so one user's calls are serialized (find-then-update stays
+    consistent) and other users and the audio pipeline are never blocked.
+    Both paths also take a per-user thread lock around ``func``, so a
+    synchronous ``invoke`` never interleaves with that user's async calls.
+    ``@io_tool(response_format="content_and_artifact")`` is for tools that
+    return ``(text for the model, structured payload)``.
+    """
+    if func is None:
+        return functools.partial(io_tool, response_format=response_format)
+
+    @functools.wraps(func)
+    def locked(*args, config: RunnableConfig = None, **kwargs) -> Any:
+        with _user_thread_lock(_user_id(config)):
+            return func(*args, config=config, **kwargs)
+
+    async def coroutine(*args, config: RunnableConfig = None, **kwargs) -> Any:
+        # The asyncio lock queues a user's calls on the loop, not in executor threads
+        async with _user_lock(_user_id(config)):
+            return await asyncio.get_running_loop().run_in_executor(
+                IO_EXECUTOR, functools.partial(locked, *args, config=config, **kwargs)
+            )
+
+    return StructuredTool.from_function(func=locked, coroutine=coroutine, response_format=response_format)
+
+def _not_found(storage: JournalStorage | SqliteStorage, task_title: str) -> str:
+    """Not-found reply, offering close matches so the agent can recover in one turn."""
+    candidates = storage.title_candidates(task_title)
+    if candidates:
+        options = " or ".join(f"'{task.title}'" for task in candidates)
+        return f"❌ Task '{task_title}' not found. Did you mean {options}?"
+    return f"❌ Task '{task_title}' not found. Try saying 'list tasks' to see available tasks."
+
+def _closest(task: TaskRecord, task_title: str) -> str:
+    """Reply suffix owning up to a fuzzy title match ("" when the title matched as said)."""
+    if normalize_title(task.title) == normalize_title(task_title):
+        return ""
+    return f" (closest match to '{task_title}')"
+
+@io_tool
+def add_task(title: str, description: str = "", priority: str = "medium", config: RunnableConfig = None) -> str:
     """Add a new task to your task list.
     
     Args:
@@ -53,127 +145,169 @@ def add_task(title: str, description: str = "", priority: str = "medium") -> str
         description: Optional detailed description  
         priority: Task priority (low, medium, high)
     """
-    tasks = load_tasks()
+    storage = get_storage(_user_id(config))
     
-    # Generate unique ID
-    task_id = f"task_{len(tasks) + 1}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    # Random, so an id freed by a delete is never handed out again
+    task_id = f"task_{uuid.uuid4().hex}"
     
     # Validate priority
     if priority not in ["low", "medium", "high"]:
         priority = "medium"
     
-    new_task = Task(
+    new_task = TaskRecord(
         id=task_id,
         title=title,
         description=description,
-        priority=priority,
-        created_at=datetime.now()
+        priority=PRIORITY_CODES[priority],
+        created_at=time.time(),
     )
     
-    tasks.append(new_task)
-    save_tasks(tasks)
+    storage.put(new_task)
     
     return f"✅ Added task: '{title}' with {priority} priority"
 
-@tool
-def list_tasks(status: str = "all") -> str:
-    """List your tasks. 
+@io_tool(response_format="content_and_artifact")
+def list_tasks(status: str = "all", page: int = 1, config: RunnableConfig = None) -> tuple[str, dict]:
+    """List your tasks, a few at a time.
     
     Args:
         status: Filter by status (all, pending, completed, in_progress)
+        page: Page to read; when the user says "next page", call again with the next number
     """
-    tasks = load_tasks()
+    storage = get_storage(_user_id(config))
+    status_filter = None if status == "all" else status
     
-    if not tasks:
-        return "📝 No tasks found. Say 'add task' to create your first task!"
+    if not len(storage):
+        return "📝 No tasks found. Say 'add task' to create your first task!", render_task_list([], status_filter)[1]
     
-    if status != "all":
-        tasks = [task for task in tasks if task.status == status]
+    tasks = storage.list(status_filter)
     
     if not tasks:
-        return f"📝 No {status} tasks found"
+        return f"📝 No {status} tasks found", render_task_list([], status_filter)[1]
     
-    result = f"📋 Your tasks ({len(tasks)} total):\n\n"
-    for i, task in enumerate(tasks, 1):
-        status_emoji = "✅" if task.status == "completed" else "⏳" if task.status == "in_progress" else "📌"
-        priority_marker = "🔴" if task.priority == "high" else "🟡" if task.priority == "medium" else "🟢"
-        
-        result += f"{i}. {status_emoji} {priority_marker} {task.title}\n"
-        if task.description:
-            result += f"   💭 {task.description}\n"
-    
-    return result
+    return render_task_list(tasks, status_filter, page, settings.TASK_PAGE_SIZE)
 
-@tool
-def complete_task(task_title: str) -> str:
+@io_tool
+def complete_task(task_title: str, config: RunnableConfig = None) -> str:
     """Mark a task as completed.
     
     Args:
-        task_title: The title of the task to complete
+        task_title: The title of the task to complete (close matches are accepted and named in the reply)
     """
-    tasks = load_tasks()
+    storage = get_storage(_user_id(config))
     
-    for task in tasks:
-        if task.title.lower() == task_title.lower():
-            task.status = "completed"
-            task.completed_at = datetime.now()
-            save_tasks(tasks)
-            return f"✅ Completed task: '{task.title}'"
+    task = storage.find_by_title(task_title)
+    if task:
+        task.status = Status.COMPLETED
+        task.completed_at = time.time()
+        storage.put(task)
+        return f"✅ Completed task: '{task.title}'{_closest(task, task_title)}"
     
-    return f"❌ Task '{task_title}' not found. Try saying 'list tasks' to see available tasks."
+    return _not_found(storage, task_title)
 
-@tool
-def delete_task(task_title: str) -> str:
+@io_tool
+def delete_task(task_title: str, config: RunnableConfig = None) -> str:
     """Delete a task from your list.
     
     Args:
-        task_title: The title of the task to delete
+        task_title: The exact title of the task to delete (a close match is offered back, not deleted)
     """
-    tasks = load_tasks()
+    storage = get_storage(_user_id(config))
     
-    for i, task in enumerate(tasks):
-        if task.title.lower() == task_title.lower():
-            removed_task = tasks.pop(i)
-            save_tasks(tasks)
-            return f"🗑️ Deleted task: '{removed_task.title}'"
+    task = storage.find_by_title(task_title)
+    if task and _closest(task, task_title):
+        # Deleting can't be undone, so a misheard title is confirmed first
+        return f"❓ Did you mean '{task.title}'? Say its exact title to delete it."
+    if task:
+        removed_task = storage.delete(task.id)
+        return f"🗑️ Deleted task: '{removed_task.title}'"
     
-    return f"❌ Task '{task_title}' not found. Try saying 'list tasks' to see available tasks."
+    return _not_found(storage, task_title)
 
-@tool
-def update_task_priority(task_title: str, priority: str) -> str:
+@io_tool
+def update_task_priority(task_title: str, priority: str, config: RunnableConfig = None) -> str:
     """Update the priority of a task.
     
     Args:
-        task_title: The title of the task to update
+        task_title: The title of the task to update (close matches are accepted and named in the reply)
         priority: New priority (low, medium, high)
     """
     if priority not in ["low", "medium", "high"]:
         return "❌ Priority must be 'low', 'medium', or 'high'"
     
-    tasks = load_tasks()
+    storage = get_storage(_user_id(config))
     
-    for task in tasks:
-        if task.title.lower() == task_title.lower():
-            task.priority = priority
-            save_tasks(tasks)
-            priority_emoji = "🔴" if priority == "high" else "🟡" if priority == "medium" else "🟢"
-            return f"📝 Updated '{task.title}' priority to {priority} {priority_emoji}"
+    task = storage.find_by_title(task_title)
+    if task:
+        task.priority = PRIORITY_CODES[priority]
+        storage.put(task)
+        priority_emoji = "🔴" if priority == "high" else "🟡" if priority == "medium" else "🟢"
+        return f"📝 Updated '{task.title}' priority to {priority} {priority_emoji}{_closest(task, task_title)}"
     
-    return f"❌ Task '{task_title}' not found. Try saying 'list tasks' to see available tasks."
+    return _not_found(storage, task_title)
+
+@io_tool
+def set_due_date(task_title: str, due: str, config: RunnableConfig = None) -> str:
+    """Set or clear when a task is due.
+    
+    Args:
+        task_title: The title of the task (close matches are accepted and named in the reply)
+        due: 'today', 'tomorrow', 'in N days', a date (2025-03-14) or date and time (2025-03-14T17:00); 'none' clears it
+    """
+    storage = get_storage(_user_id(config))
+    
+    task = storage.find_by_title(task_title)
+    if not task:
+        return _not_found(storage, task_title)
+    
+    now = clock()
+    if due.strip().lower() in ("", "none", "clear"):
+        task.due_date = None
+        storage.put(task)
+        return f"📅 Cleared the due date of '{task.title}'{_closest(task, task_title)}"
+    
+    due_at = parse_due(due, now)
+    if due_at is None:
+        return "❌ Due date must be 'today', 'tomorrow', 'in N days' or a date like 2025-03-14"
+    task.due_date = due_at
+    storage.put(task)
+    return f"📅 '{task.title}' is due {spoken_due(due_at, now)}{_closest(task, task_title)}"
+
+@io_tool(response_format="content_and_artifact")
+def list_due_tasks(window: str = "today", days: int = 7, page: int = 1, config: RunnableConfig = None) -> tuple[str, dict]:
+    """List unfinished tasks by due date, a few at a time.
+    
+    Args:
+        window: 'overdue', 'today', or 'upcoming' (due within the next ``days`` days)
+        days: How far ahead 'upcoming' looks, in days
+        page: Page to read; when the user says "next page", call again with the next number
+    """
+    now = clock()
+    bounds = due_window(window, days, now)
+    if bounds is None:
+        return "❌ Window must be 'overdue', 'today' or 'upcoming'", {"window": window, "total": 0, "tasks": []}
+    start, end, phrase = bounds
+    
+    storage = get_storage(_user_id(config))
+    page_size = settings.TASK_PAGE_SIZE
+    total = storage.count_due(start, end)
+    page, _, offset, _ = paginate(total, page, page_size)
+    shown = storage.due_between(start, end, offset, page_size)
+    return render_due_tasks(shown, total, window, phrase, now, page, page_size)
 
-@tool
-def get_task_summary() -> str:
+@io_tool
+def get_task_summary(config: RunnableConfig = None) -> str:
     """Get a summary of all your tasks."""
-    tasks = load_tasks()
+    counts = get_storage(_user_id(config)).summary()
     
-    if not tasks:
+    if not counts["total"]:
         return "🎉 No tasks! You're all caught up!"
     
-    pending = len([t for t in tasks if t.status == "pending"])
-    in_progress = len([t for t in tasks if t.status == "in_progress"])
-    completed = len([t for t in tasks if t.status == "completed"])
+    pending = counts["pending"]
+    in_progress = counts["in_progress"]
+    completed = counts["completed"]
     
-    high_priority = len([t for t in tasks if t.priority == "high" and t.status != "completed"])
+    high_priority = counts["high_priority"]
     
     summary = f"📊 Task Summary:\n"
     summary += f"📌 Pending: {pending}\n"
@@ -0,0 +1,89 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.prebuilt import create_react_agent
+
+from conftest import tool_call
+from task_manager.context import SUMMARY_PREFIX, ContextWindow, RollingSummarizer
+
+
+def count_words(messages) -> int:
+    """Deterministic tokenizer: one token per word plus one per message."""
+    return sum(len(m.text.split()) + 1 for m in messages)
+
+
+def history(turns: int) -> list:
+    messages = [SystemMessage(content="You are a helpful voice task manager.", id="sys")]
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"add task number {i} please", id=f"h{i}"))
+        messages.append(AIMessage(content=f"Added task {i}", id=f"a{i}"))
+    return messages
+
+
+def add_todo(task: str) -> str:
+    """Add a new task."""
+    return f"Added task #1: {task}"
+
+
+def test_trim_stays_within_budget_as_history_grows():
+    window = ContextWindow(max_tokens=40, keep_last_turns=100, token_counter=count_words)
+
+    for turns in (1, 5, 50, 500):
+        kept, dropped = window.trim(history(turns))
+
+        assert count_words(kept) <= 40
+        assert kept[0].id == "sys"
+        assert kept[-1].id == f"a{turns - 1}"
+        assert len(kept) - 1 + len(dropped) == 2 * turns
+
+
+def test_trim_keeps_last_n_turns_and_tool_pairs():
+    messages = history(5) + [
+        HumanMessage(content="add task buy milk", id="h5"),
+        tool_call("add_todo", {"task": "buy milk"}, call_id="c1"),
+        ToolMessage(content="Added task #6: buy milk", tool_call_id="c1", id="t5"),
+        AIMessage(content="Added buy milk", id="a5"),
+    ]
+    window = ContextWindow(max_tokens=1000, keep_last_turns=2, token_counter=count_words)
+
+    kept, _ = window.trim(messages)
+
+    assert [m.id for m in kept[1:3]] == ["h4", "a4"]
+    assert [m.type for m in kept[3:]] == ["human", "ai", "tool", "ai"]
+
+
+def test_agent_model_input_is_bounded(fake_model):
+    model = fake_model("Done")
+    window = ContextWindow(max_tokens=30, keep_last_turns=4, token_counter=count_words)
+    graph = create_react_agent(
+        model=model, tools=[add_todo], pre_model_hook=window.as_pre_model_hook(), prompt="Be brief."
+    )
+
+    final_state = asyncio.run(graph.ainvoke({"messages": history(200) + [HumanMessage(content="list tasks")]}))
+
+    model_input = model.inputs[-1][1:]  # drop the agent prompt
+    assert count_words(model_input) <= 30
+    assert model_input[-1].content == "list tasks"
+    assert len(final_state["messages"]) == 403  # state itself is not trimmed
+
+
+def test_rolling_summary_is_computed_in_background(fake_model):
+    summary_model = fake_model("User added tasks zero to nine")
+    window = ContextWindow(
+        max_tokens=40, keep_last_turns=3, token_counter=count_words,
+        summarizer=RollingSummarizer(summary_model),
+    )
+    config = {"configurable": {"thread_id": "room-1"}}
+
+    async def run():
+        first = await window._ahook({"messages": history(10)}, config)
+        await asyncio.gather(*(t["task"] for t in window.summarizer._threads.values()))
+        second = await window._ahook({"messages": history(10)}, config)
+        return first["llm_input_messages"], second["llm_input_messages"]
+
+    first, second = asyncio.run(run())
+
+    assert not any(m.text.startswith(SUMMARY_PREFIX) for m in first)
+    assert second[1].text == SUMMARY_PREFIX + "User added tasks zero to nine"
+    assert count_words(second) <= 40
+    assert summary_model.calls == 1
@@ -0,0 +1,125 @@
+import random
+
+import pytest
+from livekit import rtc
+from livekit.agents import metrics
+from livekit.agents.voice.events import MetricsCollectedEvent, UserStateChangedEvent
+
+from adapter.endpointing import EndpointingController, P2Quantile, Segment, attach_endpointing, replay
+from adapter.metrics import InMemorySink
+from benchmarks.fakes import talker_timeline
+
+
+@pytest.mark.parametrize("q", [0.5, 0.75, 0.95])
+def test_p2_tracks_exact_quantile(q):
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(0, 0.5) for _ in range(5000)]
+    estimate = P2Quantile(q)
+    for x in samples:
+        estimate.add(x)
+    exact = sorted(samples)[int(q * len(samples))]
+    assert estimate.value() == pytest.approx(exact, rel=0.03)
+    assert len(estimate._heights) == 5
+
+
+def test_p2_is_exact_for_first_observations():
+    estimate = P2Quantile(0.5)
+    for x in (3.0, 1.0, 2.0):
+        estimate.add(x)
+    assert estimate.value() == 2.0
+
+
+def test_delays_stay_within_bounds():
+    updates = []
+    controller = EndpointingController(apply=lambda lo, hi: updates.append((lo, hi)), warmup=3)
+    at = 0.0
+    for pause in [0.05] * 10 + [10.0] * 30:  # absurdly short, then absurdly long pauses
+        controller.speech_ended(at)
+        at += pause
+        controller.speech_started(at)
+    assert updates[0] == (0.2, 0.8)
+    assert updates[-1] == (1.2, 3.0)
+    assert all(0.2 <= lo <= 1.2 and 0.8 <= hi <= 3.0 and lo <= hi for lo, hi in updates)
+
+
+def test_min_delay_stays_at_floor_for_pauses_just_past_the_vad_window():
+    controller = EndpointingController(0.2, 2.0, warmup=3, vad_silence=0.55)
+    at = 0.0
+    for pause in [0.6, 0.65, 0.7, 0.62, 0.68] * 4:  # a fast talker: every pause the VAD reports is short
+        controller.speech_ended(at)
+        at += pause
+        controller.speech_started(at)
+    assert controller.min_delay == 0.2
+    assert controller.max_delay < 1.2
+
+
+def test_only_quick_resumes_count_as_false_endpoints():
+    sink = InMemorySink()
+    controller = EndpointingController(sink=sink)
+    controller.speech_ended(10.0)
+    controller.turn_ended(10.6)
+    controller.speech_started(11.2)  # picked up where they left off
+    controller.speech_ended(13.0)
+    controller.turn_ended(13.6)
+    controller.speech_started(20.0)  # a new turn after the agent replied
+    assert controller.false_endpoints == 1 and controller.pauses == 1
+    assert sink.percentiles("endpointing_false_endpoint_seconds")["p50"] == pytest.approx(1.2)
+
+
+@pytest.mark.parametrize("pause_median", [0.3, 0.8])
+def test_replay_against_fixed_delays(pause_median):
+    timeline = talker_timeline(random.Random(1), pause_median)
+    fixed = replay(timeline, min_delay=0.2, max_delay=2.0)
+    adaptive = replay(timeline, EndpointingController(0.2, 2.0))
+
+    assert adaptive.turns == fixed.turns
+    if pause_median < 0.5:
+        # min_delay stays at its floor; the shorter max_delay costs at most a cut-off in a hundred turns.
+        assert adaptive.mean_latency < fixed.mean_latency - 0.1
+        assert adaptive.false_endpoint_rate <= fixed.false_endpoint_rate + 0.01
+    else:
+        # Never worse on cut-offs; the cost of waiting out a slow talker's pauses is bounded.
+        assert adaptive.false_endpoint_rate <= fixed.false_endpoint_rate
+        assert adaptive.mean_latency < fixed.mean_latency + 0.5
+
+
+def test_replay_matches_endpointer_rules():
+    timeline = [
+        Segment(0.0, 1.0, False, False),
+        Segment(1.3, 2.0, True, False),  # 0.3 s pause: below the VAD's silence window
+        Segment(3.0, 4.0, True, True),  # 1.0 s pause after a "done" verdict: cut off before it
+        Segment(9.0, 10.0, False, True),
+    ]
+    stats = replay(timeline, min_delay=0.2, max_delay=2.0)
+    assert (stats.turns, stats.false_endpoints, stats.latencies) == (2, 1, [0.55, 2.0])
+
+
+class FakeSession(rtc.EventEmitter):
+    def __init__(self):
+        super().__init__()
+        self.options: list[dict] = []
+
+    def update_options(self, **options):
+        self.options.append(options)
+
+
+def test_session_events_retune_the_session():
+    session, sink = FakeSession(), InMemorySink()
+    controller = EndpointingController(sink=sink, warmup=2, vad_silence=0.5)
+    attach_endpointing(session, controller)
+
+    at = 100.0
+    for _ in range(3):  # 1.5 s pauses that end turns early, each resumed at once
+        session.emit("user_state_changed", UserStateChangedEvent(old_state="listening", new_state="speaking", created_at=at))
+        session.emit("user_state_changed", UserStateChangedEvent(old_state="speaking", new_state="listening", created_at=at + 2.5))
+        session.emit("metrics_collected", MetricsCollectedEvent(metrics=metrics.EOUMetrics(
+            timestamp=at + 2.7, end_of_utterance_delay=0.7, transcription_delay=0.1,
+            on_user_turn_completed_delay=0.0, last_speaking_time=at + 2.0,
+        )))
+        at += 3.5
+
+    assert controller.false_endpoints == 2
+    # 1 s past the VAD's silence window before they resume
+    assert session.options == [{"min_endpointing_delay": 1.0, "max_endpointing_delay": 1.75}]
+    assert sink.percentiles("endpointing_delay_seconds", bound="min")["p50"] == 1.0
+    assert sink.percentiles("endpointing_pause_seconds")["count"] == 2
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Generous wall-clock budgets (ms, cumulative -X importtime) on top of the
+# deterministic "heavy module not imported" checks below. The adapter budget
+# excludes livekit.agents itself, which it must subclass.
+TASK_MANAGER_BUDGET_MS = 1200
+ADAPTER_BUDGET_MS = 600
+
+DEFERRED = ("langchain_openai", "langgraph.prebuilt", "langgraph.graph", "langgraph.checkpoint.memory")
+
+PROBE = f"""
+import sys
+import {{modules}}
+from config.settings import settings
+print("settings loaded:", settings.loaded)
+print("deferred:", [m for m in {DEFERRED!r} if m in sys.modules])
+"""
+
+
+def import_profile(tmp_path, *modules: str) -> tuple[dict[str, float], str]:
+    """Import ``modules`` in a fresh interpreter with no credentials in the environment."""
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("OPENAI_API_KEY", "GOOGLE_APPLICATION_CREDENTIALS", "ELEVEN_API_KEY",
+                        "LIVEKIT_URL", "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET")}
+    env["PYTHONPATH"] = ROOT
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(modules=", ".join(modules))],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _self, cum, name = line.split(":", 1)[1].split("|")
+            cumulative[name.strip()] = int(cum) / 1000
+    return cumulative, result.stdout
+
+
+def test_task_manager_imports_stay_light(tmp_path):
+    modules = ("task_manager.graph_simple", "task_manager.tools", "task_manager.store", "task_manager.router")
+    cumulative, stdout = import_profile(tmp_path, *modules)
+
+    assert "settings loaded: False" in stdout
+    assert "deferred: []" in stdout
+    total = sum(cumulative[m] for m in modules)
+    assert total < TASK_MANAGER_BUDGET_MS, f"task_manager import took {total:.0f} ms"
+
+
+def test_adapter_imports_stay_light(tmp_path):
+    cumulative, stdout = import_profile(tmp_path, "adapter.langgraph", "adapter.metrics")
+
+    assert "deferred: []" in stdout
+    own = cumulative["adapter.langgraph"] - cumulative["livekit.agents"]
+    assert own < ADAPTER_BUDGET_MS, f"adapter import took {own:.0f} ms beyond livekit.agents"
+
+
+def test_settings_validate_on_first_use(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env["PYTHONPATH"] = ROOT
+    result = subprocess.run(
+        [sys.executable, "-c", "from config.settings import settings; settings.TASKS_BACKEND"],
+        cwd=tmp_path, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode != 0 and "OPENAI_API_KEY" in result.stderr
@@ -0,0 +1,271 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+from livekit.agents import llm
+from langgraph.prebuilt import create_react_agent
+
+from adapter.langgraph import LangGraphAdapter, MessageCache, ResponseCache, session_thread_id
+from conftest import FakeChatModel, command_responder, tool_call
+from task_manager import graph_simple
+from task_manager.graph_simple import create_checkpointer
+
+
+def add_todo(task: str) -> str:
+    """Add a new task."""
+    return f"Added task #1: {task}"
+
+
+def build_graph(model, checkpointer=None):
+    return create_react_agent(
+        model=model, tools=[add_todo], checkpointer=checkpointer, prompt="You are a voice task manager."
+    )
+
+
+class RecordingGraph:
+    """Delegates to a compiled graph and records how many messages each turn sends."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.payload_sizes: list[int] = []
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def astream(self, state, config=None, **kwargs):
+        self.payload_sizes.append(len(state["messages"]))
+        return self.graph.astream(state, config, **kwargs)
+
+    async def ainvoke(self, state, config=None, **kwargs):
+        self.payload_sizes.append(len(state["messages"]))
+        return await self.graph.ainvoke(state, config, **kwargs)
+
+
+def user_ctx(*texts: str) -> llm.ChatContext:
+    chat_ctx = llm.ChatContext.empty()
+    for text in texts:
+        chat_ctx.add_message(role="user", content=text)
+    return chat_ctx
+
+
+async def collect(adapter: LangGraphAdapter, chat_ctx: llm.ChatContext) -> tuple[str, float | None]:
+    """Drain one turn, returning the spoken text and when the first chunk arrived."""
+    loop = asyncio.get_running_loop()
+    text, first_chunk_at = "", None
+    async with adapter.chat(chat_ctx=chat_ctx) as stream:
+        async for chunk in stream:
+            if first_chunk_at is None:
+                first_chunk_at = loop.time()
+            text += chunk.delta.content
+    return text, first_chunk_at
+
+
+def test_streaming_sends_first_chunk_before_graph_completes(fake_model):
+    reply = "Added task one buy milk to your list"
+
+    async def run():
+        model = fake_model(tool_call("add_todo", {"task": "buy milk"}), reply, token_delay=0.02)
+        adapter = LangGraphAdapter(graph=build_graph(model), streaming=True)
+        text, first_chunk_at = await collect(adapter, user_ctx("add task buy milk"))
+        return text, first_chunk_at, model.finished_at[-1]
+
+    text, first_chunk_at, graph_done_at = asyncio.run(run())
+
+    assert text == reply
+    assert first_chunk_at is not None
+    assert first_chunk_at < graph_done_at
+
+
+def test_streaming_matches_ainvoke_text(fake_model):
+    script = (tool_call("add_todo", {"task": "call mom"}), "  Added task one call mom  ")
+
+    async def run(streaming: bool) -> str:
+        adapter = LangGraphAdapter(graph=build_graph(fake_model(*script)), streaming=streaming)
+        text, _ = await collect(adapter, user_ctx("hello", "add task call mom"))
+        return text
+
+    assert asyncio.run(run(streaming=True)).strip() == asyncio.run(run(streaming=False))
+
+
+def test_streamed_preamble_before_tool_call_is_kept_out_of_the_reply(fake_model):
+    preamble = AIMessage(content="Let me check.", tool_calls=[{"name": "list_todos", "args": {}, "id": "call_1"}])
+    script = (preamble, "You have no tasks.")
+    cache = ResponseCache()
+
+    async def run(streaming: bool) -> str:
+        adapter = LangGraphAdapter(
+            graph=build_graph(fake_model(*script)), streaming=streaming,
+            response_cache=cache if streaming else None, store_version=lambda: 0,
+        )
+        text, _ = await collect(adapter, user_ctx("what is on my list"))
+        return text
+
+    # Already spoken when the tool call showed up, so it stays, set off from the answer...
+    assert asyncio.run(run(streaming=True)) == "Let me check. You have no tasks."
+    # ...but the reply (and what is cached) is the one ainvoke gives.
+    assert asyncio.run(run(streaming=False)) == "You have no tasks."
+    assert cache.get("what is on my list", 0) == "You have no tasks."
+
+
+def test_streaming_without_text_uses_fallback(fake_model):
+    async def run() -> str:
+        adapter = LangGraphAdapter(graph=build_graph(fake_model("")), streaming=True)
+        text, _ = await collect(adapter, user_ctx("list my tasks"))
+        return text
+
+    assert asyncio.run(run()) == "Here are your current tasks."
+
+
+def test_message_cache_reuses_unchanged_items():
+    cache = MessageCache()
+    chat_ctx = user_ctx("add task buy milk")
+    chat_ctx.add_message(role="assistant", content="Added task one")
+
+    first = cache.convert(chat_ctx.items)
+    chat_ctx.add_message(role="user", content="list tasks")
+    second = cache.convert(chat_ctx.items)
+
+    assert [m.content for m in second] == ["add task buy milk", "Added task one", "list tasks"]
+    assert second[0] is first[0] and second[1] is first[1]
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_message_cache_reconverts_changed_items():
+    cache = MessageCache()
+    chat_ctx = user_ctx("add task buy")
+    first = cache.convert(chat_ctx.items)
+
+    # Interim transcripts update the same item in place
+    chat_ctx.items[0].content = ["add task buy groceries"]
+    second = cache.convert(chat_ctx.items)
+
+    assert second[0] is not first[0]
+    assert second[0].content == "add task buy groceries"
+    assert second[0].id == first[0].id
+
+
+async def converse(adapter: LangGraphAdapter, turns: int) -> list[str]:
+    """Simulate LiveKit appending each user utterance and spoken reply to the context."""
+    chat_ctx, replies = llm.ChatContext.empty(), []
+    chat_ctx.add_message(role="assistant", content="Hi! I'm your voice task manager.")
+    for turn in range(turns):
+        chat_ctx.add_message(role="user", content=f"add task number {turn}")
+        text, _ = await collect(adapter, chat_ctx)
+        chat_ctx.add_message(role="assistant", content=text)
+        replies.append(text)
+    return replies
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_checkpointing_keeps_payload_flat(fake_model, tmp_path, backend):
+    turns = 20
+    config = {"configurable": {"thread_id": session_thread_id("room-1", "caller")}}
+
+    async def run():
+        # The SQLite saver binds to the running loop, so build it inside one.
+        checkpointer = create_checkpointer(backend, sqlite_path=str(tmp_path / "checkpoints.sqlite"))
+        graph = RecordingGraph(build_graph(fake_model("Added it"), checkpointer))
+        adapter = LangGraphAdapter(graph=graph, config=config, streaming=True, checkpointing=True)
+
+        await converse(adapter, turns)
+        snapshot = await graph.graph.aget_state(config)
+        if backend == "sqlite":
+            await checkpointer.conn.close()
+        return graph.payload_sizes, snapshot.values["messages"]
+
+    payload_sizes, history = asyncio.run(run())
+
+    # First turn carries the greeting too; every later turn sends only the new utterance.
+    assert payload_sizes[0] == 2
+    assert payload_sizes[1:] == [1] * (turns - 1)
+    assert len(history) == 1 + 2 * turns
+    assert [m.type for m in history[-2:]] == ["human", "ai"]
+
+
+def test_without_checkpointing_payload_grows(fake_model):
+    graph = RecordingGraph(build_graph(fake_model("Added it")))
+    asyncio.run(converse(LangGraphAdapter(graph=graph, streaming=True), turns=5))
+
+    assert graph.payload_sizes == [2, 4, 6, 8, 10]
+
+
+def test_checkpointing_requires_thread_id(fake_model):
+    with pytest.raises(ValueError):
+        LangGraphAdapter(graph=build_graph(fake_model("hi")), checkpointing=True)
+
+
+def cached_adapter(room: str, *, use_fast_path: bool, streaming: bool) -> tuple[LangGraphAdapter, FakeChatModel]:
+    model = FakeChatModel(respond=command_responder, inputs=[], finished_at=[])
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=use_fast_path)
+    config = graph_simple.session_config(room)
+    store = config["configurable"]["task_store"]
+    adapter = LangGraphAdapter(
+        graph=graph, config=config, streaming=streaming,
+        response_cache=ResponseCache(), store_version=lambda: store.version,
+    )
+    return adapter, model
+
+
+async def say(adapter: LangGraphAdapter, chat_ctx: llm.ChatContext, text: str) -> str:
+    chat_ctx.add_message(role="user", content=text)
+    reply, _ = await collect(adapter, chat_ctx)
+    chat_ctx.add_message(role="assistant", content=reply)
+    return reply
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+@pytest.mark.parametrize("use_fast_path", [True, False])
+def test_response_cache_invalidated_by_mutations(streaming, use_fast_path):
+    adapter, model = cached_adapter(f"cache-{streaming}-{use_fast_path}", use_fast_path=use_fast_path, streaming=streaming)
+    chat_ctx = llm.ChatContext.empty()
+
+    async def run():
+        return [await say(adapter, chat_ctx, text) for text in (
+            "add task buy milk", "list tasks", "add task call mom", "list tasks", "List tasks.",
+        )]
+
+    replies = asyncio.run(run())
+
+    assert replies[1] == "You have 1 task: buy milk - pending"
+    assert replies[3].startswith("You have 2 tasks") and replies[4] == replies[3]
+    assert adapter.response_cache.stats() == {"hits": 1, "misses": 4, "entries": 2}
+    if not use_fast_path:
+        # Two model calls (tool call + read-back) per graph turn; the hit made none.
+        assert model.calls == 8
+
+
+def test_response_cache_skips_turns_without_read_only_tools(fake_model):
+    store = graph_simple.TaskStore()
+    adapter = LangGraphAdapter(
+        graph=build_graph(fake_model("Hi! Try 'add task' or 'list tasks'")),
+        response_cache=ResponseCache(), store_version=lambda: store.version,
+    )
+    chat_ctx = llm.ChatContext.empty()
+
+    async def run():
+        for _ in range(2):
+            await say(adapter, chat_ctx, "hello")
+
+    asyncio.run(run())
+    assert adapter.response_cache.stats() == {"hits": 0, "misses": 2, "entries": 0}
+
+
+def test_response_cache_expires_and_evicts():
+    now = [0.0]
+    cache = ResponseCache(max_entries=2, ttl=10.0, clock=lambda: now[0])
+    cache.put("list tasks", 1, "You have 1 task")
+    cache.put("show my tasks", 1, "You have 1 task")
+
+    assert cache.get("Please, list tasks!", 1) == "You have 1 task"
+    assert cache.get("list tasks", 2) is None
+    cache.put("what is pending", 1, "Nothing")  # evicts the least recently used entry
+    assert cache.get("show my tasks", 1) is None
+
+    now[0] = 11.0
+    assert cache.get("list tasks", 1) is None
+    assert len(cache) == 1
+
+
+def test_response_cache_requires_store_version(fake_model):
+    with pytest.raises(ValueError):
+        LangGraphAdapter(graph=build_graph(fake_model("hi")), response_cache=ResponseCache())
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+from uuid import uuid4
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+from langchain_core.tools import StructuredTool
+from livekit import rtc
+from livekit.agents import metrics
+from livekit.agents.voice.events import AgentStateChangedEvent, MetricsCollectedEvent, UserStateChangedEvent
+
+from adapter.langgraph import LangGraphAdapter
+from adapter.metrics import InMemorySink, PrometheusFileSink, attach_session_metrics
+from task_manager import graph_simple
+from test_langgraph_adapter import collect, user_ctx
+
+
+def add_todo(task: str) -> str:
+    """Add a new task."""
+    time.sleep(0.02)
+    return f"Added task #1: {task}"
+
+
+class FakeGraph:
+    """Scripted graph: runs one tool through the callback system, then streams words."""
+
+    def __init__(self, words: list[str], token_delay: float = 0.01):
+        self.words = words
+        self.token_delay = token_delay
+        self.configs: list[dict] = []
+
+    async def astream(self, state, config=None, **kwargs):
+        self.configs.append(config)
+        for handler in config.get("callbacks") or []:
+            handler.on_chain_start({}, state, run_id=uuid4())
+        result = await StructuredTool.from_function(add_todo).ainvoke({"task": "buy milk"}, config)
+        yield (), (ToolMessage(content=result, name="add_todo", tool_call_id="call_1"), {})
+        for word in self.words:
+            await asyncio.sleep(self.token_delay)
+            yield (), (AIMessageChunk(content=word + " ", id="run-1"), {})
+
+
+def test_adapter_records_turn_spans():
+    sink = InMemorySink()
+    adapter = LangGraphAdapter(graph=FakeGraph(["Added", "buy", "milk"]), streaming=True, metrics=sink)
+
+    text, _ = asyncio.run(collect(adapter, user_ctx("add task buy milk")))
+
+    assert text.strip() == "Added buy milk"
+    for name in ("context_conversion_seconds", "graph_start_seconds"):
+        assert sink.percentiles(name)["count"] == 1
+    tool = sink.percentiles("tool_call_seconds", tool="add_todo")
+    assert tool["count"] == 1 and tool["p50"] >= 0.02
+    first = sink.percentiles("first_token_seconds", path="graph")["p50"]
+    final = sink.percentiles("final_chunk_seconds", path="graph")["p50"]
+    assert sink.percentiles("graph_start_seconds")["p50"] <= first < final
+    assert final - first >= 2 * 0.01
+
+
+def test_fast_path_tool_calls_are_named(fake_model):
+    sink = InMemorySink()
+    graph = graph_simple.create_task_manager_graph(model=fake_model("unused"))
+    adapter = LangGraphAdapter(graph=graph, config=graph_simple.session_config("metrics-room"), metrics=sink)
+
+    asyncio.run(collect(adapter, user_ctx("list tasks")))
+
+    assert sink.percentiles("tool_call_seconds", tool="list_todos")["count"] == 1
+    assert sink.percentiles("final_chunk_seconds", path="graph")["count"] == 1
+
+
+def test_disabled_metrics_leave_config_untouched():
+    graph = FakeGraph(["Hi"])
+    config = {"configurable": {"thread_id": "t"}}
+    asyncio.run(collect(LangGraphAdapter(graph=graph, config=config, streaming=True), user_ctx("hello")))
+
+    assert graph.configs == [config]
+
+
+def test_histogram_percentiles():
+    sink = InMemorySink(window=100)
+    for value in range(1, 201):
+        sink.record("first_token_seconds", value / 100)
+
+    # Only the last 100 samples are kept; count covers all of them.
+    assert sink.percentiles("first_token_seconds") == {"p50": 1.5, "p95": 1.95, "p99": 1.99, "count": 200}
+    assert sink.percentiles("missing") == {}
+
+
+def test_prometheus_file_sink_writes_summaries(tmp_path):
+    path = tmp_path / "metrics" / "voice.prom"
+    sink = PrometheusFileSink(str(path), flush_interval=3600)
+    sink.record("tool_call_seconds", 0.25, {"tool": "add_todo"})
+    sink.record("tool_call_seconds", 0.75, {"tool": "add_todo"})
+    assert not path.exists()
+
+    sink.flush()
+    lines = path.read_text().splitlines()
+    assert lines[0] == "# TYPE voice_agent_tool_call_seconds summary"
+    assert 'voice_agent_tool_call_seconds{tool="add_todo",quantile="0.5"} 0.250000' in lines
+    assert 'voice_agent_tool_call_seconds_count{tool="add_todo"} 2' in lines
+
+
+def test_prometheus_file_sink_flushes_off_the_caller_and_survives_disk_errors(tmp_path, caplog):
+    path = tmp_path / "voice.prom"
+    sink = PrometheusFileSink(str(path), flush_interval=0)
+    writers = []
+    render = sink.render
+    sink.render = lambda: writers.append(threading.current_thread()) or render()
+
+    sink.record("tool_call_seconds", 0.25)
+    sink._pending.result(timeout=5)
+    assert writers and writers[0] is not threading.current_thread()
+    assert "voice_agent_tool_call_seconds_count 1" in path.read_text()
+
+    # A path under a regular file can never be written: recording keeps working.
+    broken = PrometheusFileSink(str(path / "voice.prom"), flush_interval=0)
+    broken.record("tool_call_seconds", 0.25)
+    broken._pending.result(timeout=5)
+    broken.flush()
+    assert broken.percentiles("tool_call_seconds")["count"] == 1
+    assert "Could not write metrics" in caplog.text
+
+
+def test_session_events_become_spans():
+    session, sink = rtc.EventEmitter(), InMemorySink()
+    attach_session_metrics(session, sink)
+
+    session.emit("metrics_collected", MetricsCollectedEvent(metrics=metrics.TTSMetrics(
+        label="tts", request_id="r", timestamp=0.0, ttfb=0.3, duration=1.0, audio_duration=2.0,
+        cancelled=False, characters_count=20, streamed=True,
+    )))
+    session.emit("user_state_changed", UserStateChangedEvent(old_state="speaking", new_state="listening", created_at=10.0))
+    session.emit("agent_state_changed", AgentStateChangedEvent(old_state="thinking", new_state="speaking", created_at=10.8))
+
+    assert sink.percentiles("tts_ttfb_seconds")["p50"] == 0.3
+    assert abs(sink.percentiles("response_latency_seconds")["p50"] - 0.8) < 1e-9
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+from livekit.agents import llm
+
+from adapter.langgraph import LangGraphAdapter
+from agent_complete import start_reminders
+from benchmarks.fakes import ScriptedResponder
+from task_manager import graph_simple
+from task_manager.records import Status, TaskRecord
+from task_manager.reminders import ReminderQueue, ReminderScheduler
+from task_manager.storage import JournalStorage
+from task_manager.tools import IO_EXECUTOR
+
+
+def test_queue_fires_in_due_order_after_moves_and_cancels():
+    queue = ReminderQueue()
+    for i, due in enumerate([50.0, 10.0, 30.0, 20.0]):
+        queue.schedule(f"t{i}", due)
+    queue.schedule("t0", 5.0)  # moved earlier
+    queue.cancel("t3")
+
+    assert queue.next_due() == 5.0
+    assert queue.pop_due(15.0) == [("t0", 5.0), ("t1", 10.0)]
+    assert queue.pop_due(15.0) == []
+    assert queue.pop_due(100.0) == [("t2", 30.0)]
+    assert len(queue) == 0 and queue.next_due() is None
+
+
+def test_queue_compacts_stale_entries():
+    queue = ReminderQueue()
+    for due in range(1000):
+        queue.schedule("t", float(due))
+    assert len(queue._heap) < 100
+    assert queue.pop_due(2000.0) == [("t", 999.0)]
+
+
+def task(task_id: str, due: float | None) -> TaskRecord:
+    return TaskRecord(task_id, task_id, due_date=due, created_at=0.0)
+
+
+def test_scheduler_fires_each_due_task_once_from_a_timer(tmp_path):
+    storage = JournalStorage(str(tmp_path / "tasks.json"))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        storage.put(task("overdue", now - 60))
+        storage.put(task("soon", now + 0.05))
+        storage.put(task("moved", now + 0.05))
+        storage.put(task("done", now + 0.1))
+        fired = []
+        reminders = ReminderScheduler(storage, lambda t: fired.append((t.id, time.time() - t.due_date)))
+        reminders.start()
+        armed = len(loop._scheduled)
+
+        storage.put(task("moved", now + 0.15))
+        finished = storage.get("done")
+        finished.status = Status.COMPLETED
+        storage.put(finished)
+        # Tools write from worker threads.
+        await loop.run_in_executor(IO_EXECUTOR, storage.put, task("added", now + 0.1))
+        await asyncio.sleep(0.3)
+        reminders.close()
+        return fired, armed, reminders
+
+    fired, armed, reminders = asyncio.run(run())
+    storage.close()
+
+    assert [task_id for task_id, _ in fired] == ["soon", "added", "moved"]
+    assert all(0 <= late < 0.05 for _, late in fired)
+    assert armed == 1  # one timer for the earliest reminder, nothing polling
+    assert reminders.fired == 3 and len(reminders.queue) == 0
+
+
+def test_scheduler_honours_lead_time(tmp_path):
+    storage = JournalStorage(str(tmp_path / "tasks.json"))
+    due = datetime.now().timestamp() + 10.0
+
+    async def run():
+        fired = []
+        reminders = ReminderScheduler(storage, lambda t: fired.append(t.id), lead=9.9)
+        reminders.start()
+        storage.put(task("call", due))
+        await asyncio.sleep(0.25)
+        reminders.close()
+        return fired
+
+    assert asyncio.run(run()) == ["call"]
+    storage.close()
+
+
+def test_scheduler_reads_storage_off_the_event_loop(tmp_path):
+    storage = JournalStorage(str(tmp_path / "tasks.json"))
+    reads = []
+    get = storage.get
+    storage.get = lambda task_id: reads.append(threading.current_thread()) or get(task_id)
+
+    async def run():
+        fired = []
+        reminders = ReminderScheduler(storage, lambda t: fired.append(t.id))
+        reminders.start()
+        storage.put(task("call", time.time() + 0.05))
+        await asyncio.sleep(0.2)
+        reminders.close()
+        return fired
+
+    assert asyncio.run(run()) == ["call"]
+    assert reads and threading.main_thread() not in reads
+    storage.close()
+
+
+class FakeSession:
+    def __init__(self):
+        self.said: list[str] = []
+
+    def say(self, text: str) -> None:
+        self.said.append(text)
+
+
+def test_voice_turns_set_a_due_date_that_is_listed_and_reminded(fake_model):
+    due = datetime.fromtimestamp(time.time() + 0.4).isoformat(timespec="milliseconds")
+    model = fake_model()
+    model.respond = ScriptedResponder({
+        "pay rent is due soon": ("set_due_date", {"todo_id": 1, "due": due}),
+        "what's due this week": ("list_due_todos", {"window": "upcoming", "days": 7}),
+    })
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=False)
+    thread_id = "room-due:caller"
+
+    async def run():
+        session = FakeSession()
+        reminders = start_reminders(session, graph_simple.STORES.get(thread_id))
+        adapter = LangGraphAdapter(graph=graph, config=graph_simple.session_config(thread_id))
+        chat_ctx, replies = llm.ChatContext.empty(), []
+        for text in ("add task pay rent", "pay rent is due soon", "what's due this week"):
+            chat_ctx.add_message(role="user", content=text)
+            reply = ""
+            async for chunk in adapter.chat(chat_ctx=chat_ctx):
+                reply += chunk.delta.content
+            chat_ctx.add_message(role="assistant", content=reply)
+            replies.append(reply)
+        said_before_due = list(session.said)
+        await asyncio.sleep(0.6)
+        reminders.close()
+        return replies, said_before_due, session.said
+
+    try:
+        replies, said_before_due, said = asyncio.run(run())
+    finally:
+        graph_simple.STORES.drop(thread_id)
+
+    assert replies[0] == "Added task #1: pay rent"
+    assert replies[1].startswith("pay rent is due ")
+    assert replies[2].startswith("1 task is due in the next 7 days. Task 1: pay rent, due ")
+    assert said_before_due == []
+    assert said == ["Reminder: pay rent is due now."]
@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+
+from adapter.langgraph import ERROR_REPLY, TIMEOUT_REPLY, LangGraphAdapter, _Deadline
+from adapter.resilience import CircuitBreaker, HedgedTransport
+from benchmarks.fakes import StubOpenAI
+from task_manager import graph_simple
+from test_langgraph_adapter import user_ctx
+from test_speculative import drain
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def openai_adapter(monkeypatch, stub: StubOpenAI, transport: HedgedTransport, room: str, streaming: bool = True, **adapter_options):
+    """The production graph (default ChatOpenAI) talking to ``stub`` through ``transport``."""
+    monkeypatch.setenv("OPENAI_BASE_URL", stub.base_url)
+    graph = graph_simple.create_task_manager_graph(
+        use_fast_path=False,
+        http_async_client=httpx.AsyncClient(transport=transport),
+        degraded=transport.breaker.is_open,
+    )
+    return LangGraphAdapter(graph=graph, config=graph_simple.session_config(room), streaming=streaming, **adapter_options)
+
+
+async def timed_turn(adapter: LangGraphAdapter, text: str) -> tuple[str, float]:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    reply = await drain(adapter.chat(chat_ctx=user_ctx(text)))
+    return reply, loop.time() - started
+
+
+def test_hedged_request_beats_slow_replica(monkeypatch):
+    async def run():
+        async with StubOpenAI() as stub:
+            stub.behave = lambda n: (1.0 if n == 0 else 0.0, 200)  # the first replica stalls
+            transport = HedgedTransport(CircuitBreaker(), hedge_delay=0.1)
+            adapter = openai_adapter(monkeypatch, stub, transport, "hedge")
+            reply, took = await timed_turn(adapter, "hello there")
+            return stub, transport, reply, took
+
+    stub, transport, reply, took = asyncio.run(run())
+
+    assert reply == stub.reply
+    assert took < 0.5
+    assert (stub.requests, transport.hedges) == (2, 1)
+    assert len(transport.latencies) == 1
+
+
+def test_failing_endpoint_degrades_to_command_router_and_recovers(monkeypatch):
+    async def run():
+        async with StubOpenAI() as stub:
+            stub.behave = lambda n: (0.0, 500)
+            clock = Clock()
+            breaker = CircuitBreaker(failure_threshold=2, reset_timeout=20.0, clock=clock)
+            adapter = openai_adapter(monkeypatch, stub, HedgedTransport(breaker), "breaker")
+
+            failing = [await timed_turn(adapter, "hello there") for _ in range(2)]
+            sent_while_failing = stub.requests
+            degraded = [await timed_turn(adapter, text) for text in ("what should I do today", "add task buy milk")]
+            sent_while_open = stub.requests - sent_while_failing
+
+            stub.behave = lambda n: (0.0, 200)
+            clock.now += breaker.reset_timeout
+            recovered, _ = await timed_turn(adapter, "hello again")
+            return stub, breaker, failing, sent_while_failing, degraded, sent_while_open, recovered
+
+    stub, breaker, failing, sent_while_failing, degraded, sent_while_open, recovered = asyncio.run(run())
+
+    # Each failed request was retried once at once, with no SDK backoff.
+    assert [reply for reply, _ in failing] == [ERROR_REPLY, ERROR_REPLY]
+    assert sent_while_failing == 4
+    assert all(took < 0.5 for _, took in failing)
+    # Open: no model calls, and the command router answers what it can.
+    assert [reply for reply, _ in degraded] == [graph_simple.DEGRADED_REPLY, "Added task #1: buy milk"]
+    assert sent_while_open == 0
+    assert all(took < 0.1 for _, took in degraded)
+    # After the reset timeout a probe goes through and closes the breaker.
+    assert recovered == stub.reply
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.opened == 1
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_turn_deadline_bounds_slow_model(monkeypatch, streaming):
+    async def run():
+        async with StubOpenAI() as stub:
+            stub.behave = lambda n: (2.0, 200)
+            transport = HedgedTransport(CircuitBreaker(), hedge_delay=5.0, attempt_timeout=5.0)
+            adapter = openai_adapter(monkeypatch, stub, transport, f"deadline-{streaming}", streaming, turn_deadline=0.3)
+            return await timed_turn(adapter, "hello there")
+
+    reply, took = asyncio.run(run())
+
+    assert reply == TIMEOUT_REPLY
+    assert took < 0.6
+
+
+def test_deadline_expires_unless_lifted():
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            async with _Deadline(0.05) as deadline:
+                await asyncio.sleep(1)
+        assert deadline.expired
+        async with _Deadline(0.05) as lifted:
+            lifted.lift()
+            await asyncio.sleep(0.1)
+        assert not lifted.expired
+        await asyncio.sleep(0)  # the task was not left cancelled
+
+    asyncio.run(run())
+
+
+def test_circuit_breaker_admits_one_probe():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.is_open()
+    breaker.record_failure()
+    assert breaker.is_open() and not breaker.allow()
+
+    clock.now += 10.0
+    assert not breaker.is_open()
+    assert breaker.allow() and not breaker.allow()  # one probe at a time
+    breaker.release_probe()  # the probing turn was cancelled
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open() and breaker.opened == 2  # a failed probe trips it again
+
+    clock.now += 10.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_hedge_delay_follows_latency_quantile():
+    transport = HedgedTransport(CircuitBreaker(), hedge_delay=1.0, min_hedge_delay=0.2, max_hedge_delay=2.0)
+    assert transport.hedge_delay() == 1.0  # too few samples yet
+    for ms in range(10, 1010, 10):
+        transport.latencies.add(ms / 1000)
+    assert transport.hedge_delay() == pytest.approx(0.91)
+    for _ in range(100):
+        transport.latencies.add(0.05)
+    assert transport.hedge_delay() == 0.2
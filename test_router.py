@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+from livekit.agents import llm
+
+from adapter.langgraph import LangGraphAdapter
+from task_manager import graph_simple
+from task_manager.router import Command, parse_command
+
+
+@pytest.fixture(autouse=True)
+def fresh_tasks():
+    graph_simple.TASKS.clear()
+    yield
+    graph_simple.TASKS.clear()
+
+
+def no_llm(messages):
+    raise AssertionError(f"LLM called for a routed command: {messages[-1].content!r}")
+
+
+@pytest.mark.parametrize("text, command", [
+    ("add task buy milk", Command("add_todo", {"task": "buy milk"})),
+    ("Please add a new task: Call Mom.", Command("add_todo", {"task": "Call Mom"})),
+    ("list tasks", Command("list_todos", {})),
+    ("Show me my tasks?", Command("list_todos", {})),
+    ("complete task 3", Command("complete_todo", {"todo_id": 3})),
+    ("mark task number two as done", Command("complete_todo", {"todo_id": 2})),
+    ("delete task #12", Command("delete_todo", {"todo_id": 12})),
+    ("remove task four", Command("delete_todo", {"todo_id": 4})),
+])
+def test_grammar_commands_are_parsed(text, command):
+    assert parse_command(text) == command
+
+
+@pytest.mark.parametrize("text", [
+    "hello",
+    "add task",
+    "add milk, eggs and bread",
+    "add task milk and eggs",
+    "complete task the first one",
+    "delete the dentist task",
+    "list tasks for tomorrow",
+])
+def test_ambiguous_requests_are_not_routed(text):
+    assert parse_command(text) is None
+
+
+def run_turns(graph, *texts: str) -> list[str]:
+    async def run():
+        adapter = LangGraphAdapter(graph=graph, streaming=True)
+        chat_ctx, replies = llm.ChatContext.empty(), []
+        for text in texts:
+            chat_ctx.add_message(role="user", content=text)
+            reply = ""
+            async for chunk in adapter.chat(chat_ctx=chat_ctx):
+                reply += chunk.delta.content
+            chat_ctx.add_message(role="assistant", content=reply)
+            replies.append(reply)
+        return replies
+
+    return asyncio.run(run())
+
+
+def test_routed_commands_never_call_the_llm(fake_model):
+    model = fake_model()
+    model.respond = no_llm
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=True)
+
+    replies = run_turns(graph, "add task buy milk", "add task call mom", "complete task 1", "delete task 2", "list tasks")
+
+    assert replies == [
+        "Added task #1: buy milk",
+        "Added task #2: call mom",
+        "Completed: buy milk",
+        "Deleted: call mom",
+        "You have 1 task: buy milk - done",
+    ]
+    assert model.calls == 0
+
+
+def test_unrouted_requests_stream_from_the_agent(fake_model):
+    model = fake_model("Hi! Try add task or list tasks", token_delay=0.001)
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=True)
+
+    assert run_turns(graph, "hello there") == ["Hi! Try add task or list tasks"]
+    assert model.calls == 1
+    assert isinstance(model.inputs[0][-1], HumanMessage)
+
+
+def test_agent_tokens_still_stream_behind_the_router(fake_model):
+    model = fake_model("Sure, what would you like to add to your list", token_delay=0.01)
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=True)
+
+    async def run():
+        chat_ctx = llm.ChatContext.empty()
+        chat_ctx.add_message(role="user", content="I need to remember something")
+        loop, arrivals = asyncio.get_running_loop(), []
+        async for _ in LangGraphAdapter(graph=graph, streaming=True).chat(chat_ctx=chat_ctx):
+            arrivals.append(loop.time())
+        return arrivals
+
+    arrivals = asyncio.run(run())
+
+    assert len(arrivals) > 1
+    assert arrivals[0] < model.finished_at[-1]
@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+from livekit import rtc
+from livekit.agents.voice.events import AgentStateChangedEvent
+
+from adapter.langgraph import LangGraphAdapter, attach_turn_confirmation
+from adapter.speculative import TurnAbandoned, TurnGate
+from conftest import FakeChatModel, command_responder
+from task_manager import graph_simple
+from test_langgraph_adapter import user_ctx
+
+LATENCY = 0.3
+
+
+def speculative_adapter(room: str, *, latency: float = 0.0, use_fast_path: bool = False):
+    model = FakeChatModel(respond=command_responder, latency=latency, finished_at=[], inputs=[])
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=use_fast_path)
+    config = graph_simple.session_config(room)
+    adapter = LangGraphAdapter(graph=graph, config=config, streaming=True, speculative=True)
+    return adapter, model, config["configurable"]["task_store"]
+
+
+async def drain(stream) -> str:
+    text = ""
+    async with stream:
+        async for chunk in stream:
+            text += chunk.delta.content
+    return text
+
+
+def test_cancelled_turn_stops_slow_model():
+    async def run():
+        adapter, model, store = speculative_adapter("spec-slow", latency=LATENCY)
+        stream = adapter.chat(chat_ctx=user_ctx("add task buy milk"))
+        await asyncio.sleep(0.05)
+        loop = asyncio.get_running_loop()
+        cancelled_at = loop.time()
+        await stream.aclose()
+        closed_in = loop.time() - cancelled_at
+        await asyncio.sleep(LATENCY)  # well past when the model would have answered
+        return model, store, closed_in
+
+    model, store, closed_in = asyncio.run(run())
+
+    assert model.calls == 1 and model.finished_at == []
+    assert closed_in < 0.05
+    assert len(store) == 0
+
+
+@pytest.mark.parametrize("use_fast_path", [False, True])
+def test_writes_wait_for_confirmation(use_fast_path):
+    async def run():
+        adapter, model, store = speculative_adapter(f"spec-confirm-{use_fast_path}", use_fast_path=use_fast_path)
+        session = rtc.EventEmitter()
+        attach_turn_confirmation(session, adapter)
+
+        reply = asyncio.create_task(drain(adapter.chat(chat_ctx=user_ctx("add task buy milk"))))
+        await asyncio.sleep(0.1)
+        staged = len(store), reply.done()
+        session.emit("agent_state_changed", AgentStateChangedEvent(old_state="listening", new_state="thinking"))
+        return staged, await reply, store, model
+
+    staged, text, store, model = asyncio.run(run())
+
+    assert staged == (0, False)
+    assert text == "Added task #1: buy milk"
+    assert [t["task"] for t in store] == ["buy milk"]
+    assert model.calls == (0 if use_fast_path else 2)
+
+
+@pytest.mark.parametrize("use_fast_path", [False, True])
+def test_superseded_turn_writes_nothing(use_fast_path):
+    async def run():
+        adapter, _, store = speculative_adapter(f"spec-supersede-{use_fast_path}", use_fast_path=use_fast_path)
+
+        # Preemptive turn reaches the tool, then the user keeps talking.
+        first = adapter.chat(chat_ctx=user_ctx("add task buy milk"))
+        await asyncio.sleep(0.1)
+        await first.aclose()
+
+        # The same request again once the user has finished; this one is committed.
+        second = asyncio.create_task(drain(adapter.chat(chat_ctx=user_ctx("add task buy milk"))))
+        await asyncio.sleep(0.1)
+        adapter.confirm_turn()
+        return await second, store
+
+    text, store = asyncio.run(run())
+
+    assert text == "Added task #1: buy milk"
+    assert [t["task"] for t in store] == ["buy milk"]
+
+
+def test_new_turn_aborts_pending_gate():
+    async def run():
+        adapter, _, store = speculative_adapter("spec-overlap")
+        stale = asyncio.create_task(drain(adapter.chat(chat_ctx=user_ctx("add task buy milk"))))
+        await asyncio.sleep(0.1)
+        # LiveKit starts the next generation before the stale stream has been torn down.
+        fresh = asyncio.create_task(drain(adapter.chat(chat_ctx=user_ctx("add task buy bread"))))
+        await asyncio.sleep(0.1)
+        adapter.confirm_turn()
+        return await asyncio.gather(stale, fresh), store
+
+    (stale_text, fresh_text), store = asyncio.run(run())
+
+    assert stale_text == ""
+    assert fresh_text == "Added task #1: buy bread"
+    assert [t["task"] for t in store] == ["buy bread"]
+
+
+def test_turn_gate_settles_once():
+    gate = TurnGate(timeout=0.01)
+    with pytest.raises(TurnAbandoned):
+        gate.wait()
+    gate.confirm()
+    assert gate.settled and not gate.confirmed
+
+    gate = TurnGate()
+    gate.confirm()
+    gate.abort()
+    gate.wait()
+    assert gate.confirmed
+
+
+@pytest.mark.parametrize("use_fast_path", [False, True])
+def test_cancelled_turn_leaves_checkpointed_thread_usable(use_fast_path):
+    async def run():
+        model = FakeChatModel(respond=command_responder, finished_at=[], inputs=[])
+        graph = graph_simple.create_task_manager_graph(
+            checkpointer=graph_simple.create_checkpointer("memory"), model=model, use_fast_path=use_fast_path
+        )
+        config = graph_simple.session_config(f"spec-checkpoint-{use_fast_path}")
+        adapter = LangGraphAdapter(graph=graph, config=config, streaming=True, checkpointing=True, speculative=True)
+
+        # Preemptive turn reaches the tool, then the user keeps talking.
+        first = adapter.chat(chat_ctx=user_ctx("add task buy milk"))
+        await asyncio.sleep(0.1)
+        await first.aclose()
+        abandoned_calls = len(model.inputs)
+
+        replies = []
+        for text in ("add task buy milk and eggs", "what is on my list"):
+            turn = asyncio.create_task(drain(adapter.chat(chat_ctx=user_ctx(text))))
+            await asyncio.sleep(0.1)
+            adapter.confirm_turn()
+            replies.append(await turn)
+        snapshot = await graph.aget_state(config)
+        return replies, snapshot, model.inputs[abandoned_calls:], config["configurable"]["task_store"]
+
+    replies, snapshot, later_inputs, store = asyncio.run(run())
+
+    assert replies == ["Added task #1: buy milk and eggs", "You have 1 task: buy milk and eggs - pending"]
+    assert [t["task"] for t in store] == ["buy milk and eggs"]
+    # Nothing of the abandoned turn is left in the thread or sent to the model again.
+    assert snapshot.next == ()
+    assert all(m.content != "add task buy milk" for m in snapshot.values["messages"])
+    assert all(m.content != "add task buy milk" for messages in later_inputs for m in messages)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_unconfirmed_turn_is_dropped_from_thread(tmp_path, backend):
+    async def run():
+        checkpointer = graph_simple.create_checkpointer(backend, sqlite_path=str(tmp_path / "checkpoints.sqlite"))
+        model = FakeChatModel(respond=command_responder, finished_at=[], inputs=[])
+        graph = graph_simple.create_task_manager_graph(checkpointer=checkpointer, model=model, use_fast_path=False)
+        config = graph_simple.session_config(f"spec-unconfirmed-{backend}")
+        adapter = LangGraphAdapter(graph=graph, config=config, streaming=True, checkpointing=True, speculative=True)
+
+        # The middle, read-only preemptive turn runs to completion, but LiveKit never uses it.
+        for text, committed in (("list tasks", True), ("list", False), ("what do I have", True)):
+            turn = asyncio.create_task(drain(adapter.chat(chat_ctx=user_ctx(text))))
+            await asyncio.sleep(0.1)
+            if committed:
+                adapter.confirm_turn()
+            await turn
+        snapshot = await graph.aget_state(config)
+        if backend == "sqlite":
+            await checkpointer.conn.close()
+        return snapshot
+
+    snapshot = asyncio.run(run())
+
+    assert [m.content for m in snapshot.values["messages"] if m.type == "human"] == ["list tasks", "what do I have"]
+    assert snapshot.next == ()
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from livekit.agents import llm
+
+from adapter.langgraph import LangGraphAdapter
+from conftest import FakeChatModel, command_responder
+from task_manager import graph_simple
+from task_manager.store import TaskStore
+
+
+@pytest.fixture(autouse=True)
+def fresh_tasks():
+    graph_simple.TASKS.clear()
+    yield
+    graph_simple.TASKS.clear()
+
+
+def test_ids_are_not_reused_after_delete():
+    store = TaskStore()
+    first, second = store.add("buy milk"), store.add("call mom")
+    store.delete(first["id"])
+    third = store.add("walk dog")
+
+    assert third["id"] == 3
+    assert [t["id"] for t in store] == [second["id"], third["id"]]
+
+
+def test_status_indexes_follow_mutations():
+    store = TaskStore()
+    for name in ("a", "b", "c", "d"):
+        store.add(name)
+    store.complete(1)
+    store.complete(1)
+    store.delete(2)
+    store.delete(99)
+
+    assert (len(store), store.pending_count, store.completed_count) == (3, 2, 1)
+    assert [t["task"] for t in store.first_pending(2)] == ["c", "d"]
+    store.delete(1)
+    assert store.completed_count == 0
+
+
+def test_due_dates_cover_pending_tasks_only():
+    store = TaskStore()
+    for name in ("rent", "milk", "dentist"):
+        store.add(name)
+    store.set_due(1, 300.0)
+    store.set_due(2, 100.0)
+    store.set_due(3, 200.0)
+    store.complete(2)
+    store.delete(3)
+    assert store.set_due(2, 50.0) is None  # already done
+
+    assert [t["task"] for t in store.due_between()] == ["rent"]
+    assert store.due_entries(0.0, 400.0) == [(1, 300.0)]
+    assert store.count_due(None, 300.0) == 0 and store.due_of(1) == 300.0
+
+
+def test_tool_replies():
+    assert graph_simple.list_todos().startswith("You have no tasks")
+    assert graph_simple.add_todo("buy milk") == "Added task #1: buy milk"
+    assert graph_simple.list_todos() == "You have 1 task: buy milk - pending"
+
+    graph_simple.add_todo("call mom")
+    graph_simple.add_todo("walk dog")
+    assert graph_simple.complete_todo(1) == "Completed: buy milk"
+    assert graph_simple.complete_todo(1) == "Task #1 is already done"
+    assert graph_simple.delete_todo(2) == "Deleted: call mom"
+    assert graph_simple.delete_todo(2) == "Task #2 not found"
+    assert graph_simple.add_todo("pay rent") == "Added task #4: pay rent"
+    assert graph_simple.list_todos() == (
+        "You have 3 tasks, 2 pending, 1 completed. Pending: Task 3: walk dog. Task 4: pay rent"
+    )
+
+
+def test_batch_tools_use_one_bulk_mutation():
+    store = graph_simple.TASKS
+    start = store.version
+    assert graph_simple.add_todos(["milk", "eggs", " ", "bread"]) == "Added 3 tasks: #1 milk, #2 eggs, #3 bread"
+    assert store.version == start + 1
+
+    graph_simple.complete_todo(2)
+    assert graph_simple.complete_todos([1, 2, 9, 1]) == "Completed: milk. Already done: eggs. Not found: #9"
+    assert store.version == start + 3
+    assert graph_simple.complete_todos([9]) == "Not found: #9" and store.version == start + 3
+    assert (store.pending_count, store.completed_count) == (1, 2)
+
+
+def test_parallel_tool_calls_run_in_one_step():
+    calls = [{"name": "add_todo", "args": {"task": f"item {i}"}, "id": f"call_{i}"} for i in range(10)]
+    calls.append({"name": "complete_todos", "args": {"todo_ids": [1, 2]}, "id": "call_batch"})
+    model = FakeChatModel(responses=[AIMessage(content="", tool_calls=calls), AIMessage(content="Done")],
+                          inputs=[], finished_at=[])
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=False)
+
+    result = asyncio.run(graph.ainvoke({"messages": [HumanMessage("add ten things")]}))
+
+    # One model round for all tool calls, one to answer.
+    assert model.calls == 2
+    assert sorted(t["id"] for t in graph_simple.TASKS) == list(range(1, 11))
+    assert [m.type for m in result["messages"]].count("tool") == 11
+
+
+def test_concurrent_sessions_are_isolated(fake_model):
+    sessions, items = 100, 3
+    model = fake_model()
+    model.respond = command_responder
+    graph = graph_simple.create_task_manager_graph(model=model, use_fast_path=False)
+
+    async def session(i: int) -> str:
+        adapter = LangGraphAdapter(graph=graph, config=graph_simple.session_config(f"room-{i}:caller"))
+        chat_ctx = llm.ChatContext.empty()
+        for k in range(items):
+            chat_ctx.add_message(role="user", content=f"add task s{i} item {k}")
+            async for _ in adapter.chat(chat_ctx=chat_ctx):
+                pass
+        chat_ctx.add_message(role="user", content="list tasks")
+        reply = ""
+        async for chunk in adapter.chat(chat_ctx=chat_ctx):
+            reply += chunk.delta.content
+        return reply
+
+    async def run():
+        start = time.perf_counter()
+        replies = await asyncio.gather(*(session(i) for i in range(sessions)))
+        return replies, time.perf_counter() - start
+
+    replies, elapsed = asyncio.run(run())
+    # A generous floor (about 100 turns/s on a laptop) that only trips on a gross slowdown.
+    assert sessions * (items + 1) / elapsed > 10
+
+    for i, reply in enumerate(replies):
+        store = graph_simple.STORES.get(f"room-{i}:caller")
+        assert [(t["id"], t["task"]) for t in store] == [(k + 1, f"s{i} item {k}") for k in range(items)]
+        assert reply == f"You have {items} tasks, {items} pending. Pending: Task 1: s{i} item 0. Task 2: s{i} item 1"
+    assert len(graph_simple.TASKS) == 0
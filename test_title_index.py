@@ -0,0 +1,65 @@
+import pytest
+
+from task_manager.title_index import TitleIndex, soundex, tokens
+
+# (stored title, what STT handed the tool)
+TRANSCRIPTION_ERRORS = [
+    ("Buy groceries", "buy grocery"), ("Buy groceries", "by groceries"), ("Buy groceries", "buy the groceries"),
+    ("Call mom", "call mum"), ("Call mom", "call my mom"), ("Pick up kids", "pickup kids"),
+    ("Pick up kids", "pick up the kid"), ("Dentist appointment", "dentist appoinment"),
+    ("Dentist appointment", "dentist appointments"), ("Write report", "right report"),
+    ("Write report", "write the reports"), ("Mail package", "male package"), ("Mail package", "mail the packages"),
+    ("Pay electricity bill", "pay electric bill"), ("Pay electricity bill", "pay the electricity bills"),
+    ("Renew passport", "renew my passport"), ("Renew passport", "renew pass port"),
+    ("Book flight to Boston", "book flight to bostin"), ("Book flight to Boston", "book a flight boston"),
+    ("Clean the garage", "clean garage"), ("Clean the garage", "clean the garbage"),
+    ("Water the plants", "water plant"), ("Email Sarah", "email sara"), ("Email Sarah", "e-mail sarah"),
+    ("Schedule meeting with Jon", "schedule meeting with john"), ("Buy flowers", "buy flours"),
+    ("Fix the sink", "fix sink"), ("Fix the sink", "fix the zinc"), ("Walk the dog", "walk dog"),
+    ("Walk the dog", "walk the dogs"), ("Submit tax return", "submit taxes return"),
+    ("Submit tax return", "submit tax returns"), ("Order pizza", "order pizzas"),
+    ("Order pizza", "order piza"), ("Read chapter four", "read chapter for"),
+    ("Take out trash", "take out the trash"), ("Take out trash", "takeout trash"),
+    ("Review pull request", "review pull requests"), ("Review pull request", "review full request"),
+    ("Cancel gym membership", "cancel jim membership"),
+]
+
+DISTRACTORS = [
+    "Buy milk", "Call dad", "Pick up dry cleaning", "Doctor appointment", "Write blog post",
+    "Pay rent", "Renew car insurance", "Book hotel", "Clean kitchen", "Water lawn", "Email boss",
+    "Schedule dentist", "Buy eggs", "Fix the car", "Walk to the park", "Submit expense report",
+    "Order groceries online", "Read book", "Take vitamins", "Review budget", "Cancel netflix", "Call plumber",
+]
+
+
+@pytest.fixture
+def index():
+    index = TitleIndex()
+    for title in sorted({title for title, _ in TRANSCRIPTION_ERRORS}) + DISTRACTORS:
+        index.add(title, title)
+    return index
+
+
+def test_recall_on_transcription_errors(index):
+    resolved = [index.resolve(spoken) == title for title, spoken in TRANSCRIPTION_ERRORS]
+
+    assert sum(resolved) / len(resolved) >= 0.95
+
+
+@pytest.mark.parametrize("spoken", ["buy a car", "call grandma", "learn piano", "feed the cat"])
+def test_unrelated_requests_do_not_resolve(index, spoken):
+    assert index.resolve(spoken) is None
+
+
+def test_exact_match_wins_over_fuzzy(index):
+    index.add("dup", "Buy Milk ")
+
+    assert index.resolve("buy milk") == "Buy milk"
+    index.remove("Buy milk")
+    assert index.resolve("BUY  MILK") == "dup"
+
+
+def test_normalization_helpers():
+    assert tokens("Buy the Groceries!") == ["buy", "grocery"]
+    assert soundex("right") == soundex("write")
+    assert soundex("sink") == soundex("zinc")
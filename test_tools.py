@@ -0,0 +1,467 @@
+import asyncio
+import gc
+import json
+import os
+import time
+from datetime import datetime
+
+import pytest
+from langchain_core.messages.utils import count_tokens_approximately
+
+from config.settings import settings
+from task_manager import storage as storage_module
+from task_manager import tools
+from task_manager.models import Task
+from task_manager.records import Priority, Status, TaskRecord
+from task_manager.render import speakable
+from task_manager.storage import JournalStorage, SqliteStorage
+
+
+@pytest.fixture
+def tasks_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "data" / "tasks.json")
+    monkeypatch.setattr(settings, "TASKS_FILE", path)
+    monkeypatch.setattr(settings, "TASKS_DB", str(tmp_path / "data" / "tasks.sqlite"))
+    return path
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tasks_file, monkeypatch):
+    store = tools.create_storage(request.param)
+    monkeypatch.setattr(tools, "_storage", store)
+    yield store
+    store.close()
+
+
+def make_task(i: int) -> Task:
+    return Task(id=f"task_{i}", title=f"task {i}", created_at=datetime(2025, 1, 1))
+
+
+def test_tools_round_trip(storage):
+    assert tools.add_task.invoke({"title": "Buy groceries", "priority": "high"}).startswith("✅ Added")
+    tools.add_task.invoke({"title": "Call mom"})
+    assert "Completed" in tools.complete_task.invoke({"task_title": "buy groceries"})
+    assert "Deleted" in tools.delete_task.invoke({"task_title": "call mom"})
+    assert "not found" in tools.delete_task.invoke({"task_title": "call mom"})
+
+    summary = tools.get_task_summary.invoke({})
+    assert "✅ Completed: 1" in summary and "📌 Pending: 0" in summary
+    assert "Buy groceries" in tools.list_tasks.invoke({"status": "completed"})
+
+
+def test_added_task_ids_survive_deletes(storage):
+    for title in ("alpha", "beta", "gamma"):
+        tools.add_task.invoke({"title": title})
+    tools.delete_task.invoke({"task_title": "alpha"})
+    tools.add_task.invoke({"title": "delta"})  # same count, same second as "gamma"
+
+    assert sorted(t.title for t in storage.all()) == ["beta", "delta", "gamma"]
+    assert len({t.id for t in storage.all()}) == 3
+
+
+def test_tools_match_titles_case_and_whitespace_insensitively(storage):
+    tools.add_task.invoke({"title": "Buy  Groceries"})
+    tools.add_task.invoke({"title": "Call mom"})
+
+    assert "Updated 'Buy  Groceries' priority to high" in tools.update_task_priority.invoke(
+        {"task_title": " buy groceries", "priority": "high"}
+    )
+    assert storage.find_by_title("CALL MOM").title == "Call mom"
+
+
+def test_tools_resolve_transcription_near_misses(storage):
+    tools.add_task.invoke({"title": "Buy groceries"})
+    tools.add_task.invoke({"title": "Call mom"})
+    tools.add_task.invoke({"title": "Call dad"})
+
+    assert tools.complete_task.invoke({"task_title": "by grocery"}) == (
+        "✅ Completed task: 'Buy groceries' (closest match to 'by grocery')"
+    )
+    assert tools.complete_task.invoke({"task_title": "BUY  groceries"}) == "✅ Completed task: 'Buy groceries'"
+    assert tools.delete_task.invoke({"task_title": "call mum"}) == (
+        "❓ Did you mean 'Call mom'? Say its exact title to delete it."
+    )
+    assert storage.find_by_title("Call mom") is not None
+    assert tools.delete_task.invoke({"task_title": "call mom"}) == "🗑️ Deleted task: 'Call mom'"
+    assert tools.delete_task.invoke({"task_title": "call grandma"}) == (
+        "❌ Task 'call grandma' not found. Did you mean 'Call dad'?"
+    )
+    assert "list tasks" in tools.delete_task.invoke({"task_title": "learn piano"})
+
+
+def test_title_index_follows_renames_and_deletes(storage):
+    task = make_task(0)
+    task.title = "Mail package"
+    storage.put(task)
+    assert storage.find_by_title("male package").id == "task_0"
+
+    task.title = "Water the plants"
+    storage.put(task)
+    assert storage.find_by_title("male package") is None
+    assert storage.find_by_title("water plant").id == "task_0"
+
+    storage.delete("task_0")
+    assert storage.find_by_title("water plant") is None
+
+
+def test_storage_filters_and_summary(storage):
+    for i in range(10):
+        task = make_task(i)
+        task.status = ("pending", "in_progress", "completed")[i % 3]
+        task.priority = "high" if i < 4 else "low"
+        storage.put(task)
+    storage.delete("task_9")
+
+    assert [t.id for t in storage.list("in_progress")] == ["task_1", "task_4", "task_7"]
+    assert [t.id for t in storage.list()] == [f"task_{i}" for i in range(9)]
+    assert storage.summary() == {
+        "total": 9, "pending": 3, "in_progress": 3, "completed": 3, "high_priority": 3,
+    }
+    assert tools.list_tasks.invoke({"status": "completed"}).startswith("You have 3 completed tasks.")
+    assert tools.list_tasks.invoke({"status": "archived"}) == "📝 No archived tasks found"
+
+
+def test_storage_update_keeps_position(storage):
+    for i in range(3):
+        storage.put(make_task(i))
+    task = storage.get("task_0")
+    task.status = Status.COMPLETED
+    storage.put(task)
+
+    assert [t.id for t in storage.all()] == ["task_0", "task_1", "task_2"]
+    assert storage.get("task_0").status is Status.COMPLETED
+
+
+def test_sqlite_queries_use_indexes(tasks_file):
+    store = SqliteStorage(settings.TASKS_DB)
+    conn = store._conn
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    for query, index in (
+        ("SELECT * FROM tasks WHERE title_norm = 'x'", "idx_tasks_title_norm"),
+        ("SELECT * FROM tasks WHERE status = 'pending'", "idx_tasks_status"),
+        ("SELECT * FROM tasks WHERE priority = 'high'", "idx_tasks_priority"),
+    ):
+        plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}"))
+        assert index in plan
+    store.close()
+
+
+def test_journal_replays_after_restart(tasks_file):
+    store = JournalStorage(tasks_file)
+    for i in range(3):
+        store.put(make_task(i))
+    store.delete("task_1")
+    store.close()
+
+    reopened = JournalStorage(tasks_file)
+    assert [t.id for t in reopened.all()] == ["task_0", "task_2"]
+    reopened.close()
+
+
+def test_torn_journal_tail_is_discarded(tasks_file):
+    store = JournalStorage(tasks_file)
+    store.put(make_task(0))
+    store.close()
+    with open(tasks_file + ".journal", "a") as f:
+        f.write('{"op":"put","task":{"id":"task_9"')  # crash mid-append
+
+    reopened = JournalStorage(tasks_file)
+    reopened.put(make_task(1))
+    reopened.close()
+
+    assert [t.id for t in JournalStorage(tasks_file).all()] == ["task_0", "task_1"]
+
+
+def test_idle_journal_is_synced_within_interval(tasks_file):
+    store = JournalStorage(tasks_file, fsync_batch=100, fsync_interval=0.05)
+    store.put(make_task(0))
+    store.put(make_task(1))
+    assert store._unsynced == 2  # no further write comes along to trigger the sync
+
+    time.sleep(0.2)
+    assert store._unsynced == 0 and store._sync_timer is None
+    store.close()
+
+
+def test_compaction_writes_snapshot_and_resets_journal(tasks_file):
+    store = JournalStorage(tasks_file, compact_every=5)
+    for i in range(6):
+        store.put(make_task(i))
+    store.close()
+
+    with open(tasks_file) as f:
+        assert [row["id"] for row in json.load(f)] == [f"task_{i}" for i in range(5)]
+    with open(tasks_file + ".journal") as f:
+        assert len(f.readlines()) == 1
+    assert [t.id for t in JournalStorage(tasks_file).all()] == [f"task_{i}" for i in range(6)]
+    assert not [name for name in os.listdir(os.path.dirname(tasks_file)) if name.startswith(".tmp-")]
+
+
+def test_failed_save_keeps_previous_file(tasks_file, monkeypatch):
+    storage_module.atomic_write_json(tasks_file, [{"id": "task_0"}])
+
+    def explode(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch, pytest.raises(OSError):
+        patch.setattr(storage_module.json, "dumps", explode)
+        storage_module.atomic_write_json(tasks_file, [{"id": "task_0"}, {"id": "task_1"}])
+
+    with open(tasks_file) as f:
+        assert json.load(f) == [{"id": "task_0"}]
+    assert not [name for name in os.listdir(os.path.dirname(tasks_file)) if name.startswith(".tmp-")]
+
+
+def list_call(**args):
+    return tools.list_tasks.invoke({"type": "tool_call", "id": "call_1", "name": "list_tasks", "args": args})
+
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_list_output_stays_bounded(storage, count):
+    for i in range(count):
+        storage.put(make_task(i))
+
+    message = list_call()
+
+    assert count_tokens_approximately([message]) < 120
+    assert message.content.startswith(f"You have {count} tasks. Page 1 of {-(-count // 5)}:")
+    assert message.content.endswith("Say 'next page' to hear 5 more.")
+    assert len(message.artifact["tasks"]) == 5 and message.artifact["next_page"] == 2
+
+
+def test_list_pages_continue_and_carry_structured_payload(storage):
+    for i in range(7):
+        task = make_task(i)
+        task.priority = "high" if i == 6 else "medium"
+        storage.put(task)
+
+    last = list_call(page=2)
+
+    assert last.content == "You have 7 tasks. Page 2 of 2: 6. task 5. 7. task 6 (high priority)."
+    assert last.artifact == {
+        "status": "all", "total": 7, "page": 2, "pages": 2, "next_page": None,
+        "tasks": [
+            {"id": "task_5", "title": "task 5", "description": None, "priority": "medium", "status": "pending"},
+            {"id": "task_6", "title": "task 6", "description": None, "priority": "high", "status": "pending"},
+        ],
+    }
+    assert "📌" not in list_call(page=99).content
+
+
+def test_speakable_titles():
+    assert speakable("  Buy   milk 🥛 ") == "Buy milk"
+    long = "call the insurance company about the renewal quote for the car and the house"
+    assert speakable(long) == "call the insurance company about the renewal quote for the..."
+
+
+def test_task_record_round_trips_through_model_and_row():
+    task = Task(id="task_1", title="Pay rent", description="by card", priority="high",
+                status="in_progress", created_at=datetime(2025, 1, 2, 9, 30), due_date=datetime(2025, 2, 1))
+    record = TaskRecord.from_task(task)
+
+    assert (record.priority, record.status) == (Priority.HIGH, Status.IN_PROGRESS)
+    assert record.created_at == datetime(2025, 1, 2, 9, 30).timestamp()
+    assert record.to_task() == task
+    assert TaskRecord.from_row(json.loads(json.dumps(record.to_row()))) == record
+    assert not hasattr(record, "__dict__")
+
+
+def test_storage_reads_iso_timestamp_rows(tasks_file):
+    # Snapshots and journals written before TaskRecord used ISO-8601 strings.
+    legacy = make_task(0).model_dump(mode="json")
+    os.makedirs(os.path.dirname(tasks_file))
+    with open(tasks_file, "w") as f:
+        json.dump([legacy], f)
+    with open(tasks_file + ".journal", "w") as f:
+        f.write(json.dumps({"op": "put", "task": {**legacy, "id": "task_1", "status": "completed"}}) + "\n")
+
+    storage = JournalStorage(tasks_file)
+    assert [t.created_at for t in storage.all()] == [datetime(2025, 1, 1).timestamp()] * 2
+    assert storage.summary()["completed"] == 1
+    storage.close()
+    assert TaskRecord.from_row(legacy).to_task().created_at == datetime(2025, 1, 1)
+
+
+SLOW_WRITE = 0.1
+
+
+async def max_loop_lag(work, interval: float = 0.005) -> tuple[float, list]:
+    """Run ``work`` while a ticker measures how late the event loop wakes it."""
+    lags, done = [], asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    # A full collection over the test session's heap would show up as lag too.
+    gc.disable()
+    monitor = asyncio.create_task(ticker())
+    try:
+        results = await work
+    finally:
+        done.set()
+        await monitor
+        gc.enable()
+    return max(lags), results
+
+
+def test_async_tools_keep_event_loop_responsive(tasks_file, monkeypatch):
+    put = JournalStorage.put
+
+    def slow_put(self, task):
+        time.sleep(SLOW_WRITE)  # a slow disk
+        put(self, task)
+
+    monkeypatch.setattr(JournalStorage, "put", slow_put)
+    sessions = [f"room-{i}:caller" for i in range(100)]
+
+    async def session(user):
+        config = {"configurable": {"thread_id": user}}
+        await tools.add_task.ainvoke({"title": f"call {user}"}, config)
+        return await tools.list_tasks.ainvoke({}, config)
+
+    async def main():
+        return await max_loop_lag(asyncio.gather(*(session(user) for user in sessions)))
+
+    start = time.perf_counter()
+    try:
+        lag, listings = asyncio.run(main())
+    finally:
+        for user in sessions:
+            tools.close_storage(user)
+    elapsed = time.perf_counter() - start
+
+    # Blocking writes would stall the loop for SLOW_WRITE each, 10 s in total.
+    assert lag < SLOW_WRITE
+    assert elapsed < len(sessions) * SLOW_WRITE / 2
+    for user, listing in zip(sessions, listings):
+        assert f"call {user}" in listing and listing.count("call room-") == 1
+        assert os.path.exists(tools.user_path(tasks_file, user) + ".journal")
+
+
+def test_same_user_calls_are_serialized(tasks_file, monkeypatch):
+    config = {"configurable": {"thread_id": "room:alice"}}
+    active, overlaps = [0], []
+    put = JournalStorage.put
+
+    def tracked_put(self, task):
+        active[0] += 1
+        overlaps.append(active[0])
+        time.sleep(0.005)
+        put(self, task)
+        active[0] -= 1
+
+    monkeypatch.setattr(JournalStorage, "put", tracked_put)
+
+    async def main():
+        titles = [f"errand {i}" for i in range(10)]
+        await asyncio.gather(*(tools.add_task.ainvoke({"title": t}, config) for t in titles))
+        return tools.get_storage("room:alice").all()
+
+    try:
+        tasks = asyncio.run(main())
+    finally:
+        tools.close_storage("room:alice")
+
+    assert len({task.id for task in tasks}) == 10
+    assert max(overlaps) == 1  # one find-then-update at a time for this user
+
+
+def test_sync_calls_are_serialized_with_async_ones(tasks_file, monkeypatch):
+    config = {"configurable": {"thread_id": "room:bob"}}
+    active, overlaps = [0], []
+    put = JournalStorage.put
+
+    def tracked_put(self, task):
+        active[0] += 1
+        overlaps.append(active[0])
+        time.sleep(0.005)
+        put(self, task)
+        active[0] -= 1
+
+    monkeypatch.setattr(JournalStorage, "put", tracked_put)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        sync_calls = [loop.run_in_executor(None, tools.add_task.invoke, {"title": f"sync {i}"}, config) for i in range(5)]
+        async_calls = [tools.add_task.ainvoke({"title": f"async {i}"}, config) for i in range(5)]
+        await asyncio.gather(*sync_calls, *async_calls)
+        return tools.get_storage("room:bob").all()
+
+    try:
+        tasks = asyncio.run(main())
+    finally:
+        tools.close_storage("room:bob")
+
+    assert len(tasks) == 10
+    assert max(overlaps) == 1
+
+
+def test_user_paths_are_distinct_per_id():
+    ids = ["a_b:c", "a:b_c", "a b", "a%20b", "room-1_caller"]
+    paths = {tools.user_path("data/tasks.json", user) for user in ids}
+    assert len(paths) == len(ids)
+    assert tools.user_path("data/tasks.json", "room-1_caller") == "data/tasks.room-1_caller.json"
+    assert "/" not in tools.user_path("tasks.json", "../../etc")
+
+
+NOW = datetime(2025, 3, 12, 14, 0).timestamp()  # a Wednesday afternoon
+
+
+def test_due_date_tools_answer_time_ranges(storage, monkeypatch):
+    monkeypatch.setattr(tools, "clock", lambda: NOW)
+    due = {
+        "Pay rent": "2025-03-10",
+        "Call mom": "2025-03-12T17:00",
+        "Book flight": "tomorrow",
+        "Renew passport": "in 5 days",
+        "File taxes": "2025-04-15",
+        "Water plants": "2025-03-11",
+    }
+    for title, when in due.items():
+        tools.add_task.invoke({"title": title})
+        assert tools.set_due_date.invoke({"task_title": title, "due": when}).startswith(f"📅 '{title}' is due")
+    tools.add_task.invoke({"title": "Someday"})
+    tools.complete_task.invoke({"task_title": "water plants"})
+
+    def due_call(**args):
+        return tools.list_due_tasks.invoke({"type": "tool_call", "id": "call_1", "name": "list_due_tasks", "args": args})
+
+    assert due_call(window="overdue").content == "1 task is overdue. 1. Pay rent, due March 10."
+    assert due_call(window="today").content == "1 task is due today. 1. Call mom, due today at 5 PM."
+    upcoming = due_call(window="upcoming", days=7)
+    assert upcoming.content == (
+        "3 tasks are due in the next 7 days. 1. Call mom, due today at 5 PM. "
+        "2. Book flight, due tomorrow at 9 AM. 3. Renew passport, due Monday at 9 AM."
+    )
+    assert upcoming.artifact["tasks"][1]["due"] == "2025-03-13T09:00:00"
+
+    tools.complete_task.invoke({"task_title": "call mom"})
+    tools.set_due_date.invoke({"task_title": "pay rent", "due": "none"})
+    assert due_call(window="today").content == "Nothing is due today."
+    assert due_call(window="overdue").content == "Nothing is overdue."
+    assert storage.count_due() == 3
+    assert "❌" in tools.set_due_date.invoke({"task_title": "book flight", "due": "whenever"})
+
+
+def test_due_index_pages_and_survives_reopen(storage, tasks_file):
+    today = datetime(2025, 3, 12).timestamp()
+    for i in range(12):
+        task = make_task(i)
+        task.due_date = datetime.fromtimestamp(today + 3600 * (12 - i))  # later ids are due earlier
+        storage.put(task)
+    storage.delete("task_0")
+    storage.close()
+
+    reopened = tools.create_storage("sqlite" if isinstance(storage, SqliteStorage) else "json")
+    try:
+        assert reopened.count_due(today, today + 86400) == 11
+        assert [t.id for t in reopened.due_between(today, today + 86400, 5, 5)] == [
+            "task_6", "task_5", "task_4", "task_3", "task_2"
+        ]
+        assert [t.id for t in reopened.due_between(None, today + 3600 * 2)] == ["task_11"]
+    finally:
+        reopened.close()
@@ -0,0 +1,144 @@
+import asyncio
+import os
+
+from adapter.tts_cache import AudioCache, CachedTTS
+from benchmarks.fakes import FakeTTS, fake_pcm
+
+LATENCY = 0.2
+VOICE = "voice-1"
+GREETING = "Hi! I'm your voice task manager."
+
+
+def cached_tts(tmp_path, *, latency: float = LATENCY, max_bytes: int = 1 << 20):
+    inner = FakeTTS(latency=latency)
+    return CachedTTS(inner, AudioCache(str(tmp_path), max_bytes), voice_id=VOICE, phrases=[GREETING]), inner
+
+
+async def speak(engine, tokens: list[str]) -> tuple[bytes, float]:
+    """Stream ``tokens`` like the agent's tts_node; returns (audio, seconds to first frame)."""
+    loop = asyncio.get_running_loop()
+    audio, first = b"", None
+    async with engine.stream() as stream:
+        started = loop.time()
+        for token in tokens:
+            stream.push_text(token)
+        stream.end_input()
+        async for event in stream:
+            if first is None:
+                first = loop.time() - started
+            audio += event.frame.data.tobytes()
+    return audio, first
+
+
+def test_repeated_phrase_is_replayed_without_synthesis(tmp_path):
+    async def run():
+        engine, inner = cached_tts(tmp_path)
+        tokens = ["Hi! ", "I'm your ", "voice task ", "manager."]
+        miss = await speak(engine, tokens)
+        hit = await speak(engine, tokens)
+        return miss, hit, inner, engine.cache.stats()
+
+    (miss_audio, miss_first), (hit_audio, hit_first), inner, stats = asyncio.run(run())
+
+    assert inner.calls == 1
+    assert hit_audio == miss_audio == fake_pcm(GREETING)
+    assert miss_first >= LATENCY
+    assert hit_first < LATENCY / 4
+    assert stats["hits"] == 1 and stats["entries"] == 1
+
+
+def test_prewarm_serves_later_streams(tmp_path):
+    async def run():
+        engine, inner = cached_tts(tmp_path, latency=0.0)
+        first = await engine.prewarm_phrases([GREETING, "Done!", "  done!  ", "Done!"])
+        again = await engine.prewarm_phrases([GREETING, "Done!"])
+        calls = inner.calls
+        audio, _ = await speak(engine, ["Hi!  I'm your\nvoice task manager."])
+        return first, again, calls, inner.calls, audio
+
+    first, again, calls, calls_after, audio = asyncio.run(run())
+
+    assert first == 3  # "done!" differs in case, so it is its own clip
+    assert again == 0
+    assert calls_after == calls
+    assert audio == fake_pcm(GREETING)
+
+
+def test_uncached_reply_is_not_held_back(tmp_path):
+    async def run():
+        engine, inner = cached_tts(tmp_path, latency=0.0)
+        await engine.prewarm_phrases(["Done! What else can I help you with?"])
+        loop = asyncio.get_running_loop()
+        async with engine.stream() as stream:
+            sent_at = {}
+            for token in ["Done! ", "Added ", "task ", "#1: ", "buy milk"]:
+                sent_at[token] = loop.time()
+                stream.push_text(token)
+                await asyncio.sleep(0.05)
+            stream.end_input()
+            audio = b"".join([event.frame.data.tobytes() async for event in stream])
+        return inner.texts, sent_at, audio
+
+    texts, sent_at, audio = asyncio.run(run())
+
+    # "Done! " could still be the cached phrase; "Added " rules it out and goes straight to the vendor.
+    arrived = dict((token, at) for at, token in texts)
+    assert "Done! Added " in arrived
+    assert arrived["Done! Added "] - sent_at["Added "] < 0.02
+    assert arrived["#1: "] - sent_at["#1: "] < 0.02
+    assert audio == fake_pcm("Done! Added task #1: buy milk")
+
+
+def test_only_known_phrases_are_stored(tmp_path):
+    async def run():
+        engine, inner = cached_tts(tmp_path, latency=0.0)
+        for _ in range(2):
+            await speak(engine, ["You have ", "3 tasks."])
+            async with engine.synthesize("Added task #1: buy milk") as stream:
+                async for _ in stream:
+                    pass
+        return inner.calls, engine.cache.stats()
+
+    calls, stats = asyncio.run(run())
+
+    assert calls == 4
+    assert stats["entries"] == 0
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".pcm")]
+
+
+def test_budget_covers_clips_written_by_other_workers(tmp_path):
+    clip = len(fake_pcm("x" * 10))
+
+    async def run():
+        first, _ = cached_tts(tmp_path, latency=0.0, max_bytes=int(clip * 2.5))
+        second, _ = cached_tts(tmp_path, latency=0.0, max_bytes=int(clip * 2.5))
+        await first.prewarm_phrases(["a" * 10, "b" * 10])
+        await second.prewarm_phrases(["c" * 10])
+        return first.lookup("a" * 10), first.lookup("b" * 10)
+
+    oldest, kept = asyncio.run(run())
+
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".pcm")]) == 2
+    assert oldest is None  # evicted by the second worker, dropped from the first one's index
+    assert kept == fake_pcm("b" * 10)
+
+
+def test_cache_evicts_lru_and_persists(tmp_path):
+    clip = len(fake_pcm("x" * 10))
+
+    async def run():
+        engine, _ = cached_tts(tmp_path, latency=0.0, max_bytes=int(clip * 2.5))
+        await engine.prewarm_phrases(["a" * 10, "b" * 10])
+        engine.lookup("a" * 10)  # "b" is now least recently used
+        await engine.prewarm_phrases(["c" * 10])
+        kept = {text for text in ("a" * 10, "b" * 10, "c" * 10) if engine.lookup(text) is not None}
+        engine.cache.close()
+        return kept
+
+    kept = asyncio.run(run())
+    assert kept == {"a" * 10, "c" * 10}
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".pcm")]) == 2
+
+    reopened = CachedTTS(FakeTTS(), AudioCache(str(tmp_path), clip * 3), voice_id=VOICE)
+    assert reopened.lookup("c" * 10) == fake_pcm("c" * 10)
+    assert CachedTTS(FakeTTS(), AudioCache(str(tmp_path)), voice_id="voice-2").lookup("c" * 10) is None